@@ -0,0 +1,297 @@
+"""
+Módulo com a captura contínua do microfone em um buffer circular
+
+Uma thread mantém o stream de entrada aberto o tempo todo e grava cada bloco
+lido em um buffer circular pré-alocado, junto com a energia do bloco. Quem
+escuta lê o buffer com um cursor próprio: não há reabertura do dispositivo a
+cada frase, o áudio falado entre duas escutas não se perde e o início da
+fala pode ser recuperado do passado (pre-roll), sem cortar a primeira sílaba.
+
+A mesma thread recalibra periodicamente o limiar de energia do reconhecedor
+a partir do ruído de fundo medido nos blocos mais recentes.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+# Duração da calibração inicial (segundos)
+CALIBRATION_SECONDS = 1.0
+
+# Janela de áudio usada nas recalibrações periódicas (segundos)
+RECALIBRATION_WINDOW_SECONDS = 10.0
+
+# Percentil da energia dos blocos recentes tomado como ruído de fundo
+NOISE_PERCENTILE = 20
+
+# Limiar mínimo de energia (evita disparar com qualquer ruído em ambientes silenciosos)
+MIN_ENERGY_THRESHOLD = 50.0
+
+logger = logging.getLogger(__name__)
+
+
+def frame_energy(frame: bytes) -> float:
+    """Calcula a energia RMS de um bloco de amostras de 16 bits"""
+    samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples * samples)))
+
+
+class AudioRingBuffer:
+    """Buffer circular de blocos de áudio de tamanho fixo, com posições absolutas"""
+
+    def __init__(self, capacity: int, frame_bytes: int):
+        """
+        Inicializa o buffer (toda a memória é alocada aqui)
+
+        Args:
+            capacity (int): Número de blocos mantidos
+            frame_bytes (int): Tamanho de cada bloco em bytes
+        """
+        self.capacity = capacity
+        self.frame_bytes = frame_bytes
+        self._frames = np.zeros((capacity, frame_bytes), dtype=np.uint8)
+        self._lengths = np.zeros(capacity, dtype=np.int32)
+        self._energies = np.zeros(capacity, dtype=np.float32)
+        self._written = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def written(self) -> int:
+        """Posição absoluta do próximo bloco a ser gravado"""
+        with self._condition:
+            return self._written
+
+    @property
+    def oldest(self) -> int:
+        """Posição absoluta do bloco mais antigo ainda disponível"""
+        with self._condition:
+            return max(0, self._written - self.capacity)
+
+    def write(self, frame: bytes, energy: float):
+        """Grava um bloco, sobrescrevendo o mais antigo quando o buffer está cheio"""
+        slot = self._written % self.capacity
+        length = min(len(frame), self.frame_bytes)
+        self._frames[slot, :length] = np.frombuffer(frame, dtype=np.uint8, count=length)
+        with self._condition:
+            self._lengths[slot] = length
+            self._energies[slot] = energy
+            self._written += 1
+            self._condition.notify_all()
+
+    def read(self, position: int, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Lê o bloco de uma posição absoluta, aguardando se ele ainda não foi gravado
+
+        Args:
+            position (int): Posição do bloco (deve ser >= oldest)
+            timeout (float): Tempo máximo de espera (segundos)
+
+        Returns:
+            bytes: Conteúdo do bloco, ou None se o tempo acabou ou o buffer foi fechado
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._written > position or self._closed, timeout):
+                return None
+            if self._written <= position:
+                return None
+            if position < self._written - self.capacity:
+                raise IndexError(f"Bloco {position} já foi sobrescrito")
+            slot = position % self.capacity
+            length = self._lengths[slot]
+        # Cópia fora da trava: o bloco só seria sobrescrito depois de uma volta inteira
+        return self._frames[slot, :length].tobytes()
+
+    def recent_energies(self, count: int) -> np.ndarray:
+        """Energia dos últimos `count` blocos gravados"""
+        with self._condition:
+            count = min(count, self._written, self.capacity)
+            slots = (np.arange(self._written - count, self._written)) % self.capacity
+            return self._energies[slots].copy()
+
+    def close(self):
+        """Libera os leitores que aguardam novos blocos"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def reopen(self):
+        """Volta a aceitar leitores bloqueantes (a captura foi reiniciada)"""
+        with self._condition:
+            self._closed = False
+
+
+class RingReader:
+    """Leitor sequencial do buffer circular, com cursor próprio"""
+
+    def __init__(self, buffer: AudioRingBuffer, position: int, timeout: float = 1.0):
+        """
+        Args:
+            buffer (AudioRingBuffer): Buffer lido
+            position (int): Posição absoluta inicial
+            timeout (float): Espera máxima por um novo bloco antes de desistir (segundos)
+        """
+        self.buffer = buffer
+        self.position = position
+        self.timeout = timeout
+        self.overruns = 0
+
+    def read(self) -> bytes:
+        """
+        Lê o próximo bloco
+
+        Returns:
+            bytes: Bloco de áudio (vazio se a captura parou)
+        """
+        while True:
+            oldest = self.buffer.oldest
+            if self.position < oldest:
+                # O leitor ficou para trás mais que o tamanho do buffer
+                self.overruns += oldest - self.position
+                self.position = oldest
+            try:
+                frame = self.buffer.read(self.position, timeout=self.timeout)
+            except IndexError:
+                continue  # Sobrescrito entre a verificação e a leitura
+            if frame is None:
+                return b""
+            self.position += 1
+            return frame
+
+
+class MicrophoneCapture:
+    """Thread que mantém o microfone aberto e grava os blocos no buffer circular"""
+
+    def __init__(self, microphone, recognizer, buffer_seconds: float = 30.0,
+                 recalibration_interval: Optional[float] = 30.0, damping: float = 0.5):
+        """
+        Inicializa a captura (o microfone só é aberto em start)
+
+        Args:
+            microphone (sr.Microphone): Microfone do SpeechRecognition
+            recognizer (sr.Recognizer): Reconhecedor cujo energy_threshold é calibrado
+            buffer_seconds (float): Áudio mantido no buffer circular (segundos)
+            recalibration_interval (float): Intervalo entre recalibrações (None desativa)
+            damping (float): Peso do limiar anterior em cada recalibração (0 a 1)
+        """
+        self.microphone = microphone
+        self.recognizer = recognizer
+        self.recalibration_interval = recalibration_interval
+        self.damping = damping
+
+        self.sample_rate = microphone.SAMPLE_RATE
+        self.sample_width = microphone.SAMPLE_WIDTH
+        self.chunk = microphone.CHUNK
+        self.seconds_per_frame = self.chunk / self.sample_rate
+        capacity = max(1, int(buffer_seconds / self.seconds_per_frame))
+        self.buffer = AudioRingBuffer(capacity, self.chunk * self.sample_width)
+
+        self.calibrations = 0
+        self.error: Optional[Exception] = None
+        self._calibrated = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Se a thread de captura está ativa"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def seconds_to_frames(self, seconds: float) -> int:
+        """Converte uma duração em número de blocos"""
+        return int(seconds / self.seconds_per_frame)
+
+    def start(self, wait_calibration: bool = True):
+        """
+        Abre o microfone e inicia a thread de captura
+
+        Args:
+            wait_calibration (bool): Se True, aguarda a calibração inicial do limiar
+        """
+        if not self.is_running:
+            self._stop.clear()
+            self.buffer.reopen()
+            self._thread = threading.Thread(target=self._run, name="microphone-capture", daemon=True)
+            self._thread.start()
+            logger.info("🎙️ Captura contínua do microfone iniciada")
+        if wait_calibration:
+            logger.info("Calibrando microfone para ruído ambiente...")
+            self._calibrated.wait(CALIBRATION_SECONDS * 5)
+            if self.error is not None:
+                raise RuntimeError(f"Falha na captura do microfone: {self.error}")
+            logger.info("Calibração concluída!")
+
+    def stop(self):
+        """Encerra a captura e fecha o microfone"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.buffer.close()
+
+    def reader(self, position: Optional[int] = None) -> RingReader:
+        """
+        Cria um leitor do buffer
+
+        Args:
+            position (int): Posição inicial (None: próximo bloco gravado)
+        """
+        if position is None:
+            position = self.buffer.written
+        return RingReader(self.buffer, max(position, self.buffer.oldest),
+                          timeout=max(1.0, self.seconds_per_frame * 10))
+
+    def recalibrate(self, window_seconds: float = RECALIBRATION_WINDOW_SECONDS):
+        """
+        Ajusta o limiar de energia pelo ruído de fundo dos blocos mais recentes
+
+        O ruído é um percentil baixo da energia da janela, o que ignora os
+        trechos de fala; o novo limiar é misturado ao anterior (damping).
+
+        Args:
+            window_seconds (float): Áudio recente considerado (segundos)
+        """
+        energies = self.buffer.recent_energies(self.seconds_to_frames(window_seconds) or 1)
+        if energies.size == 0:
+            return
+        noise = float(np.percentile(energies, NOISE_PERCENTILE))
+        target = max(MIN_ENERGY_THRESHOLD, noise * self.recognizer.dynamic_energy_ratio)
+        if self.calibrations == 0:
+            self.recognizer.energy_threshold = target
+        else:
+            self.recognizer.energy_threshold = (self.recognizer.energy_threshold * self.damping
+                                                + target * (1 - self.damping))
+        self.calibrations += 1
+
+    def _run(self):
+        """Laço da thread: lê o microfone, grava no buffer e recalibra"""
+        calibration_frames = max(1, self.seconds_to_frames(CALIBRATION_SECONDS))
+        try:
+            with self.microphone as source:
+                frames = 0
+                next_recalibration = None
+                while not self._stop.is_set():
+                    frame = source.stream.read(self.chunk)
+                    if not frame:
+                        continue
+                    self.buffer.write(frame, frame_energy(frame))
+                    frames += 1
+
+                    if frames == calibration_frames:
+                        self.recalibrate(CALIBRATION_SECONDS)
+                        self._calibrated.set()
+                        if self.recalibration_interval:
+                            next_recalibration = time.monotonic() + self.recalibration_interval
+                    elif next_recalibration is not None and time.monotonic() >= next_recalibration:
+                        self.recalibrate()
+                        next_recalibration = time.monotonic() + self.recalibration_interval
+        except Exception as e:
+            self.error = e
+            logger.error("❌ Erro na captura do microfone: %s", e)
+        finally:
+            self._calibrated.set()
+            self.buffer.close()
@@ -0,0 +1,250 @@
+"""
+Módulo de reprodução de áudio em memória usando pygame.mixer.Sound
+
+O áudio sintetizado é decodificado uma única vez para PCM em memória e
+tocado a partir do buffer, sem arquivos temporários. O fim da reprodução
+é sinalizado por um evento, sem laços de espera ativa.
+"""
+import io
+import threading
+import time
+import weakref
+from typing import Optional
+
+import numpy as np
+import pygame
+
+from tts_backends import PCMAudio, SynthesizedAudio, wav_to_pcm
+
+
+class PlaybackHandle:
+    """Controle de uma reprodução em andamento"""
+
+    def __init__(self, channel, sound, duration: float, started_at: Optional[float] = None):
+        """
+        Inicializa o controle e agenda o sinal de término
+
+        Args:
+            channel: Canal do pygame em que o som está tocando
+            sound: Som em reprodução (mantido vivo até o fim)
+            duration (float): Duração do som (segundos)
+            started_at (float): Início da reprodução (time.perf_counter); para um som
+                na fila do canal, o fim do som anterior (padrão: agora)
+        """
+        self.channel = channel
+        self.sound = sound
+        self.duration = duration
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.interrupted = False
+        self._done = threading.Event()
+        self._timer = threading.Timer(self.remaining, self._done.set)
+        self._timer.daemon = True
+        self._timer.start()
+
+    @property
+    def remaining(self) -> float:
+        """Tempo até o fim previsto da reprodução (segundos; 0 se já terminou)"""
+        if self._done.is_set():
+            return 0.0
+        return max(0.0, self.started_at + self.duration - time.perf_counter())
+
+    @property
+    def done(self) -> bool:
+        """Indica se a reprodução terminou ou foi interrompida"""
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Bloqueia até o fim da reprodução
+
+        Args:
+            timeout (float): Tempo máximo de espera (segundos)
+
+        Returns:
+            bool: True se a reprodução terminou
+        """
+        return self._done.wait(timeout)
+
+    def stop(self):
+        """Interrompe a reprodução imediatamente"""
+        if self._done.is_set():
+            return
+        self.interrupted = True
+        self._timer.cancel()
+        if self.channel is not None:
+            self.channel.stop()
+        self._done.set()
+
+
+class AudioPlayer:
+    """Classe para decodificar e reproduzir áudio a partir da memória"""
+
+    def __init__(self, frequency: int = 22050, channels: int = 2, buffer: int = 512, volume: float = 0.8):
+        """
+        Inicializa o mixer do pygame
+
+        Args:
+            frequency (int): Taxa de amostragem do mixer
+            channels (int): Número de canais do mixer
+            buffer (int): Tamanho do buffer do mixer (amostras)
+            volume (float): Volume da reprodução (0.0 a 1.0)
+        """
+        pygame.mixer.init(frequency=frequency, size=-16, channels=channels, buffer=buffer)
+        self.frequency, _, self.channels = pygame.mixer.get_init()
+        self.volume = volume
+        self._active = weakref.WeakSet()
+
+    def set_volume(self, volume: float):
+        """
+        Altera o volume das próximas reproduções
+
+        Args:
+            volume (float): Volume (0.0 a 1.0)
+        """
+        self.volume = max(0.0, min(1.0, volume))
+
+    def decode(self, audio: SynthesizedAudio) -> pygame.mixer.Sound:
+        """
+        Decodifica o áudio sintetizado para um som PCM em memória
+
+        Args:
+            audio (SynthesizedAudio): Áudio produzido por um motor de síntese
+
+        Returns:
+            pygame.mixer.Sound: Som pronto para tocar
+        """
+        if audio.audio_format == "wav":
+            return self._sound_from_pcm(wav_to_pcm(audio.data))
+
+        try:
+            # O SDL_mixer decodifica MP3/OGG direto do buffer em memória
+            return pygame.mixer.Sound(file=io.BytesIO(audio.data))
+        except pygame.error:
+            from pydub import AudioSegment
+
+            segment = AudioSegment.from_file(io.BytesIO(audio.data), format=audio.audio_format)
+            return self._sound_from_pcm(PCMAudio(
+                samples=segment.raw_data,
+                sample_rate=segment.frame_rate,
+                channels=segment.channels,
+                sample_width=segment.sample_width,
+            ))
+
+    def _sound_from_pcm(self, pcm: PCMAudio) -> pygame.mixer.Sound:
+        """Converte PCM para o formato do mixer e cria o som a partir do buffer"""
+        if pcm.sample_width != 2:
+            raise ValueError(f"Apenas PCM de 16 bits é suportado (recebido: {pcm.sample_width * 8} bits)")
+
+        samples = np.frombuffer(pcm.samples, dtype=np.int16).reshape(-1, pcm.channels)
+
+        if pcm.sample_rate != self.frequency and len(samples) > 0:
+            n_out = int(round(len(samples) * self.frequency / pcm.sample_rate))
+            positions = np.linspace(0, len(samples) - 1, n_out)
+            samples = np.stack(
+                [np.interp(positions, np.arange(len(samples)), samples[:, c]) for c in range(pcm.channels)],
+                axis=1,
+            ).astype(np.int16)
+
+        if pcm.channels != self.channels:
+            mono = samples.mean(axis=1, keepdims=True).astype(np.int16)
+            samples = np.repeat(mono, self.channels, axis=1)
+
+        return pygame.mixer.Sound(buffer=np.ascontiguousarray(samples).tobytes())
+
+    def play(self, sound: pygame.mixer.Sound, volume: Optional[float] = None,
+             after: Optional[PlaybackHandle] = None) -> PlaybackHandle:
+        """
+        Inicia a reprodução de um som sem bloquear
+
+        Com `after`, o som é colocado na fila do canal da reprodução anterior
+        e o mixer o emenda ao fim dela, sem intervalo. Se o canal já tiver um
+        som na fila (ou não existir), espera o fim da anterior e toca depois.
+
+        Args:
+            sound (pygame.mixer.Sound): Som decodificado
+            volume (float): Volume desta reprodução (padrão: volume do player)
+            after (PlaybackHandle): Reprodução que deve terminar antes deste som
+
+        Returns:
+            PlaybackHandle: Controle da reprodução
+        """
+        sound.set_volume(self.volume if volume is None else volume)
+        if after is not None and not after.done and after.channel is not None \
+                and after.channel.get_queue() is None:
+            after.channel.queue(sound)
+            started_at = max(time.perf_counter(), after.started_at + after.duration)
+            handle = PlaybackHandle(after.channel, sound, sound.get_length(), started_at)
+        else:
+            if after is not None:
+                after.wait()
+            channel = sound.play()
+            handle = PlaybackHandle(channel, sound, sound.get_length())
+        self._active.add(handle)
+        return handle
+
+    def play_and_wait(self, audio: SynthesizedAudio) -> PlaybackHandle:
+        """
+        Decodifica, reproduz e aguarda o fim de um áudio
+
+        Args:
+            audio (SynthesizedAudio): Áudio produzido por um motor de síntese
+
+        Returns:
+            PlaybackHandle: Controle da reprodução já concluída
+        """
+        handle = self.play(self.decode(audio))
+        handle.wait()
+        return handle
+
+    def stop_all(self):
+        """Interrompe todas as reproduções"""
+        for handle in list(self._active):
+            handle.stop()
+        pygame.mixer.stop()
+
+    def quit(self):
+        """Libera o mixer do pygame"""
+        self.stop_all()
+        pygame.mixer.quit()
+
+
+class NullAudioPlayer(AudioPlayer):
+    """
+    Player que descarta o áudio, sem abrir o mixer (benchmarks e máquinas sem saída de som)
+
+    A reprodução termina imediatamente; a duração dos áudios WAV recebidos
+    é somada em `played_seconds` (para o fator de tempo real da síntese).
+    """
+
+    def __init__(self, volume: float = 0.8):
+        self.frequency = 22050
+        self.channels = 2
+        self.volume = volume
+        self.played_seconds = 0.0
+        self._active = weakref.WeakSet()
+
+    def decode(self, audio: SynthesizedAudio) -> float:
+        """
+        Calcula a duração do áudio sem decodificá-lo
+
+        Returns:
+            float: Duração em segundos (0.0 para formatos comprimidos)
+        """
+        if audio.audio_format != "wav":
+            return 0.0
+        pcm = wav_to_pcm(audio.data)
+        return len(pcm.samples) / (pcm.sample_rate * pcm.channels * pcm.sample_width)
+
+    def play(self, sound: float, volume: Optional[float] = None,
+             after: Optional[PlaybackHandle] = None) -> PlaybackHandle:
+        """Descarta o áudio e devolve um controle já concluído"""
+        self.played_seconds += sound
+        handle = PlaybackHandle(None, None, 0.0)
+        handle.wait()
+        return handle
+
+    def stop_all(self):
+        """Nada a interromper"""
+
+    def quit(self):
+        """Nada a liberar"""
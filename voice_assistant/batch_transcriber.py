@@ -0,0 +1,227 @@
+"""
+Módulo para transcrição em lote de arquivos de áudio gravados usando Whisper
+
+Uso:
+    python batch_transcriber.py gravacoes/ --saida transcricoes.jsonl --lote 8
+"""
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+import torch
+import whisper
+
+from whisper_models import load_whisper_model
+
+# Extensões de áudio aceitas ao percorrer diretórios
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".flac", ".ogg", ".m4a"}
+
+# Duração fixa dos segmentos processados pelo Whisper (30 s)
+SEGMENT_SECONDS = whisper.audio.CHUNK_LENGTH
+SEGMENT_SAMPLES = whisper.audio.N_SAMPLES
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+
+class _FileJob:
+    """Acompanha os segmentos pendentes de um arquivo durante o lote"""
+
+    def __init__(self, path: Path, duration: float, n_segments: int, load_seconds: float):
+        self.path = path
+        self.duration = duration
+        self.load_seconds = load_seconds
+        self.decode_seconds = 0.0
+        self.texts: List[Optional[str]] = [None] * n_segments
+        self.remaining = n_segments
+
+    def to_record(self) -> dict:
+        """Monta o registro JSONL do arquivo transcrito"""
+        segments = []
+        for index, text in enumerate(self.texts):
+            start = index * SEGMENT_SECONDS
+            segments.append({
+                "inicio": start,
+                "fim": min(start + SEGMENT_SECONDS, self.duration),
+                "texto": text,
+            })
+        return {
+            "arquivo": str(self.path),
+            "texto": " ".join(t for t in self.texts if t),
+            "duracao_audio": round(self.duration, 3),
+            "tempo_carregamento": round(self.load_seconds, 3),
+            "tempo_decodificacao": round(self.decode_seconds, 3),
+            "segmentos": segments,
+        }
+
+
+class BatchTranscriber:
+    """Classe para transcrição offline de muitos arquivos em lotes"""
+
+    def __init__(self, whisper_model, batch_size: int = 8, language: Optional[str] = None):
+        """
+        Inicializa o transcritor em lote
+
+        Args:
+            whisper_model: Modelo Whisper já carregado (reutilizado, não é recarregado)
+            batch_size (int): Quantidade de segmentos de 30 s por passada do modelo
+            language (str): Código do idioma (ex: 'pt'); None para detecção automática
+        """
+        self.whisper_model = whisper_model
+        self.batch_size = max(1, batch_size)
+        self.options = whisper.DecodingOptions(
+            language=language,
+            without_timestamps=True,
+            fp16=whisper_model.device.type == "cuda",
+        )
+
+    @staticmethod
+    def collect_audio_files(paths: Iterable[str]) -> List[Path]:
+        """
+        Expande arquivos e diretórios em uma lista ordenada de arquivos de áudio
+
+        Args:
+            paths: Caminhos de arquivos ou diretórios
+
+        Returns:
+            list: Arquivos de áudio encontrados
+        """
+        files = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                files.extend(
+                    sorted(p for p in path.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS)
+                )
+            elif path.is_file():
+                files.append(path)
+            else:
+                logger.warning("⚠️ Caminho não encontrado: %s", path)
+        return files
+
+    def _segments_to_mel(self, segments: List[torch.Tensor]) -> torch.Tensor:
+        """Completa cada segmento até 30 s e empilha os log-mel em um único tensor"""
+        n_mels = self.whisper_model.dims.n_mels
+        mels = [
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(segment), n_mels)
+            for segment in segments
+        ]
+        return torch.stack(mels).to(self.whisper_model.device)
+
+    def transcribe_batch(self, segments: List[torch.Tensor]) -> List[str]:
+        """
+        Transcreve segmentos de até 30 s com uma única passada do modelo
+
+        Args:
+            segments (list): Áudios mono a 16 kHz (tensores float32)
+
+        Returns:
+            list: Texto transcrito de cada segmento, na mesma ordem
+        """
+        if not segments:
+            return []
+        mel = self._segments_to_mel(segments)
+        results = whisper.decode(self.whisper_model, mel, self.options)
+        return [result.text.strip() for result in results]
+
+    def _iter_segments(self, files: List[Path]) -> Iterator[tuple]:
+        """Carrega os arquivos um a um e emite (job, índice, segmento)"""
+        for path in files:
+            start = time.perf_counter()
+            try:
+                audio = torch.from_numpy(whisper.load_audio(str(path)))
+            except Exception as e:
+                logger.error("❌ Erro ao carregar %s: %s", path, e)
+                continue
+            load_seconds = time.perf_counter() - start
+
+            n_segments = max(1, -(-audio.shape[0] // SEGMENT_SAMPLES))
+            job = _FileJob(path, audio.shape[0] / SAMPLE_RATE, n_segments, load_seconds)
+            for index in range(n_segments):
+                yield job, index, audio[index * SEGMENT_SAMPLES:(index + 1) * SEGMENT_SAMPLES]
+
+    def transcribe_files(self, paths: Iterable[str], output_path: Optional[str] = None) -> List[dict]:
+        """
+        Transcreve arquivos e diretórios de áudio em lotes
+
+        Args:
+            paths: Arquivos WAV/MP3 ou diretórios
+            output_path (str): Arquivo JSONL de saída (opcional)
+
+        Returns:
+            list: Registros de transcrição de cada arquivo
+        """
+        files = self.collect_audio_files(paths)
+        logger.info("📂 %d arquivo(s) de áudio para transcrever", len(files))
+
+        records = []
+        output = open(output_path, "w", encoding="utf-8") if output_path else None
+        wall_start = time.perf_counter()
+
+        def finish(job: _FileJob):
+            record = job.to_record()
+            records.append(record)
+            if output:
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+            logger.info("✅ %s (%.1fs de áudio)", job.path, job.duration)
+
+        def flush(batch: list):
+            start = time.perf_counter()
+            texts = self.transcribe_batch([segment for _, _, segment in batch])
+            per_segment = (time.perf_counter() - start) / len(batch)
+            for (job, index, _), text in zip(batch, texts):
+                job.texts[index] = text
+                job.decode_seconds += per_segment
+                job.remaining -= 1
+                if job.remaining == 0:
+                    finish(job)
+
+        try:
+            batch = []
+            for item in self._iter_segments(files):
+                batch.append(item)
+                if len(batch) == self.batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+        finally:
+            if output:
+                output.close()
+
+        wall_seconds = time.perf_counter() - wall_start
+        audio_seconds = sum(record["duracao_audio"] for record in records)
+        throughput = audio_seconds / wall_seconds if wall_seconds > 0 else 0.0
+        print(
+            f"\n📊 {audio_seconds:.1f}s de áudio em {wall_seconds:.1f}s "
+            f"({throughput:.1f} s de áudio por segundo)"
+        )
+        return records
+
+
+def main():
+    """Função principal"""
+    from tracing import configure_logging
+
+    parser = argparse.ArgumentParser(description="Transcrição em lote de arquivos de áudio")
+    parser.add_argument("caminhos", nargs="+", help="Arquivos de áudio ou diretórios")
+    parser.add_argument("--saida", default="transcricoes.jsonl", help="Arquivo JSONL de saída")
+    parser.add_argument("--modelo", default="base", help="Modelo Whisper")
+    parser.add_argument("--lote", type=int, default=8, help="Segmentos de 30 s por lote")
+    parser.add_argument("--idioma", default=None, help="Código do idioma (ex: pt)")
+    parser.add_argument("--int8", action="store_true", help="Quantiza o modelo para int8 (CPU)")
+    args = parser.parse_args()
+    configure_logging()
+
+    model = load_whisper_model(args.modelo, quantize=args.int8)
+
+    transcriber = BatchTranscriber(model, batch_size=args.lote, language=args.idioma)
+    transcriber.transcribe_files(args.caminhos, output_path=args.saida)
+    print(f"Transcrições salvas em: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1009 @@
+"""
+Benchmarks de desempenho do assistente de voz
+
+Uso:
+    python benchmark.py transcricao --audio exemplo.wav --repeticoes 5 --int8
+    python benchmark.py decodificacao --audios frase1.wav frase2.wav --presets rapido preciso
+    python benchmark.py pool --audio exemplo.wav --max-processos 4 --requisicoes 16
+    python benchmark.py resposta --pergunta "Qual a capital do Brasil?"
+    python benchmark.py tts --motores gtts espeak
+    python benchmark.py leitura --arquivo livro.txt --sinteses 3 --antecipacao 4
+    python benchmark.py carga --slots 2 --concorrencia 1 2 4 --requisicoes 8
+    python benchmark.py ponta-a-ponta --gerar-fixtures --salvar-referencia referencia.json
+    python benchmark.py ponta-a-ponta --referencia referencia.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+# Adiciona o diretório atual ao path para importações
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _summarize(latencies: list) -> dict:
+    """
+    Resume uma lista de latências
+
+    Args:
+        latencies (list): Latências em segundos
+
+    Returns:
+        dict: Média, mediana, mínimo e máximo em milissegundos
+    """
+    return {
+        "media_ms": statistics.mean(latencies) * 1000,
+        "mediana_ms": statistics.median(latencies) * 1000,
+        "min_ms": min(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def _print_summary(label: str, summary: dict):
+    """Imprime o resumo de latências de um cenário"""
+    print(
+        f"{label:<12} média {summary['media_ms']:8.1f} ms | "
+        f"mediana {summary['mediana_ms']:8.1f} ms | "
+        f"mín {summary['min_ms']:8.1f} ms | máx {summary['max_ms']:8.1f} ms"
+    )
+
+
+def benchmark_transcription(audio_path: str, model_name: str = "base", repetitions: int = 5,
+                            quantize: bool = False) -> dict:
+    """
+    Compara a latência por frase da transcrição em memória e via arquivo temporário
+
+    Args:
+        audio_path (str): Arquivo WAV com uma frase falada
+        model_name (str): Modelo Whisper a ser usado
+        repetitions (int): Número de repetições por cenário
+        quantize (bool): Se True, usa o modelo quantizado para int8
+
+    Returns:
+        dict: Resumo de latências por cenário
+    """
+    import speech_recognition as sr
+    from voice_recognizer import VoiceRecognizer
+
+    recognizer = VoiceRecognizer(model_name=model_name, use_microphone=False, quantize=quantize)
+
+    with sr.AudioFile(audio_path) as source:
+        audio = recognizer.recognizer.record(source)
+
+    # Aquecimento para não medir a primeira execução do modelo
+    recognizer.transcribe_audio(audio, in_memory=True)
+
+    results = {}
+    for label, in_memory in (("memória", True), ("arquivo", False)):
+        latencies = []
+        for _ in range(repetitions):
+            start = time.perf_counter()
+            recognizer.transcribe_audio(audio, in_memory=in_memory)
+            latencies.append(time.perf_counter() - start)
+        results[label] = _summarize(latencies)
+
+    label = recognizer.model_name + (" int8" if quantize else "")
+    print(f"\n⏱️ Transcrição por frase ({audio_path}, modelo '{label}', {repetitions} repetições)")
+    for label, summary in results.items():
+        _print_summary(label, summary)
+
+    return results
+
+
+def _normalize_words(text: str) -> list:
+    """Palavras em minúsculas e sem pontuação, para o cálculo da taxa de erro"""
+    import re
+    return re.findall(r"\w+", text.lower())
+
+
+def _word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Taxa de erro de palavras (substituições + inserções + remoções) / palavras da referência
+
+    Args:
+        reference (str): Transcrição correta
+        hypothesis (str): Transcrição obtida
+
+    Returns:
+        float: Taxa de erro (0.0 = transcrição perfeita)
+    """
+    reference_words = _normalize_words(reference)
+    hypothesis_words = _normalize_words(hypothesis)
+    previous = list(range(len(hypothesis_words) + 1))
+    for i, reference_word in enumerate(reference_words, 1):
+        current = [i]
+        for j, hypothesis_word in enumerate(hypothesis_words, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (reference_word != hypothesis_word)))
+        previous = current
+    return previous[-1] / max(1, len(reference_words))
+
+
+def benchmark_decoding(audio_paths: list, model_name: str = "base", presets: list = None,
+                       repetitions: int = 2, quantize: bool = False) -> dict:
+    """
+    Compara latência e precisão dos presets de decodificação do Whisper
+
+    Cada arquivo de áudio deve ter ao lado um .txt com a transcrição correta
+    (ex: frase.wav e frase.txt); sem ele, apenas a latência é medida.
+
+    Args:
+        audio_paths (list): Arquivos de áudio com uma frase falada cada
+        model_name (str): Modelo Whisper a ser usado
+        presets (list): Presets comparados (None compara todos)
+        repetitions (int): Repetições de cada arquivo por preset
+        quantize (bool): Se True, usa o modelo quantizado para int8
+
+    Returns:
+        dict: Latência média, fator de tempo real e taxa de erro de palavras por preset
+    """
+    import whisper
+    from decoding_presets import PRESETS, transcribe_options
+    from whisper_models import WHISPER_SAMPLE_RATE, load_whisper_model
+
+    model = load_whisper_model(model_name, quantize=quantize)
+    samples = []
+    for audio_path in audio_paths:
+        reference_path = Path(audio_path).with_suffix(".txt")
+        reference = reference_path.read_text(encoding="utf-8").strip() if reference_path.exists() else None
+        samples.append((whisper.load_audio(audio_path), reference))
+    audio_seconds = sum(len(audio) for audio, _ in samples) / WHISPER_SAMPLE_RATE
+
+    # Aquecimento para não medir a primeira execução do modelo
+    model.transcribe(samples[0][0], **transcribe_options(device=model.device.type))
+
+    results = {}
+    print(f"\n⏱️ Presets de decodificação ({len(samples)} arquivo(s), {audio_seconds:.1f} s de áudio, "
+          f"modelo '{model_name}'{' int8' if quantize else ''})")
+    for preset in presets or list(PRESETS):
+        options = transcribe_options(preset, device=model.device.type)
+        latencies = []
+        errors = []
+        for audio, reference in samples:
+            for _ in range(repetitions):
+                start = time.perf_counter()
+                text = model.transcribe(audio, **options)["text"].strip()
+                latencies.append(time.perf_counter() - start)
+            if reference is not None:
+                errors.append(_word_error_rate(reference, text))
+
+        summary = _summarize(latencies)
+        summary["fator_tempo_real"] = sum(latencies) / repetitions / audio_seconds
+        summary["wer"] = statistics.mean(errors) if errors else None
+        results[preset] = summary
+
+        wer = f"{summary['wer'] * 100:5.1f}%" if summary["wer"] is not None else "  n/d"
+        print(f"{preset:<15} média {summary['media_ms']:8.1f} ms | "
+              f"fator {summary['fator_tempo_real']:5.2f} | WER {wer}")
+
+    return results
+
+
+def benchmark_pool(audio_path: str, model_name: str = "base", max_workers: int = 4,
+                   requests: int = 16, threads_per_worker: int = 1) -> dict:
+    """
+    Mede a vazão do pool de transcrição variando o número de processos
+
+    Args:
+        audio_path (str): Arquivo de áudio usado em todas as requisições
+        model_name (str): Modelo Whisper de cada processo
+        max_workers (int): Número máximo de processos avaliado
+        requests (int): Requisições enviadas em cada cenário
+        threads_per_worker (int): Threads do torch por processo
+
+    Returns:
+        dict: Vazão (requisições por segundo) por número de processos
+    """
+    import whisper
+    from transcription_pool import TranscriptionPool
+
+    audio = whisper.load_audio(audio_path)
+    results = {}
+
+    print(f"\n⏱️ Pool de transcrição ({requests} requisições, {threads_per_worker} thread(s) por processo)")
+    for workers in range(1, max_workers + 1):
+        with TranscriptionPool(model_name=model_name, workers=workers,
+                               threads_per_worker=threads_per_worker) as pool:
+            # Aquecimento de cada processo
+            list(pool.transcribe_many([audio] * workers))
+
+            start = time.perf_counter()
+            list(pool.transcribe_many([audio] * requests))
+            elapsed = time.perf_counter() - start
+
+        results[workers] = requests / elapsed
+        speedup = results[workers] / results[1]
+        print(f"{workers} processo(s): {results[workers]:6.2f} req/s | aceleração {speedup:4.2f}x")
+
+    return results
+
+
+def _synthesis_seconds(text: str, language: str = "pt-br") -> float:
+    """Mede o tempo de síntese de um texto com gTTS, sem reproduzir"""
+    from tts_backends import GTTSBackend
+
+    start = time.perf_counter()
+    GTTSBackend().synthesize(text, language)
+    return time.perf_counter() - start
+
+
+def benchmark_response(question: str, repetitions: int = 3) -> dict:
+    """
+    Compara o tempo até o primeiro áudio da resposta completa e da resposta em streaming
+
+    No modo completo o primeiro áudio depende da geração inteira e da síntese
+    de toda a resposta; no modo streaming, apenas da primeira frase.
+
+    Args:
+        question (str): Pergunta enviada à LLM
+        repetitions (int): Número de repetições por cenário
+
+    Returns:
+        dict: Resumo do tempo até o primeiro áudio por cenário
+    """
+    from llm_manager import LLMManager
+    from text_segmenter import SentenceSegmenter
+
+    # Sem o cache de respostas: as repetições mediriam consultas ao cache
+    llm_manager = LLMManager(use_response_cache=False)
+    blocking, streaming = [], []
+
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        response = llm_manager.generate_response(question)
+        generation = time.perf_counter() - start
+        blocking.append(generation + _synthesis_seconds(response))
+
+        segmenter = SentenceSegmenter(min_length=4)
+        start = time.perf_counter()
+        first_sentence = None
+        for token in llm_manager.generate_response_stream(question):
+            sentences = segmenter.feed(token)
+            if sentences:
+                first_sentence = sentences[0]
+                break
+        first_sentence = first_sentence or segmenter.flush() or response
+        generation = time.perf_counter() - start
+        streaming.append(generation + _synthesis_seconds(first_sentence))
+
+    results = {"completa": _summarize(blocking), "streaming": _summarize(streaming)}
+
+    print(f"\n⏱️ Tempo até o primeiro áudio ({repetitions} repetições)")
+    for label, summary in results.items():
+        _print_summary(label, summary)
+
+    return results
+
+
+# Frases usadas no benchmark de síntese
+TTS_SENTENCES = [
+    "Olá! Como posso ajudar?",
+    "A capital do Brasil é Brasília, fundada em mil novecentos e sessenta.",
+    "Desculpe, não consegui entender. Pode repetir, por favor?",
+]
+
+
+def benchmark_tts(engines: list, repetitions: int = 3, language: str = "pt-br") -> dict:
+    """
+    Compara a latência de síntese dos motores de voz (sem cache e sem reprodução)
+
+    Args:
+        engines (list): Nomes dos motores a comparar
+        repetitions (int): Repetições de cada frase
+        language (str): Idioma da síntese
+
+    Returns:
+        dict: Resumo de latências por motor
+    """
+    from tts_backends import create_backend
+
+    results = {}
+    for name in engines:
+        backend = create_backend(name)
+        if not backend.is_available():
+            print(f"⚠️ Motor '{name}' indisponível, ignorando")
+            continue
+
+        latencies = []
+        try:
+            for _ in range(repetitions):
+                for sentence in TTS_SENTENCES:
+                    start = time.perf_counter()
+                    backend.synthesize(sentence, language)
+                    latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            print(f"❌ Motor '{name}' falhou: {e}")
+            continue
+        results[name] = _summarize(latencies)
+
+    print(f"\n⏱️ Síntese por frase ({len(TTS_SENTENCES)} frases x {repetitions} repetições)")
+    for label, summary in results.items():
+        _print_summary(label, summary)
+
+    return results
+
+
+def benchmark_long_text(text_path: str, workers: int = 3, look_ahead: int = 4, engine: str = "gtts") -> dict:
+    """
+    Compara a leitura de um texto longo de uma vez e em trechos sintetizados em paralelo
+
+    O cache de áudio é desativado para que as duas leituras sintetizem tudo.
+
+    Args:
+        text_path (str): Arquivo de texto lido
+        workers (int): Sínteses simultâneas da leitura em trechos
+        look_ahead (int): Trechos sintetizados à frente da reprodução
+        engine (str): Motor de síntese
+
+    Returns:
+        dict: Tempo até o primeiro áudio e tempo total de cada cenário
+    """
+    from long_form_reader import LongFormReader, split_chunks
+    from voice_synthesizer import VoiceSynthesizer
+
+    with open(text_path, "r", encoding="utf-8") as text_file:
+        text = text_file.read()
+    synthesizer = VoiceSynthesizer(use_cache=False, backend=engine, fallback_backends=())
+
+    results = {}
+    try:
+        # Caminho anterior: o texto inteiro em uma única síntese
+        start = time.perf_counter()
+        synthesizer.text_to_speech(text)
+        results["inteiro"] = {
+            "primeiro_audio_s": synthesizer.last_playback_started_at - start,
+            "total_s": time.perf_counter() - start,
+        }
+
+        report = LongFormReader(synthesizer, workers=workers, look_ahead=look_ahead).read(split_chunks(text))
+        results["trechos"] = {
+            "primeiro_audio_s": report.time_to_first_audio,
+            "total_s": report.total_seconds,
+        }
+    finally:
+        synthesizer.cleanup()
+
+    print(f"\n⏱️ Leitura de texto longo ({len(text)} caracteres, motor '{engine}', "
+          f"{workers} sínteses simultâneas, antecipação {look_ahead})")
+    for label, summary in results.items():
+        print(f"{label:<10} primeiro áudio {summary['primeiro_audio_s']:7.2f} s | total {summary['total_s']:7.1f} s")
+
+    return results
+
+
+# Perguntas enviadas pelos clientes simulados no teste de carga
+LOAD_TEST_QUESTIONS = [
+    "Qual a capital do Brasil?",
+    "Me dê uma dica para dormir melhor.",
+    "O que é fotossíntese?",
+    "Como faço um café coado?",
+]
+
+
+def _percentile(values: list, fraction: float) -> float:
+    """Percentil (por posição) de uma lista de valores"""
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+def benchmark_load(slots: int = 2, concurrency_levels: list = None, requests: int = 8,
+                   max_new_tokens: int = 64) -> dict:
+    """
+    Teste de carga do servidor de inferência com clientes simultâneos
+
+    Cada cliente é uma sessão que envia suas perguntas uma após a outra;
+    o número de clientes aumenta a cada cenário.
+
+    Args:
+        slots (int): Slots (gerações simultâneas) do servidor
+        concurrency_levels (list): Quantidades de clientes simultâneos avaliadas
+        requests (int): Requisições enviadas por cliente
+        max_new_tokens (int): Máximo de tokens por resposta
+
+    Returns:
+        dict: Tokens/s e latências p50/p95 por nível de concorrência
+    """
+    from llm_manager import LLMManager
+
+    llm_manager = LLMManager(use_response_cache=False)
+    prompts = [llm_manager.format_prompt(question) for question in LOAD_TEST_QUESTIONS]
+    results = {}
+
+    with llm_manager.create_inference_server(slots=slots, max_queue=1024) as server:
+        print(f"\n⏱️ Carga no servidor de inferência ({slots} slot(s), {requests} requisições por cliente)")
+        for clients in concurrency_levels or [1, 2, 4]:
+            finished = []
+            lock = threading.Lock()
+
+            def client(index: int):
+                for i in range(requests):
+                    request = server.submit(prompts[(index + i) % len(prompts)], session_id=f"cliente-{index}",
+                                            max_new_tokens=max_new_tokens)
+                    request.result()
+                    with lock:
+                        finished.append(request)
+
+            start = time.perf_counter()
+            threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            latencies = [request.latency for request in finished]
+            first_tokens = [request.time_to_first_token for request in finished if request.time_to_first_token]
+            results[clients] = {
+                "tokens_por_segundo": sum(request.tokens for request in finished) / elapsed,
+                "latencia_p50_ms": _percentile(latencies, 0.50) * 1000,
+                "latencia_p95_ms": _percentile(latencies, 0.95) * 1000,
+                "primeiro_token_p50_ms": _percentile(first_tokens, 0.50) * 1000 if first_tokens else 0.0,
+            }
+            summary = results[clients]
+            print(f"{clients:>3} cliente(s): {summary['tokens_por_segundo']:7.1f} tokens/s | "
+                  f"p50 {summary['latencia_p50_ms']:8.1f} ms | p95 {summary['latencia_p95_ms']:8.1f} ms | "
+                  f"1º token p50 {summary['primeiro_token_p50_ms']:7.1f} ms")
+
+    return results
+
+
+# Frases gravadas (ou sintetizadas) do benchmark ponta a ponta e suas respostas
+E2E_FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "e2e"
+E2E_MANIFEST = "frases.json"
+
+# Etapas exibidas no relatório ponta a ponta, na ordem da interação
+E2E_STAGES = ("transcricao", "llm", "llm.prompt", "llm.geracao", "tts", "reproducao")
+E2E_TOTAL = "ponta_a_ponta"
+
+# Piora tolerada em relação à referência antes de acusar regressão
+REGRESSION_TOLERANCE = 0.20
+# Diferença mínima de latência para acusar regressão (evita ruído em etapas curtas)
+REGRESSION_MIN_DELTA_MS = 5.0
+# Aumento tolerado da taxa de erro de palavras (absoluto)
+REGRESSION_WER_DELTA = 0.05
+
+
+@dataclass
+class E2EFixture:
+    """Frase falada do benchmark ponta a ponta"""
+    path: Path
+    text: str
+    response: str
+    sha256: Optional[str] = None
+
+
+def _sha256_file(path: Path) -> str:
+    """Calcula o SHA-256 de um arquivo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_e2e_fixtures(fixtures_dir=E2E_FIXTURES_DIR) -> tuple:
+    """
+    Lê o manifesto das frases do benchmark ponta a ponta
+
+    Args:
+        fixtures_dir: Diretório com frases.json e os arquivos WAV
+
+    Returns:
+        tuple: (idioma, lista de E2EFixture)
+    """
+    fixtures_dir = Path(fixtures_dir)
+    with open(fixtures_dir / E2E_MANIFEST, "r", encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    fixtures = [
+        E2EFixture(fixtures_dir / entry["arquivo"], entry["texto"], entry["resposta"], entry.get("sha256"))
+        for entry in manifest["frases"]
+    ]
+    return manifest.get("idioma", "pt-br"), fixtures
+
+
+def generate_e2e_fixtures(fixtures_dir=E2E_FIXTURES_DIR, overwrite: bool = False) -> int:
+    """
+    Sintetiza com o espeak-ng os arquivos WAV das frases que ainda não existem
+
+    O SHA-256 de cada WAV é gravado em frases.json (só nas frases que ainda
+    não têm um, ou em todas com overwrite), para que todas as máquinas meçam
+    o mesmo áudio: outra versão do espeak-ng gera arquivos diferentes, que o
+    benchmark recusa. Gravações reais com o mesmo nome podem substituir os
+    arquivos gerados, apagando o sha256 delas do manifesto.
+
+    Args:
+        fixtures_dir: Diretório das frases
+        overwrite (bool): Se True, gera de novo os arquivos existentes
+
+    Returns:
+        int: Arquivos gerados
+    """
+    import wave
+    from tts_backends import EspeakBackend, wav_to_pcm
+
+    backend = EspeakBackend()
+    if not backend.is_available():
+        raise RuntimeError("espeak-ng não encontrado. Instale com: sudo apt install espeak-ng")
+
+    language, fixtures = load_e2e_fixtures(fixtures_dir)
+    created = 0
+    for fixture in fixtures:
+        if fixture.path.exists() and not overwrite:
+            continue
+        # Regrava o WAV: pela saída padrão, o espeak não sabe o tamanho do áudio no cabeçalho
+        pcm = wav_to_pcm(backend.synthesize(fixture.text, language))
+        with wave.open(str(fixture.path), "wb") as wav_file:
+            wav_file.setnchannels(pcm.channels)
+            wav_file.setsampwidth(pcm.sample_width)
+            wav_file.setframerate(pcm.sample_rate)
+            wav_file.writeframes(pcm.samples)
+        created += 1
+
+    # Registra o checksum dos áudios no manifesto
+    manifest_path = Path(fixtures_dir) / E2E_MANIFEST
+    with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    changed = False
+    for entry, fixture in zip(manifest["frases"], fixtures):
+        if fixture.path.exists() and (overwrite or not entry.get("sha256")):
+            entry["sha256"] = _sha256_file(fixture.path)
+            changed = True
+    if changed:
+        _save_json(manifest_path, manifest)
+    return created
+
+
+class DeterministicLLM:
+    """
+    Modelo determinístico com a interface do ctransformers, para benchmarks sem GGUF
+
+    Responde com o texto registrado para a pergunta contida no prompt (ou
+    uma resposta padrão), simulando o custo da avaliação do prompt por
+    palavra e o de cada token gerado.
+    """
+
+    def __init__(self, answers: dict, default_answer: str = "Desculpe, não sei responder isso.",
+                 prompt_seconds_per_word: float = 0.002, seconds_per_token: float = 0.02):
+        """
+        Args:
+            answers (dict): Respostas por pergunta
+            default_answer (str): Resposta para perguntas não registradas
+            prompt_seconds_per_word (float): Custo simulado do prompt por palavra
+            seconds_per_token (float): Custo simulado de cada token gerado
+        """
+        self.answers = {" ".join(_normalize_words(question)): answer for question, answer in answers.items()}
+        self.default_answer = default_answer
+        self.prompt_seconds_per_word = prompt_seconds_per_word
+        self.seconds_per_token = seconds_per_token
+        # O LLMManager lê os tokens em streaming de llm.client
+        self.client = self
+
+    def __call__(self, prompt, stream: bool = False, **kwargs):
+        # A cadeia do LangChain entrega um PromptValue; o streaming, o texto
+        prompt = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+        tokens = self._generate(prompt)
+        return tokens if stream else "".join(tokens)
+
+    def _answer(self, prompt: str) -> str:
+        """Resposta registrada para a pergunta do prompt"""
+        normalized = " ".join(_normalize_words(prompt))
+        for question, answer in self.answers.items():
+            if question in normalized:
+                return answer
+        return self.default_answer
+
+    def _generate(self, prompt: str) -> Iterator[str]:
+        """Gera a resposta palavra a palavra"""
+        import re
+
+        answer = self._answer(prompt)
+        time.sleep(len(prompt.split()) * self.prompt_seconds_per_word)
+        for token in re.findall(r"\s*\S+", answer):
+            time.sleep(self.seconds_per_token)
+            yield token
+
+
+class _StageCollector:
+    """Soma a duração das etapas de cada interação a partir dos spans encerrados"""
+
+    def __init__(self):
+        self.stages = defaultdict(lambda: defaultdict(float))
+        self._lock = threading.Lock()
+
+    def __call__(self, span):
+        if span.interaction is None:
+            return
+        with self._lock:
+            self.stages[span.interaction][span.name] += span.duration
+
+
+def _peak_rss_mb() -> float:
+    """Pico de memória residente do processo (MB; ru_maxrss vem em KB no Linux)"""
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _latency_stats(latencies: list) -> dict:
+    """Percentis de uma lista de latências em segundos"""
+    return {
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "media_ms": statistics.mean(latencies) * 1000,
+        "amostras": len(latencies),
+    }
+
+
+def benchmark_e2e(fixtures_dir=E2E_FIXTURES_DIR, whisper_model: str = "tiny", decoding: str = None,
+                  llm_path: str = None, tts_engine: str = "espeak", repetitions: int = 3,
+                  warmup: int = 1) -> dict:
+    """
+    Benchmark ponta a ponta: frases gravadas -> Whisper -> LLM -> síntese -> saída nula
+
+    Cada frase passa pelo VoiceRecognizer (sem microfone), pelo LLMManager
+    (com um GGUF pequeno ou o modelo determinístico) e pelo VoiceSynthesizer
+    com um player que descarta o áudio, sem cache. As latências vêm dos
+    spans do rastreamento; tudo roda na CPU, sem dispositivo de áudio.
+
+    Args:
+        fixtures_dir: Diretório com frases.json e os arquivos WAV
+        whisper_model (str): Modelo Whisper
+        decoding (str): Preset de decodificação (None usa o padrão)
+        llm_path (str): Modelo GGUF (None usa o modelo determinístico)
+        tts_engine (str): Motor de síntese
+        repetitions (int): Repetições de cada frase
+        warmup (int): Interações descartadas antes das medições
+
+    Returns:
+        dict: Percentis por etapa, fator de tempo real, taxa de erro de palavras e memória
+    """
+    import platform
+
+    import speech_recognition as sr
+    from audio_player import NullAudioPlayer
+    from llm_manager import ERROR_RESPONSE, LLMManager
+    from tracing import INTERACTION_SPAN, tracer
+    from voice_recognizer import VoiceRecognizer
+    from voice_synthesizer import VoiceSynthesizer
+
+    language, fixtures = load_e2e_fixtures(fixtures_dir)
+    missing = [fixture.path.name for fixture in fixtures if not fixture.path.exists()]
+    if missing:
+        raise FileNotFoundError(f"Áudios ausentes: {', '.join(missing)}. "
+                                f"Gere com: python benchmark.py ponta-a-ponta --gerar-fixtures")
+    checksums = {fixture.path.name: _sha256_file(fixture.path) for fixture in fixtures}
+    different = [fixture.path.name for fixture in fixtures
+                 if fixture.sha256 and fixture.sha256 != checksums[fixture.path.name]]
+    if different:
+        raise ValueError(f"Áudios diferentes dos registrados em {E2E_MANIFEST}: {', '.join(different)}. "
+                         f"Use os WAV da máquina que gerou o manifesto (outra versão do espeak-ng "
+                         f"gera áudios diferentes)")
+
+    recognizer = VoiceRecognizer(model_name=whisper_model, use_microphone=False, decoding=decoding)
+    if llm_path is not None:
+        llm_manager = LLMManager(model_path=llm_path, use_response_cache=False)
+        llm_label = Path(llm_path).name
+    else:
+        model = DeterministicLLM({fixture.text: fixture.response for fixture in fixtures})
+        llm_manager = LLMManager(llm=model, use_response_cache=False)
+        llm_label = "deterministico"
+    player = NullAudioPlayer()
+    synthesizer = VoiceSynthesizer(language=language, use_cache=False, backend=tts_engine,
+                                   fallback_backends=(), player=player)
+
+    audios = []
+    for fixture in fixtures:
+        with sr.AudioFile(str(fixture.path)) as source:
+            audios.append(recognizer.recognizer.record(source))
+    audio_seconds = [len(audio.frame_data) / (audio.sample_rate * audio.sample_width) for audio in audios]
+    loaded_rss = _peak_rss_mb()
+
+    def interact(fixture: E2EFixture, audio) -> tuple:
+        played = player.played_seconds
+        with tracer.interaction(frase=fixture.path.name) as interaction_id:
+            text = recognizer.transcribe_audio(audio)
+            response = llm_manager.generate_response(text)
+            spoken = synthesizer.text_to_speech(response)
+        # A LLM não propaga erros: uma resposta vazia ou de desculpas também é falha
+        if not response or response == ERROR_RESPONSE:
+            failure = "llm"
+        else:
+            failure = None if spoken else "tts"
+        return interaction_id, text, failure, player.played_seconds - played
+
+    collector = _StageCollector()
+    runs = []
+    try:
+        # Aquecimento para não medir a primeira execução dos modelos
+        for _ in range(warmup):
+            interact(fixtures[0], audios[0])
+
+        tracer.add_listener(collector)
+        for _ in range(repetitions):
+            for fixture, audio, seconds in zip(fixtures, audios, audio_seconds):
+                interaction_id, text, failure, speech_seconds = interact(fixture, audio)
+                runs.append({
+                    "interacao": interaction_id,
+                    "audio_s": seconds,
+                    "fala_s": speech_seconds,
+                    "wer": _word_error_rate(fixture.text, text),
+                    "falha": failure,
+                })
+    finally:
+        tracer.remove_listener(collector)
+        synthesizer.cleanup()
+
+    stages = {}
+    for stage in (*E2E_STAGES, INTERACTION_SPAN):
+        latencies = [collector.stages[run["interacao"]][stage] for run in runs
+                     if stage in collector.stages[run["interacao"]]]
+        if latencies:
+            stages[E2E_TOTAL if stage == INTERACTION_SPAN else stage] = _latency_stats(latencies)
+
+    def real_time_factor(stage: str, seconds_field: str) -> float:
+        processing = sum(collector.stages[run["interacao"]].get(stage, 0.0) for run in runs)
+        seconds = sum(run[seconds_field] for run in runs)
+        return processing / seconds if seconds else None
+
+    results = {
+        "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "whisper": recognizer.model_name,
+            "decodificacao": decoding,
+            "llm": llm_label,
+            "tts": tts_engine,
+        },
+        "frases": len(fixtures),
+        "repeticoes": repetitions,
+        "etapas": stages,
+        "fator_tempo_real": {
+            "transcricao": real_time_factor("transcricao", "audio_s"),
+            "tts": real_time_factor("tts", "fala_s"),
+        },
+        "wer": statistics.mean(run["wer"] for run in runs),
+        "falhas": sum(run["falha"] is not None for run in runs),
+        "falhas_por_etapa": {stage: sum(run["falha"] == stage for run in runs) for stage in ("llm", "tts")},
+        "fixtures": checksums,
+        "rss_carga_mb": loaded_rss,
+        "rss_pico_mb": _peak_rss_mb(),
+    }
+    _print_e2e_report(results)
+    return results
+
+
+def _print_e2e_report(results: dict):
+    """Imprime o relatório do benchmark ponta a ponta"""
+    environment = results["ambiente"]
+    print(f"\n⏱️ Ponta a ponta ({results['frases']} frases x {results['repeticoes']} repetições, "
+          f"whisper '{environment['whisper']}', LLM '{environment['llm']}', TTS '{environment['tts']}')")
+    for stage, summary in results["etapas"].items():
+        print(f"{stage:<14} p50 {summary['p50_ms']:8.1f} ms | p95 {summary['p95_ms']:8.1f} ms | "
+              f"média {summary['media_ms']:8.1f} ms")
+
+    factors = " | ".join(f"{stage} {factor:.2f}" for stage, factor in results["fator_tempo_real"].items()
+                         if factor is not None)
+    print(f"Fator de tempo real: {factors or 'n/d'}")
+    failures = results["falhas_por_etapa"]
+    print(f"WER médio: {results['wer'] * 100:.1f}% | falhas: {results['falhas']} "
+          f"(LLM {failures['llm']}, síntese {failures['tts']})")
+    print(f"Memória (pico RSS): {results['rss_pico_mb']:.0f} MB "
+          f"(após carregar os modelos: {results['rss_carga_mb']:.0f} MB)")
+
+
+def compare_e2e_baseline(results: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE,
+                         min_delta_ms: float = REGRESSION_MIN_DELTA_MS) -> list:
+    """
+    Compara um resultado do benchmark ponta a ponta com a referência salva
+
+    Uma latência só é regressão se piorar mais que a tolerância e mais que
+    `min_delta_ms`; o fator de tempo real e a memória, se piorarem mais que
+    a tolerância; a taxa de erro de palavras, se subir mais que 5 pontos.
+
+    Args:
+        results (dict): Resultado atual
+        baseline (dict): Resultado de referência
+        tolerance (float): Piora relativa tolerada
+        min_delta_ms (float): Piora absoluta mínima das latências
+
+    Returns:
+        list: Descrição das regressões (vazia se não houver)
+    """
+    regressions = []
+
+    def check(label: str, current, reference, unit: str = "", min_delta: float = 0.0):
+        if current is None or reference is None:
+            return
+        if current > reference * (1 + tolerance) and current - reference > min_delta:
+            change = (current / reference - 1) if reference else float("inf")
+            regressions.append(f"{label}: {reference:.2f}{unit} -> {current:.2f}{unit} (+{change:.0%})")
+
+    for stage, reference in baseline.get("etapas", {}).items():
+        current = results["etapas"].get(stage)
+        if current is None:
+            continue
+        for percentile in ("p50_ms", "p95_ms"):
+            check(f"{stage} {percentile[:3]}", current[percentile], reference[percentile], " ms", min_delta_ms)
+
+    for stage, reference in baseline.get("fator_tempo_real", {}).items():
+        check(f"fator de tempo real ({stage})", results["fator_tempo_real"].get(stage), reference)
+
+    check("pico de memória", results["rss_pico_mb"], baseline.get("rss_pico_mb"), " MB")
+
+    if baseline.get("wer") is not None and results["wer"] > baseline["wer"] + REGRESSION_WER_DELTA:
+        regressions.append(f"WER: {baseline['wer']:.1%} -> {results['wer']:.1%}")
+    if results["falhas"] > baseline.get("falhas", 0):
+        regressions.append(f"falhas: {baseline.get('falhas', 0)} -> {results['falhas']}")
+    return regressions
+
+
+def _save_json(path, data: dict):
+    """Grava um resultado em JSON de forma atômica"""
+    import tempfile
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+            json.dump(data, temp_file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def main():
+    """Função principal"""
+    from tracing import configure_logging
+
+    parser = argparse.ArgumentParser(description="Benchmarks do assistente de voz")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    transcription = subparsers.add_parser("transcricao", help="Transcrição em memória vs arquivo temporário")
+    transcription.add_argument("--audio", required=True, help="Arquivo WAV com uma frase falada")
+    transcription.add_argument("--modelo", default="base", help="Modelo Whisper")
+    transcription.add_argument("--repeticoes", type=int, default=5, help="Repetições por cenário")
+    transcription.add_argument("--int8", action="store_true", help="Usa o modelo quantizado para int8")
+
+    decoding = subparsers.add_parser("decodificacao", help="Latência e precisão dos presets do Whisper")
+    decoding.add_argument("--audios", nargs="+", required=True,
+                          help="Arquivos de áudio (transcrição correta em um .txt de mesmo nome)")
+    decoding.add_argument("--modelo", default="base", help="Modelo Whisper")
+    decoding.add_argument("--presets", nargs="+", default=None, help="Presets comparados (padrão: todos)")
+    decoding.add_argument("--repeticoes", type=int, default=2, help="Repetições de cada arquivo")
+    decoding.add_argument("--int8", action="store_true", help="Usa o modelo quantizado para int8")
+
+    pool = subparsers.add_parser("pool", help="Escalabilidade do pool de transcrição")
+    pool.add_argument("--audio", required=True, help="Arquivo de áudio das requisições")
+    pool.add_argument("--modelo", default="base", help="Modelo Whisper")
+    pool.add_argument("--max-processos", type=int, default=os.cpu_count() or 1, help="Máximo de processos")
+    pool.add_argument("--requisicoes", type=int, default=16, help="Requisições por cenário")
+    pool.add_argument("--threads", type=int, default=1, help="Threads do torch por processo")
+
+    response = subparsers.add_parser("resposta", help="Tempo até o primeiro áudio da resposta da LLM")
+    response.add_argument("--pergunta", default="Qual a capital do Brasil?", help="Pergunta enviada à LLM")
+    response.add_argument("--repeticoes", type=int, default=3, help="Repetições por cenário")
+
+    tts = subparsers.add_parser("tts", help="Latência dos motores de síntese de voz")
+    tts.add_argument("--motores", nargs="+", default=["gtts", "espeak"], help="Motores a comparar")
+    tts.add_argument("--repeticoes", type=int, default=3, help="Repetições de cada frase")
+
+    reading = subparsers.add_parser("leitura", help="Leitura de texto longo: inteiro vs trechos em paralelo")
+    reading.add_argument("--arquivo", required=True, help="Arquivo de texto lido")
+    reading.add_argument("--sinteses", type=int, default=3, help="Sínteses simultâneas")
+    reading.add_argument("--antecipacao", type=int, default=4, help="Trechos sintetizados à frente")
+    reading.add_argument("--motor", default="gtts", help="Motor de síntese")
+
+    load = subparsers.add_parser("carga", help="Teste de carga do servidor de inferência da LLM")
+    load.add_argument("--slots", type=int, default=2, help="Gerações simultâneas do servidor")
+    load.add_argument("--concorrencia", type=int, nargs="+", default=[1, 2, 4],
+                      help="Quantidades de clientes simultâneos")
+    load.add_argument("--requisicoes", type=int, default=8, help="Requisições por cliente")
+    load.add_argument("--max-tokens", type=int, default=64, help="Máximo de tokens por resposta")
+
+    e2e = subparsers.add_parser("ponta-a-ponta", aliases=["e2e"],
+                                help="Frases gravadas -> Whisper -> LLM -> síntese, com referência salva")
+    e2e.add_argument("--fixtures", default=str(E2E_FIXTURES_DIR), help="Diretório com frases.json e os WAV")
+    e2e.add_argument("--gerar-fixtures", action="store_true",
+                     help="Sintetiza com o espeak-ng os WAV que ainda não existem")
+    e2e.add_argument("--modelo", default="tiny", help="Modelo Whisper")
+    e2e.add_argument("--decodificacao", default=None, help="Preset de decodificação do Whisper")
+    e2e.add_argument("--llm", default=None, help="Modelo GGUF pequeno (padrão: modelo determinístico)")
+    e2e.add_argument("--motor", default="espeak", help="Motor de síntese")
+    e2e.add_argument("--repeticoes", type=int, default=3, help="Repetições de cada frase")
+    e2e.add_argument("--aquecimento", type=int, default=1, help="Interações descartadas no início")
+    e2e.add_argument("--salvar-referencia", default=None, help="Grava o resultado como referência (JSON)")
+    e2e.add_argument("--referencia", default=None, help="Compara com uma referência e acusa regressões")
+    e2e.add_argument("--tolerancia", type=float, default=REGRESSION_TOLERANCE,
+                     help="Piora relativa tolerada (ex: 0.2 = 20%%)")
+
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.command == "transcricao":
+        benchmark_transcription(args.audio, model_name=args.modelo, repetitions=args.repeticoes,
+                                quantize=args.int8)
+    elif args.command == "decodificacao":
+        benchmark_decoding(args.audios, model_name=args.modelo, presets=args.presets,
+                           repetitions=args.repeticoes, quantize=args.int8)
+    elif args.command == "pool":
+        benchmark_pool(args.audio, model_name=args.modelo, max_workers=args.max_processos,
+                       requests=args.requisicoes, threads_per_worker=args.threads)
+    elif args.command == "resposta":
+        benchmark_response(args.pergunta, repetitions=args.repeticoes)
+    elif args.command == "tts":
+        benchmark_tts(args.motores, repetitions=args.repeticoes)
+    elif args.command == "leitura":
+        benchmark_long_text(args.arquivo, workers=args.sinteses, look_ahead=args.antecipacao, engine=args.motor)
+    elif args.command == "carga":
+        benchmark_load(slots=args.slots, concurrency_levels=args.concorrencia, requests=args.requisicoes,
+                       max_new_tokens=args.max_tokens)
+    elif args.command in ("ponta-a-ponta", "e2e"):
+        run_e2e(args)
+
+
+def run_e2e(args):
+    """
+    Executa o benchmark ponta a ponta e compara com a referência (sai com 1 se houver regressão)
+
+    A referência é lida antes da execução e a comparação é feita antes de
+    gravar o novo resultado, então --referencia e --salvar-referencia podem
+    apontar para o mesmo arquivo.
+    """
+    baseline = None
+    if args.referencia:
+        with open(args.referencia, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    if args.gerar_fixtures:
+        created = generate_e2e_fixtures(args.fixtures)
+        print(f"🎙️ {created} frase(s) sintetizada(s) em {args.fixtures}")
+
+    results = benchmark_e2e(args.fixtures, whisper_model=args.modelo, decoding=args.decodificacao,
+                            llm_path=args.llm, tts_engine=args.motor, repetitions=args.repeticoes,
+                            warmup=args.aquecimento)
+
+    failed = False
+    if baseline is not None:
+        if baseline.get("fixtures") != results["fixtures"]:
+            # Latência e WER de áudios diferentes não são comparáveis
+            print(f"❌ A referência {args.referencia} foi medida com outros áudios; "
+                  f"grave uma nova com --salvar-referencia")
+            failed = True
+        else:
+            changed = [key for key, value in baseline.get("ambiente", {}).items()
+                       if key != "plataforma" and results["ambiente"].get(key) != value]
+            if changed:
+                print(f"⚠️ Ambiente diferente da referência ({', '.join(changed)}); a comparação pode não valer")
+
+            regressions = compare_e2e_baseline(results, baseline, tolerance=args.tolerancia)
+            if regressions:
+                print(f"\n❌ {len(regressions)} regressão(ões) em relação a {args.referencia} "
+                      f"({baseline.get('data')}):")
+                for regression in regressions:
+                    print(f"  - {regression}")
+                failed = True
+            else:
+                print(f"\n✅ Sem regressões em relação a {args.referencia}")
+
+    if args.salvar_referencia:
+        _save_json(args.salvar_referencia, results)
+        print(f"💾 Referência salva em {args.salvar_referencia}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
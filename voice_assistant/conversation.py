@@ -0,0 +1,214 @@
+"""
+Módulo com a memória de conversa de múltiplos turnos do assistente
+
+Os tokens das instruções do sistema e de cada turno são guardados já
+tokenizados e reenviados ao modelo sempre na mesma sequência. Como o
+ctransformers mantém o estado (KV cache) dos tokens já avaliados e só
+avalia a parte do prompt que difere da anterior, o prefixo comum
+(instruções + turnos anteriores) não é reprocessado a cada pergunta.
+"""
+import codecs
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from generation_controller import GenerationController
+from tracing import metrics, trace_stream
+
+logger = logging.getLogger(__name__)
+
+# Tokens gerados pela LLM (todas as sessões e perguntas avulsas)
+generated_tokens = metrics.counter("voice_assistant_llm_tokens_total", "Tokens gerados pela LLM")
+
+
+@dataclass
+class ConversationTurn:
+    """Um turno da conversa (pergunta do usuário e resposta do assistente)"""
+    question: str
+    response: str
+    tokens: List[int]
+
+
+@dataclass
+class TurnStats:
+    """Estatísticas de avaliação do prompt de um turno"""
+    prompt_tokens: int
+    reused_tokens: int
+    evaluated_tokens: int
+    generated_tokens: int
+    dropped_turns: int
+    elapsed_seconds: float
+
+
+class ConversationSession:
+    """Sessão de conversa com histórico limitado e reaproveitamento do prefixo avaliado"""
+
+    def __init__(self, client, system_prompt: str, turn_template: str,
+                 context_length: int = 2048, max_new_tokens: int = 512,
+                 stop: Optional[List[str]] = None, turn_separator: str = "\n\n",
+                 **generation_options):
+        """
+        Inicializa a sessão
+
+        Args:
+            client: Modelo ctransformers (LLM) usado na geração
+            system_prompt (str): Instruções enviadas no início de todo prompt
+            turn_template (str): Template de um turno, com o campo {question};
+                a resposta do modelo é anexada logo após o template
+            context_length (int): Tamanho do contexto do modelo (tokens)
+            max_new_tokens (int): Máximo de tokens gerados por resposta
+            stop: Textos que encerram a resposta (padrão: início do template do turno)
+            turn_separator (str): Texto colocado entre uma resposta e o turno seguinte
+            **generation_options: Opções repassadas a client.generate
+                (temperature, repetition_penalty, ...)
+        """
+        self.client = client
+        self.system_prompt = system_prompt
+        self.turn_template = turn_template
+        self.context_length = context_length
+        self.max_new_tokens = max_new_tokens
+        self.stop = stop if stop is not None else [turn_template.split("{question}")[0].strip()]
+        self.generation_options = generation_options
+        self._separator_tokens = self._tokenize_turn(turn_separator) if turn_separator else []
+
+        self.turns: List[ConversationTurn] = []
+        self.history: List[TurnStats] = []
+        self._system_tokens = client.tokenize(system_prompt)
+        self._lock = threading.Lock()
+
+    @property
+    def token_budget(self) -> int:
+        """Tokens disponíveis para instruções, histórico e pergunta"""
+        return self.context_length - self.max_new_tokens
+
+    @property
+    def tokens_saved(self) -> int:
+        """Total de tokens de prompt que não precisaram ser reavaliados"""
+        return sum(stats.reused_tokens for stats in self.history)
+
+    def _tokenize_turn(self, text: str) -> List[int]:
+        """Tokeniza um trecho que continua o prompt (sem token de início)"""
+        return self.client.tokenize(text, add_bos_token=False)
+
+    def _build_prompt(self, question_tokens: List[int]) -> Tuple[List[int], int]:
+        """
+        Monta os tokens do prompt, descartando os turnos mais antigos que não cabem
+
+        Returns:
+            tuple: Tokens do prompt e quantidade de turnos descartados
+        """
+        fixed = len(self._system_tokens) + len(question_tokens)
+        if fixed > self.token_budget:
+            raise ValueError(
+                f"Pergunta muito longa para o contexto ({fixed} tokens, limite {self.token_budget})"
+            )
+
+        dropped = 0
+        history_size = sum(len(turn.tokens) for turn in self.turns)
+        while self.turns and fixed + history_size > self.token_budget:
+            history_size -= len(self.turns.pop(0).tokens)
+            dropped += 1
+
+        tokens = list(self._system_tokens)
+        for turn in self.turns:
+            tokens.extend(turn.tokens)
+        tokens.extend(question_tokens)
+        return tokens, dropped
+
+    def _reusable_prefix(self, tokens: List[int]) -> int:
+        """Tokens do início do prompt que já estão avaliados no modelo"""
+        # Mesma regra do ctransformers: ao menos um token é sempre reavaliado
+        context = getattr(self.client, "_context", [])
+        limit = min(len(tokens) - 1, len(context))
+        prefix = 0
+        while prefix < limit and tokens[prefix] == context[prefix]:
+            prefix += 1
+        return prefix
+
+    def ask_stream(self, question: str,
+                   controller: Optional[GenerationController] = None) -> Iterator[str]:
+        """
+        Envia uma pergunta e emite a resposta à medida que é gerada
+
+        Uma sessão atende uma pergunta por vez (um único consumidor): a trava
+        protege só o histórico e não fica presa durante a geração. Se o
+        consumidor abandonar a resposta no meio (ex: o usuário interrompe a
+        fala), a geração é encerrada e o turno guarda o texto já entregue.
+
+        Args:
+            question (str): Pergunta do usuário
+            controller (GenerationController): Controle de tamanho da resposta
+                (padrão: apenas as sequências de parada da sessão)
+
+        Yields:
+            str: Pedaços de texto da resposta
+        """
+        if controller is None:
+            controller = GenerationController(max_sentences=None, max_characters=None, stop_sequences=[])
+        controller.reset()
+        controller.extend_stop_sequences(self.stop)
+
+        with self._lock:
+            start = time.perf_counter()
+            question_tokens = self._tokenize_turn(self.turn_template.format(question=question))
+            prompt_tokens, dropped = self._build_prompt(question_tokens)
+            reused = self._reusable_prefix(prompt_tokens)
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        generated: List[int] = []
+        finished = False
+
+        tokens = trace_stream(self.client.generate(prompt_tokens, reset=True, **self.generation_options),
+                              "llm.prompt", "llm.geracao", generated_tokens)
+        try:
+            for token in tokens:
+                generated.append(token)
+                released = controller.feed(decoder.decode(self.client.detokenize([token], decode=False)))
+                if released:
+                    yield released
+                if controller.stopped or len(generated) >= self.max_new_tokens:
+                    break
+
+            released = controller.flush(decoder.decode(b"", final=True))
+            if released:
+                yield released
+            finished = True
+        finally:
+            tokens.close()
+            # Resposta cortada ou abandonada: o histórico guarda apenas o texto aceito
+            response = controller.text if finished else controller.released_text
+            answer_tokens = generated if finished and not controller.stopped else self._tokenize_turn(response)
+            with self._lock:
+                self.turns.append(ConversationTurn(
+                    question, response.strip(), question_tokens + answer_tokens + self._separator_tokens
+                ))
+                self.history.append(TurnStats(
+                    prompt_tokens=len(prompt_tokens),
+                    reused_tokens=reused,
+                    evaluated_tokens=len(prompt_tokens) - reused,
+                    generated_tokens=len(generated),
+                    dropped_turns=dropped,
+                    elapsed_seconds=time.perf_counter() - start,
+                ))
+            logger.info("🧠 Prompt: %d tokens, %d reaproveitados do cache (%d avaliados)%s",
+                        len(prompt_tokens), reused, len(prompt_tokens) - reused,
+                        f", {dropped} turno(s) antigo(s) descartado(s)" if dropped else "")
+
+    def ask(self, question: str) -> str:
+        """
+        Envia uma pergunta e retorna a resposta completa
+
+        Args:
+            question (str): Pergunta do usuário
+
+        Returns:
+            str: Resposta do assistente
+        """
+        return "".join(self.ask_stream(question)).strip()
+
+    def reset(self):
+        """Esquece o histórico da conversa (as instruções continuam em cache)"""
+        with self._lock:
+            self.turns.clear()
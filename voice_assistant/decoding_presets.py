@@ -0,0 +1,88 @@
+"""
+Módulo com os presets de decodificação do Whisper
+
+Por padrão, `model.transcribe` detecta o idioma a cada frase, repete a
+decodificação com temperaturas maiores quando o resultado parece ruim e
+tenta usar fp16 mesmo na CPU (gerando avisos). Como o assistente só atende
+em português, os presets fixam o idioma e controlam a busca (gulosa ou por
+feixe), o fallback de temperatura, o condicionamento no texto anterior, o
+prompt inicial com o vocabulário do domínio e o modo sem timestamps.
+"""
+from typing import Optional
+
+# Vocabulário do domínio passado ao Whisper como prompt inicial
+DEFAULT_INITIAL_PROMPT = "Conversa em português do Brasil com um assistente de voz. Comandos: parar, sair, tchau."
+
+# Temperaturas do fallback completo (padrão do Whisper)
+FULL_TEMPERATURE_FALLBACK = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+# Opções de cada preset (repassadas a model.transcribe)
+PRESETS = {
+    "whisper-padrao": {
+        "descricao": "Padrões da biblioteca (detecção de idioma, fallback completo)",
+        "language": None,
+        "temperature": FULL_TEMPERATURE_FALLBACK,
+        "beam_size": None,
+        "best_of": None,
+        "condition_on_previous_text": True,
+        "initial_prompt": None,
+        "without_timestamps": False,
+    },
+    "rapido": {
+        "descricao": "Português fixo, busca gulosa, sem fallback e sem timestamps",
+        "language": "pt",
+        "temperature": 0.0,
+        "beam_size": None,
+        "best_of": None,
+        "condition_on_previous_text": False,
+        "initial_prompt": None,
+        "without_timestamps": True,
+    },
+    "equilibrado": {
+        "descricao": "Como o rápido, com vocabulário do domínio e fallback curto",
+        "language": "pt",
+        "temperature": (0.0, 0.4),
+        "beam_size": None,
+        "best_of": 2,
+        "condition_on_previous_text": False,
+        "initial_prompt": DEFAULT_INITIAL_PROMPT,
+        "without_timestamps": True,
+    },
+    "preciso": {
+        "descricao": "Português fixo, busca em feixe (5), fallback completo",
+        "language": "pt",
+        "temperature": FULL_TEMPERATURE_FALLBACK,
+        "beam_size": 5,
+        "best_of": 5,
+        "condition_on_previous_text": True,
+        "initial_prompt": DEFAULT_INITIAL_PROMPT,
+        "without_timestamps": True,
+    },
+}
+
+# Preset usado pelo reconhecedor de voz
+DEFAULT_PRESET = "rapido"
+
+
+def transcribe_options(preset: Optional[str] = None, device: str = "cpu", **overrides) -> dict:
+    """
+    Monta os argumentos de `model.transcribe` a partir de um preset
+
+    Args:
+        preset (str): Nome do preset (None usa o padrão)
+        device (str): Dispositivo do modelo; fp16 só é usado em CUDA
+        **overrides: Opções que substituem as do preset (ex: initial_prompt)
+
+    Returns:
+        dict: Argumentos para model.transcribe
+    """
+    name = preset or DEFAULT_PRESET
+    try:
+        options = dict(PRESETS[name])
+    except KeyError:
+        raise ValueError(f"Preset de decodificação desconhecido: {name} (disponíveis: {', '.join(PRESETS)})")
+
+    options.pop("descricao")
+    options.update(overrides)
+    options["fp16"] = device == "cuda"
+    return options
@@ -0,0 +1,313 @@
+"""
+Módulo para leitura de documentos grandes frase a frase, com marcadores
+
+O arquivo é mapeado em memória (mmap) e percorrido linha a linha por um
+gerador de frases; nada além da linha atual e de um histórico curto de
+posições fica na memória, independentemente do tamanho do arquivo. Cada
+frase carrega seus deslocamentos em bytes, o que permite gravar um marcador
+para retomar a leitura depois e avançar ou voltar frases sem reler o
+arquivo desde o início.
+
+Uso:
+    python document_reader.py livro.txt --quantidade 5
+    python document_reader.py livro.txt --avancar 20
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+# Adiciona o diretório atual ao path para importações
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from text_segmenter import SentenceSegmenter
+
+# Arquivo padrão dos marcadores de leitura
+DEFAULT_BOOKMARKS_PATH = Path.home() / ".cache" / "voice_assistant" / "bookmarks.json"
+
+# Tamanho máximo de uma "linha" lida de uma vez (arquivos sem quebras de linha)
+MAX_LINE_BYTES = 64 * 1024
+
+# Frases sem pontuação final maiores que isso são cortadas (caracteres)
+MAX_SENTENCE_CHARS = 1000
+
+# Posições de frases guardadas para voltar sem reler o arquivo
+HISTORY_SIZE = 256
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Sentence:
+    """Frase do documento e seus deslocamentos em bytes"""
+    text: str
+    start: int
+    end: int
+
+
+def _decode(data: bytes) -> str:
+    """Decodifica UTF-8 preservando bytes inválidos (a conversão de volta é exata)"""
+    return data.decode("utf-8", "surrogateescape")
+
+
+def _byte_length(text: str) -> int:
+    """Tamanho em bytes de um texto decodificado por _decode"""
+    return len(text.encode("utf-8", "surrogateescape"))
+
+
+def _clean(sentence: str) -> str:
+    """Junta as linhas de uma frase e remove bytes inválidos"""
+    return " ".join(sentence.split()).encode("utf-8", "surrogateescape").decode("utf-8", "replace")
+
+
+class DocumentReader:
+    """Leitor de documento de texto com gerador de frases, navegação e marcadores"""
+
+    def __init__(self, path: str, bookmarks_path: Optional[str] = DEFAULT_BOOKMARKS_PATH):
+        """
+        Abre o documento (sem carregá-lo na memória) e recupera o marcador salvo
+
+        Args:
+            path (str): Arquivo de texto UTF-8
+            bookmarks_path (str): Arquivo JSON dos marcadores (None para não gravar)
+        """
+        self.path = Path(path).resolve()
+        self.bookmarks_path = Path(bookmarks_path) if bookmarks_path else None
+        self.size = self.path.stat().st_size
+
+        self._file = open(self.path, "rb")
+        # mmap não aceita arquivos vazios
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+
+        self._history = deque(maxlen=HISTORY_SIZE)
+        self.position = self._load_bookmark()
+        self.resumed = self.position > 0
+
+    def close(self):
+        """Libera o mapeamento e o arquivo"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def progress(self) -> float:
+        """Fração do documento já lida (0.0 a 1.0)"""
+        return self.position / self.size if self.size else 1.0
+
+    @property
+    def finished(self) -> bool:
+        """Indica se a leitura chegou ao fim do documento (só resta espaço em branco)"""
+        return self.position >= self.size or next(self.sentences(), None) is None
+
+    def _line_end(self, position: int) -> int:
+        """Fim da próxima linha (ou de um pedaço de até MAX_LINE_BYTES, cortado em um espaço)"""
+        limit = min(self.size, position + MAX_LINE_BYTES)
+        newline = self._map.find(b"\n", position, limit)
+        if newline >= 0:
+            return newline + 1
+        if limit == self.size:
+            return limit
+        space = self._map.rfind(b" ", position, limit)
+        return space + 1 if space > position else limit
+
+    def sentences(self, start: Optional[int] = None) -> Iterator[Sentence]:
+        """
+        Gera as frases do documento a partir de um deslocamento em bytes
+
+        Linhas em branco encerram a frase pendente (títulos e parágrafos sem
+        pontuação final não são emendados ao parágrafo seguinte).
+
+        Args:
+            start (int): Deslocamento inicial (None usa a posição atual)
+
+        Yields:
+            Sentence: Frases na ordem do documento
+        """
+        position = self.position if start is None else start
+        segmenter = SentenceSegmenter()
+        pending_start = position  # Deslocamento em que começa o texto pendente do segmentador
+
+        while self._map is not None and position < self.size:
+            line_end = self._line_end(position)
+            line = _decode(self._map[position:line_end])
+            position = line_end
+
+            if not line.strip():
+                remainder = segmenter.flush()
+                if remainder:
+                    yield Sentence(_clean(remainder), pending_start, position)
+                pending_start = position
+                continue
+
+            text = segmenter.pending + line
+            cursor = 0
+            for sentence in segmenter.feed(line):
+                sentence_end = text.find(sentence, cursor) + len(sentence)
+                end = pending_start + _byte_length(text[cursor:sentence_end])
+                yield Sentence(_clean(sentence), pending_start, end)
+                pending_start, cursor = end, sentence_end
+
+            if len(segmenter.pending) > MAX_SENTENCE_CHARS:
+                yield Sentence(_clean(segmenter.flush()), pending_start, position)
+                pending_start = position
+
+        remainder = segmenter.flush()
+        if remainder:
+            yield Sentence(_clean(remainder), pending_start, self.size)
+
+    def read(self) -> Iterator[Sentence]:
+        """
+        Gera as frases a partir da posição atual, avançando a posição a cada frase
+
+        A posição passa para o fim de cada frase quando ela é entregue; para
+        marcar apenas as frases de fato lidas em voz alta, use mark_read.
+
+        Yields:
+            Sentence: Próximas frases
+        """
+        for sentence in self.sentences():
+            self.mark_read(sentence)
+            yield sentence
+
+    def mark_read(self, sentence: Sentence):
+        """Registra que a frase foi lida (a posição passa para o fim dela)"""
+        if not self._history or self._history[-1] != sentence.start:
+            self._history.append(sentence.start)
+        self.position = sentence.end
+
+    def skip_forward(self, count: int = 1) -> int:
+        """
+        Avança frases sem lê-las
+
+        Args:
+            count (int): Número de frases
+
+        Returns:
+            int: Frases de fato avançadas (menos se o documento acabar)
+        """
+        skipped = 0
+        for sentence in self.sentences():
+            if skipped == count:
+                break
+            self.mark_read(sentence)
+            skipped += 1
+        return skipped
+
+    def skip_back(self, count: int = 1) -> int:
+        """
+        Volta frases usando o histórico de posições (sem reler o arquivo)
+
+        A frase atual conta como a primeira: skip_back(1) repete a última frase lida.
+
+        Args:
+            count (int): Número de frases
+
+        Returns:
+            int: Frases de fato voltadas (limitado ao histórico guardado)
+        """
+        back = 0
+        while back < count and self._history:
+            self.position = self._history.pop()
+            back += 1
+        return back
+
+    def _load_bookmark(self) -> int:
+        """Deslocamento salvo para este documento (0 se não houver ou se o arquivo mudou)"""
+        if self.bookmarks_path is None:
+            return 0
+        entry = _load_bookmarks(self.bookmarks_path).get(str(self.path))
+        if not entry:
+            return 0
+        if entry.get("tamanho") != self.size:
+            logger.warning("⚠️ O arquivo mudou desde a última leitura; começando do início")
+            return 0
+        return min(int(entry.get("posicao", 0)), self.size)
+
+    def save_bookmark(self):
+        """Grava a posição atual para retomar a leitura depois"""
+        if self.bookmarks_path is None:
+            return
+        bookmarks = _load_bookmarks(self.bookmarks_path)
+        if self.finished:
+            bookmarks.pop(str(self.path), None)
+        else:
+            bookmarks[str(self.path)] = {
+                "posicao": self.position,
+                "tamanho": self.size,
+                "atualizado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+        _save_bookmarks(self.bookmarks_path, bookmarks)
+
+    def restart(self):
+        """Volta ao início do documento"""
+        self.position = 0
+        self._history.clear()
+
+
+def _load_bookmarks(path: Path) -> dict:
+    """Lê o arquivo de marcadores (vazio se não existir ou for inválido)"""
+    try:
+        with open(path, "r", encoding="utf-8") as bookmarks_file:
+            return json.load(bookmarks_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_bookmarks(path: Path, bookmarks: dict):
+    """Grava os marcadores de forma atômica"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+            json.dump(bookmarks, temp_file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def main():
+    """Função principal"""
+    from tracing import configure_logging
+
+    parser = argparse.ArgumentParser(description="Leitura de documentos frase a frase")
+    parser.add_argument("arquivo", help="Arquivo de texto")
+    parser.add_argument("--quantidade", type=int, default=5, help="Frases exibidas")
+    parser.add_argument("--avancar", type=int, default=0, help="Frases puladas antes de exibir")
+    parser.add_argument("--voltar", type=int, default=0, help="Frases voltadas antes de exibir")
+    parser.add_argument("--inicio", action="store_true", help="Ignora o marcador e começa do início")
+    parser.add_argument("--salvar", action="store_true", help="Grava o marcador após exibir")
+    args = parser.parse_args()
+    configure_logging()
+
+    with DocumentReader(args.arquivo) as document:
+        if args.inicio:
+            document.restart()
+        document.skip_back(args.voltar)
+        document.skip_forward(args.avancar)
+        print(f"📄 {document.path} ({document.size} bytes, {document.progress:.1%} lido)")
+        for index, sentence in zip(range(args.quantidade), document.read()):
+            print(f"[{sentence.start:>10}] {sentence.text}")
+        if args.salvar:
+            document.save_bookmark()
+            print(f"🔖 Marcador salvo em {document.position} bytes")
+
+
+if __name__ == "__main__":
+    main()
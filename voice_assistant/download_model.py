@@ -1,57 +1,379 @@
 """
-Script para baixar o modelo Llama quantizado do Hugging Face
+Script para baixar os modelos Llama quantizados do Hugging Face
+
+Os modelos disponíveis ficam no manifesto models_registry.json. O arquivo é
+dividido em intervalos baixados em paralelo (requisições HTTP Range) para
+um arquivo .part; o progresso de cada intervalo é salvo em .part.json, de
+modo que um download interrompido continua de onde parou. Ao final, o
+tamanho e o SHA-256 são verificados e o arquivo é renomeado atomicamente.
+
+Uso:
+    python download_model.py                          # modelo padrão
+    python download_model.py llama-2-7b-chat-q5_k_m --conexoes 8
+    python download_model.py --listar
 """
+import argparse
+import hashlib
+import json
 import os
-import requests
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import Optional
+
+import requests
+
+# Adiciona o diretório atual ao path para importações
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_registry import DEFAULT_MODELS_DIR, get_model_entry, load_registry
+
+# Tamanho de cada leitura da resposta HTTP
+CHUNK_SIZE = 1024 * 1024
+
+# Menor intervalo atribuído a uma conexão
+MIN_SEGMENT_SIZE = 8 * 1024 * 1024
+
+# Intervalo mínimo entre gravações do estado do download (segundos)
+STATE_SAVE_INTERVAL = 1.0
+
+# Tentativas por intervalo antes de desistir
+SEGMENT_RETRIES = 3
+
+# Tempo limite de conexão/leitura das requisições (segundos)
+REQUEST_TIMEOUT = 30
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class DownloadError(RuntimeError):
+    """Falha no download de um modelo"""
+
+
+class ChecksumError(DownloadError):
+    """O arquivo baixado não confere com o tamanho ou SHA-256 esperado"""
+
+
+def probe_url(url: str) -> dict:
+    """
+    Consulta o tamanho, o suporte a intervalos e o checksum de uma URL
+
+    O Hugging Face informa o SHA-256 de arquivos LFS no cabeçalho
+    X-Linked-Etag (e o tamanho em X-Linked-Size) da resposta de redirecionamento.
+
+    Args:
+        url (str): URL do arquivo
+
+    Returns:
+        dict: 'tamanho' (ou None), 'aceita_intervalos' e 'sha256' (ou None)
+    """
+    response = requests.head(url, allow_redirects=True, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+
+    size = None
+    sha256 = None
+    for hop in [*response.history, response]:
+        linked_etag = hop.headers.get("X-Linked-Etag", "").strip('"').lower()
+        if _SHA256_RE.match(linked_etag):
+            sha256 = linked_etag
+        if hop.headers.get("X-Linked-Size"):
+            size = int(hop.headers["X-Linked-Size"])
+
+    if size is None and response.headers.get("Content-Length"):
+        size = int(response.headers["Content-Length"]) or None
+
+    return {
+        "tamanho": size,
+        "aceita_intervalos": response.headers.get("Accept-Ranges", "").lower() == "bytes",
+        "sha256": sha256,
+    }
+
+
+def _split_segments(size: int, connections: int) -> list:
+    """Divide o arquivo em intervalos [inicio, fim] para as conexões"""
+    count = max(1, min(connections, size // MIN_SEGMENT_SIZE or 1))
+    step = -(-size // count)
+    return [
+        {"inicio": start, "fim": min(start + step, size) - 1, "baixado": 0}
+        for start in range(0, size, step)
+    ]
+
+
+def _sha256_file(path: Path) -> str:
+    """Calcula o SHA-256 de um arquivo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_all(f, data: bytes):
+    """Grava todos os bytes num arquivo sem buffer"""
+    view = memoryview(data)
+    while view:
+        view = view[f.write(view):]
+
+
+class _DownloadState:
+    """Progresso dos intervalos de um download, salvo em disco para retomada"""
+
+    def __init__(self, path: Path, url: str, size: int, connections: int):
+        """
+        Carrega o estado salvo ou cria um novo
+
+        Args:
+            path (Path): Arquivo .part.json do estado
+            url (str): URL do download
+            size (int): Tamanho total do arquivo
+            connections (int): Conexões paralelas (usado só em um estado novo)
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self._saved_at = 0.0
+
+        state = None
+        if path.exists():
+            try:
+                state = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                state = None
+        if state is None or state.get("url") != url or state.get("tamanho") != size:
+            state = {"url": url, "tamanho": size, "segmentos": _split_segments(size, connections)}
+        self.state = state
+
+    @property
+    def segments(self) -> list:
+        return self.state["segmentos"]
+
+    @property
+    def downloaded(self) -> int:
+        return sum(segment["baixado"] for segment in self.segments)
+
+    def reset(self):
+        """Descarta o progresso (ex: arquivo .part ausente)"""
+        with self.lock:
+            for segment in self.segments:
+                segment["baixado"] = 0
+
+    def advance(self, segment: dict, count: int):
+        """Registra bytes gravados de um intervalo, salvando o estado periodicamente"""
+        with self.lock:
+            segment["baixado"] += count
+            if time.monotonic() - self._saved_at >= STATE_SAVE_INTERVAL:
+                self._save()
+
+    def save(self):
+        with self.lock:
+            self._save()
+
+    def _save(self):
+        """Grava o estado de forma atômica"""
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        temp_path.write_text(json.dumps(self.state), encoding="utf-8")
+        os.replace(temp_path, self.path)
+        self._saved_at = time.monotonic()
+
+
+def _download_segment(url: str, part_path: Path, segment: dict, state: _DownloadState,
+                      stop: threading.Event):
+    """Baixa o que falta de um intervalo, com novas tentativas em caso de falha"""
+    for attempt in range(1, SEGMENT_RETRIES + 1):
+        start = segment["inicio"] + segment["baixado"]
+        if start > segment["fim"] or stop.is_set():
+            return
+        try:
+            headers = {"Range": f"bytes={start}-{segment['fim']}"}
+            with requests.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                if response.status_code != 206:
+                    raise DownloadError(f"O servidor ignorou o pedido de intervalo (HTTP {response.status_code})")
+                with open(part_path, "r+b", buffering=0) as f:
+                    f.seek(start)
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if stop.is_set():
+                            return
+                        chunk = chunk[:segment["fim"] + 1 - (segment["inicio"] + segment["baixado"])]
+                        _write_all(f, chunk)
+                        state.advance(segment, len(chunk))
+            if segment["inicio"] + segment["baixado"] > segment["fim"]:
+                return
+            raise DownloadError("Conexão encerrada antes do fim do intervalo")
+        except (requests.RequestException, DownloadError) as e:
+            if attempt == SEGMENT_RETRIES:
+                raise DownloadError(f"Falha no intervalo {segment['inicio']}-{segment['fim']}: {e}")
+            time.sleep(attempt)
+
+
+def _print_progress(downloaded: int, total: Optional[int], started_at: float, resumed: int = 0):
+    """Mostra o progresso e a velocidade do download"""
+    elapsed = max(time.perf_counter() - started_at, 1e-6)
+    speed = (downloaded - resumed) / elapsed / (1024 * 1024)
+    if total:
+        print(f"\rProgresso: {downloaded / total * 100:5.1f}% ({speed:.1f} MB/s)", end="", flush=True)
+    else:
+        print(f"\rBaixados: {downloaded / (1024 * 1024):.1f} MB ({speed:.1f} MB/s)", end="", flush=True)
+
+
+def _download_single(url: str, part_path: Path, size: Optional[int]):
+    """Download por uma única conexão, sem retomada (servidor sem suporte a intervalos)"""
+    started_at = time.perf_counter()
+    printed_at = 0.0
+    downloaded = 0
+    with requests.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        response.raise_for_status()
+        with open(part_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                downloaded += len(chunk)
+                if time.perf_counter() - printed_at >= 0.5:
+                    _print_progress(downloaded, size, started_at)
+                    printed_at = time.perf_counter()
+    _print_progress(downloaded, size, started_at)
+
+
+def download_file(url: str, destination, connections: int = 4, expected_size: Optional[int] = None,
+                  expected_sha256: Optional[str] = None) -> Path:
+    """
+    Baixa um arquivo em paralelo, com retomada, verificação e renomeação atômica
+
+    Args:
+        url (str): URL do arquivo
+        destination: Caminho final do arquivo
+        connections (int): Conexões paralelas
+        expected_size (int): Tamanho esperado (None: usa o informado pelo servidor)
+        expected_sha256 (str): SHA-256 esperado (None: usa o X-Linked-Etag, se houver)
+
+    Returns:
+        Path: Caminho do arquivo baixado
+
+    Raises:
+        DownloadError: Se o download falhar (o progresso fica salvo para retomada)
+        ChecksumError: Se o arquivo não conferir com o tamanho ou o SHA-256
+    """
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    part_path = destination.with_name(destination.name + ".part")
+    state_path = destination.with_name(destination.name + ".part.json")
+
+    info = probe_url(url)
+    size = expected_size or info["tamanho"]
+    if expected_size and info["tamanho"] and expected_size != info["tamanho"]:
+        raise DownloadError(f"Tamanho no servidor ({info['tamanho']}) difere do manifesto ({expected_size})")
+    sha256 = (expected_sha256 or info["sha256"] or "").lower() or None
+
+    if size and info["aceita_intervalos"]:
+        state = _DownloadState(state_path, url, size, connections)
+        if not part_path.exists() or part_path.stat().st_size != size:
+            state.reset()
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+
+        resumed = state.downloaded
+        if resumed:
+            print(f"Retomando download: {resumed / size * 100:.1f}% já baixado")
+
+        stop = threading.Event()
+        started_at = time.perf_counter()
+        pending = [segment for segment in state.segments if segment["inicio"] + segment["baixado"] <= segment["fim"]]
+        with ThreadPoolExecutor(max_workers=max(1, len(pending))) as executor:
+            futures = [
+                executor.submit(_download_segment, url, part_path, segment, state, stop)
+                for segment in pending
+            ]
+            while True:
+                done, not_done = wait(futures, timeout=0.5, return_when=FIRST_EXCEPTION)
+                _print_progress(state.downloaded, size, started_at, resumed)
+                errors = [future.exception() for future in done if future.exception()]
+                if errors or not not_done:
+                    break
+            if errors:
+                stop.set()
+        state.save()
+        print()
+        if errors:
+            raise DownloadError(f"{errors[0]} (execute novamente para retomar)")
+    else:
+        print("⚠️ Servidor sem suporte a intervalos: download em uma conexão, sem retomada")
+        _download_single(url, part_path, size)
+        print()
+
+    actual_size = part_path.stat().st_size
+    if size and actual_size != size:
+        raise ChecksumError(f"Tamanho incorreto: {actual_size} bytes (esperado {size})")
+
+    if sha256:
+        print("Verificando SHA-256...")
+        actual = _sha256_file(part_path)
+        if actual != sha256:
+            part_path.unlink()
+            if state_path.exists():
+                state_path.unlink()
+            raise ChecksumError(f"SHA-256 não confere: {actual} (esperado {sha256})")
+        print("✅ SHA-256 conferido")
+    else:
+        print("⚠️ Nenhum SHA-256 conhecido para este arquivo; apenas o tamanho foi verificado")
+
+    os.replace(part_path, destination)
+    if state_path.exists():
+        state_path.unlink()
+    return destination
+
+
+def download_model(name: Optional[str] = None, models_dir: Optional[str] = None, connections: int = 4):
+    """
+    Baixa um modelo do manifesto
+
+    Args:
+        name (str): Nome do modelo no manifesto (None usa o modelo padrão)
+        models_dir (str): Pasta dos modelos
+        connections (int): Conexões paralelas
+
+    Returns:
+        str: Caminho do modelo ou None em caso de erro
+    """
+    entry = get_model_entry(name)
+    model_path = Path(models_dir or DEFAULT_MODELS_DIR) / entry["arquivo"]
 
-def download_model():
-    """Baixa o modelo Llama quantizado do Hugging Face"""
-    
-    # URL do modelo no Hugging Face (modelo menor e compatível)
-    model_url = "https://huggingface.co/TheBloke/Llama-2-7B-Chat-GGUF/resolve/main/llama-2-7b-chat.Q4_K_M.gguf"
-    
-    # Caminho onde salvar o modelo
-    models_dir = Path("models")
-    models_dir.mkdir(exist_ok=True)
-    
-    model_path = models_dir / "llama-2-7b-chat.Q4_K_M.gguf"
-    
     # Verifica se o modelo já existe
     if model_path.exists():
         print(f"Modelo já existe em: {model_path}")
         return str(model_path)
-    
-    print("Iniciando download do modelo Llama-2-7B-Chat quantizado...")
+
+    print(f"Iniciando download do modelo {entry['nome']} ({entry['quantizacao']})...")
     print("Isso pode demorar alguns minutos dependendo da sua conexão...")
-    
+
     try:
-        # Faz o download com barra de progresso
-        response = requests.get(model_url, stream=True)
-        response.raise_for_status()
-        
-        total_size = int(response.headers.get('content-length', 0))
-        downloaded_size = 0
-        
-        with open(model_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded_size += len(chunk)
-                    
-                    # Mostra progresso
-                    if total_size > 0:
-                        progress = (downloaded_size / total_size) * 100
-                        print(f"\rProgresso: {progress:.1f}%", end="", flush=True)
-        
-        print(f"\nModelo baixado com sucesso em: {model_path}")
+        download_file(entry["url"], model_path, connections=connections,
+                      expected_size=entry.get("tamanho"), expected_sha256=entry.get("sha256"))
+        print(f"Modelo baixado com sucesso em: {model_path}")
         return str(model_path)
-        
-    except Exception as e:
-        print(f"Erro ao baixar o modelo: {e}")
-        if model_path.exists():
-            model_path.unlink()  # Remove arquivo parcialmente baixado
+
+    except (DownloadError, requests.RequestException, OSError) as e:
+        print(f"\nErro ao baixar o modelo: {e}")
         return None
 
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Baixa modelos LLM do manifesto models_registry.json")
+    parser.add_argument("modelo", nargs="?", default=None, help="Nome do modelo (padrão: modelo padrão)")
+    parser.add_argument("--conexoes", type=int, default=4, help="Conexões paralelas")
+    parser.add_argument("--pasta", default=None, help="Pasta dos modelos")
+    parser.add_argument("--listar", action="store_true", help="Lista os modelos do manifesto")
+    args = parser.parse_args()
+
+    if args.listar:
+        registry = load_registry()
+        for name, entry in registry["modelos"].items():
+            marker = "*" if name == registry["modelo_padrao"] else " "
+            print(f"{marker} {name:<26} {entry['quantizacao']:<8} {entry['descricao']}")
+        return
+
+    download_model(args.modelo, models_dir=args.pasta, connections=args.conexoes)
+
+
 if __name__ == "__main__":
-    download_model()
+    main()
@@ -0,0 +1,157 @@
+"""
+Módulo com o controle de tamanho das respostas faladas
+
+O controlador recebe o texto gerado pela LLM pedaço a pedaço, conta as
+frases completas e sinaliza a parada assim que o orçamento de frases ou de
+caracteres é atingido, ou quando aparece uma sequência de parada. Quem
+consome a geração interrompe o modelo nesse momento, evitando gerar (e
+falar) tokens que o usuário não pediu.
+"""
+from typing import List, Optional
+
+from text_segmenter import SentenceSegmenter
+
+# Sequências que indicam que o modelo começou a inventar um novo turno
+DEFAULT_STOP_SEQUENCES = ["Pergunta do usuário:"]
+
+
+class GenerationController:
+    """Corta a geração ao atingir o orçamento de frases/caracteres ou uma sequência de parada"""
+
+    def __init__(self, max_sentences: Optional[int] = 3, max_characters: Optional[int] = 600,
+                 stop_sequences: Optional[List[str]] = None, min_sentence_length: int = 4):
+        """
+        Inicializa o controlador
+
+        Args:
+            max_sentences (int): Máximo de frases da resposta (None: sem limite)
+            max_characters (int): Máximo de caracteres da resposta (None: sem limite)
+            stop_sequences: Textos que encerram a resposta (não são incluídos nela)
+            min_sentence_length (int): Tamanho mínimo para contar uma frase
+        """
+        self.max_sentences = max_sentences
+        self.max_characters = max_characters
+        self.stop_sequences = list(DEFAULT_STOP_SEQUENCES if stop_sequences is None else stop_sequences)
+        self.min_sentence_length = min_sentence_length
+        self.reset()
+
+    def reset(self):
+        """Prepara o controlador para uma nova resposta"""
+        self.tokens = 0
+        self.sentences = 0
+        self.stopped = False
+        self.reason: Optional[str] = None
+        self._text = ""
+        self._emitted = 0
+        self._sentence_end = 0
+        self._segmenter = SentenceSegmenter(min_length=self.min_sentence_length)
+
+    def extend_stop_sequences(self, sequences: List[str]):
+        """Acrescenta sequências de parada (ignorando as repetidas)"""
+        for sequence in sequences:
+            if sequence and sequence not in self.stop_sequences:
+                self.stop_sequences.append(sequence)
+
+    @property
+    def text(self) -> str:
+        """Texto aceito da resposta (já cortado, se houve parada)"""
+        return self._text
+
+    @property
+    def released_text(self) -> str:
+        """Texto já liberado para o consumidor"""
+        return self._text[:self._emitted]
+
+    def _find_cut(self) -> Optional[int]:
+        """Posição em que a resposta deve ser cortada, se algum limite foi atingido"""
+        cuts = []
+        for sequence in self.stop_sequences:
+            index = self._text.find(sequence)
+            if index >= 0:
+                cuts.append((index, "sequência de parada"))
+
+        if self.max_sentences is not None and self.sentences >= self.max_sentences:
+            cuts.append((self._sentence_end, f"{self.max_sentences} frase(s)"))
+
+        if self.max_characters is not None and len(self._text) > self.max_characters:
+            # Prefere terminar na última frase completa; sem ela, na última palavra
+            cut = self._sentence_end or self._text.rfind(" ", 0, self.max_characters)
+            cuts.append((cut if cut > 0 else self.max_characters, f"{self.max_characters} caracteres"))
+
+        if not cuts:
+            return None
+        cut, self.reason = min(cuts)
+        return cut
+
+    def feed(self, chunk: str) -> str:
+        """
+        Recebe um pedaço gerado (normalmente um token)
+
+        Args:
+            chunk (str): Texto do pedaço
+
+        Returns:
+            str: Texto liberado para o consumidor (pode ser vazio); depois de
+                uma parada, `stopped` fica True e nada mais é liberado
+        """
+        if self.stopped:
+            return ""
+        self.tokens += 1
+        return self._append(chunk)
+
+    def _append(self, chunk: str) -> str:
+        """Acrescenta texto, atualiza a contagem de frases e aplica os limites"""
+        self._text += chunk
+        for sentence in self._segmenter.feed(chunk):
+            self._sentence_end = self._text.find(sentence, self._sentence_end) + len(sentence)
+            self.sentences += 1
+            if self.max_sentences is not None and self.sentences >= self.max_sentences:
+                break
+
+        cut = self._find_cut()
+        if cut is not None:
+            self.stopped = True
+            self._text = self._text[:cut].rstrip()
+            return self._release(len(self._text))
+
+        # Segura o final que pode ser o começo de uma sequência de parada
+        holdback = max((len(sequence) - 1 for sequence in self.stop_sequences), default=0)
+        return self._release(max(self._emitted, len(self._text) - holdback))
+
+    def _release(self, end: int) -> str:
+        """Libera o texto ainda não emitido até a posição `end`"""
+        released = self._text[self._emitted:end]
+        self._emitted = max(self._emitted, end)
+        return released
+
+    def flush(self, tail: str = "") -> str:
+        """
+        Encerra a resposta e libera o texto retido
+
+        Args:
+            tail (str): Texto final ainda não entregue (ex: bytes pendentes do decodificador)
+
+        Returns:
+            str: Restante da resposta
+        """
+        if self.stopped:
+            return ""
+        released = self._append(tail) if tail else ""
+        return released + self._release(len(self._text))
+
+    def report(self, max_new_tokens: int) -> dict:
+        """
+        Resume a geração controlada
+
+        Args:
+            max_new_tokens (int): Limite de tokens da geração
+
+        Returns:
+            dict: Tokens gerados, tokens evitados (até o limite), frases e motivo da parada
+        """
+        return {
+            "tokens_gerados": self.tokens,
+            "tokens_evitados": max(0, max_new_tokens - self.tokens) if self.stopped else 0,
+            "frases": self.sentences,
+            "motivo": self.reason,
+        }
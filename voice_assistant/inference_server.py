@@ -0,0 +1,359 @@
+"""
+Módulo com o servidor local de inferência da LLM para várias sessões
+
+O ctransformers avalia uma única sequência por instância do modelo (não há
+lotes com várias sequências), então o servidor mantém N "slots", cada um
+com sua instância carregada via mmap (os pesos ficam compartilhados no
+cache de páginas do sistema) e sua thread de geração. As chamadas ao
+ctransformers liberam o GIL, de modo que os slots geram em paralelo.
+
+As requisições entram numa fila justa: cada sessão tem sua própria fila e
+os slots atendem as sessões em rodízio, então uma sessão com muitas
+perguntas não atrasa as demais. Cada requisição pode ser cancelada a
+qualquer momento; o cancelamento é verificado entre um token e outro.
+"""
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Iterator, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(RuntimeError):
+    """A fila de requisições do servidor atingiu o limite"""
+
+
+class GenerationRequest:
+    """Requisição de geração acompanhada desde o envio até o último token"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, prompt: str, session_id: str = "padrao", max_new_tokens: int = 256,
+                 stop: Optional[List[str]] = None):
+        """
+        Inicializa a requisição
+
+        Args:
+            prompt (str): Prompt completo enviado ao modelo
+            session_id (str): Sessão de origem (usada no rodízio entre sessões)
+            max_new_tokens (int): Máximo de tokens gerados
+            stop: Textos que encerram a geração
+        """
+        self.request_id = next(self._ids)
+        self.prompt = prompt
+        self.session_id = session_id
+        self.max_new_tokens = max_new_tokens
+        self.stop = stop
+
+        self.submitted_at = time.perf_counter()
+        self.started_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.tokens = 0
+        self.text = ""
+        self.error: Optional[Exception] = None
+
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._chunks = queue.Queue()
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica se a requisição foi cancelada"""
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        """Indica se a geração terminou (normalmente, com erro ou cancelada)"""
+        return self._done.is_set()
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Tempo entre o envio e o fim da geração (segundos)"""
+        return None if self.finished_at is None else self.finished_at - self.submitted_at
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Tempo entre o envio e o primeiro token (segundos)"""
+        return None if self.first_token_at is None else self.first_token_at - self.submitted_at
+
+    def cancel(self):
+        """Cancela a requisição; se já estiver gerando, para no próximo token"""
+        self._cancelled.set()
+
+    def stream(self) -> Iterator[str]:
+        """
+        Emite os pedaços de texto à medida que são gerados
+
+        Yields:
+            str: Pedaços da resposta
+        """
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        """
+        Aguarda o fim da geração e retorna o texto completo
+
+        Args:
+            timeout (float): Tempo máximo de espera (segundos)
+
+        Returns:
+            str: Texto gerado (parcial se a requisição foi cancelada)
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Requisição {self.request_id} não terminou em {timeout}s")
+        if self.error is not None:
+            raise self.error
+        return self.text
+
+    def _emit(self, chunk: str):
+        """Registra um pedaço gerado"""
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.tokens += 1
+        self.text += chunk
+        self._chunks.put(chunk)
+
+    def _finish(self, error: Optional[Exception] = None):
+        """Marca a requisição como encerrada"""
+        self.error = error
+        self.finished_at = time.perf_counter()
+        self._chunks.put(None)
+        self._done.set()
+
+
+class FairRequestQueue:
+    """Fila de requisições com rodízio entre sessões"""
+
+    def __init__(self, max_size: int):
+        """
+        Inicializa a fila
+
+        Args:
+            max_size (int): Quantidade máxima de requisições aguardando
+        """
+        self.max_size = max_size
+        self._sessions = OrderedDict()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, request: GenerationRequest):
+        """Enfileira uma requisição na fila da sua sessão"""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("O servidor de inferência foi encerrado")
+            if self._size >= self.max_size:
+                raise QueueFullError(f"Fila cheia ({self.max_size} requisições aguardando)")
+            self._sessions.setdefault(request.session_id, deque()).append(request)
+            self._size += 1
+            self._condition.notify()
+
+    def get(self) -> Optional[GenerationRequest]:
+        """
+        Retira a próxima requisição, alternando entre as sessões
+
+        Returns:
+            GenerationRequest: Próxima requisição ou None se a fila foi encerrada
+        """
+        with self._condition:
+            while not self._size and not self._closed:
+                self._condition.wait()
+            if not self._size:
+                return None
+
+            session_id, pending = next(iter(self._sessions.items()))
+            request = pending.popleft()
+            self._size -= 1
+            # A sessão atendida vai para o fim da fila de sessões
+            del self._sessions[session_id]
+            if pending:
+                self._sessions[session_id] = pending
+            return request
+
+    def close(self) -> List[GenerationRequest]:
+        """
+        Encerra a fila, acordando os slots que estão aguardando
+
+        Returns:
+            list: Requisições que ainda não foram atendidas
+        """
+        with self._condition:
+            self._closed = True
+            pending = [request for requests in self._sessions.values() for request in requests]
+            self._sessions.clear()
+            self._size = 0
+            self._condition.notify_all()
+            return pending
+
+
+class InferenceServer:
+    """Servidor local de inferência com slots paralelos e fila justa entre sessões"""
+
+    def __init__(self, model_factory: Callable[[], object], slots: int = 2, max_queue: int = 32):
+        """
+        Inicializa o servidor e carrega um modelo por slot
+
+        Args:
+            model_factory: Função que cria uma instância do modelo ctransformers
+            slots (int): Gerações simultâneas (limite de concorrência)
+            max_queue (int): Máximo de requisições aguardando um slot
+        """
+        self.slots = slots
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.generated_tokens = 0
+
+        self._queue = FairRequestQueue(max_queue)
+        self._stats_lock = threading.Lock()
+        self._active = set()
+
+        logger.info("Carregando %d instância(s) do modelo...", slots)
+        self._models = [model_factory() for _ in range(slots)]
+        self._threads = [
+            threading.Thread(target=self._run_slot, args=(model,), name=f"inferencia-{i}", daemon=True)
+            for i, model in enumerate(self._models)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, prompt: str, session_id: str = "padrao", max_new_tokens: int = 256,
+               stop: Optional[List[str]] = None) -> GenerationRequest:
+        """
+        Envia um prompt para geração sem bloquear
+
+        Args:
+            prompt (str): Prompt completo
+            session_id (str): Sessão de origem
+            max_new_tokens (int): Máximo de tokens gerados
+            stop: Textos que encerram a geração
+
+        Returns:
+            GenerationRequest: Requisição para acompanhar, consumir ou cancelar
+
+        Raises:
+            QueueFullError: Se a fila de espera estiver cheia
+        """
+        request = GenerationRequest(prompt, session_id, max_new_tokens, stop)
+        self._queue.put(request)
+        return request
+
+    def generate(self, prompt: str, session_id: str = "padrao", timeout: Optional[float] = None,
+                 **options) -> str:
+        """
+        Envia um prompt e aguarda o texto completo
+
+        Args:
+            prompt (str): Prompt completo
+            session_id (str): Sessão de origem
+            timeout (float): Tempo máximo de espera (segundos); esgotado, a
+                requisição é cancelada
+            **options: Opções de submit (max_new_tokens, stop)
+
+        Raises:
+            TimeoutError: Se a geração não terminar a tempo
+        """
+        request = self.submit(prompt, session_id, **options)
+        try:
+            return request.result(timeout)
+        except TimeoutError:
+            request.cancel()
+            raise
+
+    def _run_slot(self, model):
+        """Laço de um slot: atende requisições da fila até o servidor ser encerrado"""
+        while True:
+            request = self._queue.get()
+            if request is None:
+                break
+            if request.cancelled:
+                self._record(request)
+                request._finish()
+                continue
+
+            request.started_at = time.perf_counter()
+            with self._stats_lock:
+                self._active.add(request)
+            error = None
+            try:
+                stream = model(request.prompt, stream=True, max_new_tokens=request.max_new_tokens,
+                               stop=request.stop)
+                for chunk in stream:
+                    if request.cancelled:
+                        stream.close()
+                        break
+                    request._emit(chunk)
+            except Exception as e:
+                logger.error("❌ Erro na geração da requisição %d: %s", request.request_id, e)
+                error = e
+            except BaseException as e:
+                # A thread do slot vai morrer: quem aguarda a requisição não pode ficar preso
+                error = RuntimeError(f"Slot de inferência encerrado: {e!r}")
+                raise
+            finally:
+                with self._stats_lock:
+                    self._active.discard(request)
+                request._finish(error)
+                self._record(request)
+
+    def _record(self, request: GenerationRequest):
+        """Atualiza os contadores do servidor"""
+        with self._stats_lock:
+            self.generated_tokens += request.tokens
+            if request.error is not None:
+                self.failed += 1
+            elif request.cancelled:
+                self.cancelled += 1
+            else:
+                self.completed += 1
+
+    def stats(self) -> dict:
+        """
+        Retorna o estado atual do servidor
+
+        Returns:
+            dict: Slots, requisições em andamento, na fila e concluídas
+        """
+        with self._stats_lock:
+            return {
+                "slots": self.slots,
+                "em_andamento": len(self._active),
+                "na_fila": len(self._queue),
+                "concluidas": self.completed,
+                "canceladas": self.cancelled,
+                "falhas": self.failed,
+                "tokens_gerados": self.generated_tokens,
+            }
+
+    def close(self):
+        """Cancela as requisições pendentes e encerra os slots"""
+        for request in self._queue.close():
+            request.cancel()
+            request._finish()
+        with self._stats_lock:
+            for request in self._active:
+                request.cancel()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._models.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
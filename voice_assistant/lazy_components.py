@@ -0,0 +1,143 @@
+"""
+Módulo para inicialização preguiçosa e paralela dos componentes do assistente
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyComponent:
+    """Proxy que cria o componente real apenas no primeiro uso"""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        """
+        Inicializa o proxy sem criar o componente
+
+        Args:
+            name (str): Nome exibido nos logs e no relatório de inicialização
+            factory: Função que cria o componente real
+        """
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        """Nome do componente"""
+        return self._name
+
+    @property
+    def is_loaded(self) -> bool:
+        """Indica se o componente real já foi criado"""
+        return self._instance is not None
+
+    @property
+    def failed(self) -> bool:
+        """Indica se a criação do componente falhou"""
+        return self._error is not None
+
+    def get(self) -> Any:
+        """
+        Retorna o componente real, criando-o se necessário
+
+        Chamadas concorrentes aguardam a mesma inicialização.
+
+        Returns:
+            Any: Instância do componente
+        """
+        if self._instance is not None:
+            return self._instance
+
+        with self._lock:
+            if self._instance is None:
+                if self._error is not None:
+                    raise self._error
+
+                logger.info("⏳ Carregando %s...", self._name)
+                start = time.perf_counter()
+                try:
+                    self._instance = self._factory()
+                except Exception as e:
+                    self._error = e
+                    raise
+                finally:
+                    self.load_seconds = time.perf_counter() - start
+                logger.info("✅ %s pronto em %.2fs", self._name, self.load_seconds)
+
+        return self._instance
+
+    def warm_up(self) -> threading.Thread:
+        """
+        Inicia a criação do componente em uma thread de segundo plano
+
+        Returns:
+            threading.Thread: Thread de aquecimento
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._warm_up, name=f"warmup-{self._name}", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def _warm_up(self):
+        """Cria o componente e registra eventuais erros sem interromper o programa"""
+        try:
+            self.get()
+        except Exception as e:
+            logger.error("❌ Erro ao carregar %s: %s", self._name, e)
+
+    def __getattr__(self, attribute: str) -> Any:
+        # Chamado apenas para atributos que não existem no proxy
+        if attribute.startswith("__") or "_instance" not in self.__dict__:
+            raise AttributeError(attribute)
+        return getattr(self.get(), attribute)
+
+    def __repr__(self) -> str:
+        state = "carregado" if self.is_loaded else "não carregado"
+        return f"<LazyComponent {self._name} ({state})>"
+
+
+def warm_up_all(components: Iterable[LazyComponent], wait: bool = False) -> list:
+    """
+    Aquece vários componentes em paralelo
+
+    Args:
+        components: Componentes a serem carregados
+        wait (bool): Se True, aguarda todos terminarem
+
+    Returns:
+        list: Threads de aquecimento
+    """
+    threads = [component.warm_up() for component in components]
+    if wait:
+        for thread in threads:
+            thread.join()
+    return threads
+
+
+def print_startup_report(components: Iterable[LazyComponent]):
+    """
+    Exibe o tempo de inicialização de cada componente
+
+    Args:
+        components: Componentes do assistente
+    """
+    print("\n⏱️ RELATÓRIO DE INICIALIZAÇÃO")
+    print("-" * 40)
+    total = 0.0
+    for component in components:
+        if component.load_seconds is None:
+            print(f"{component.name:<28} não carregado")
+        elif component.failed:
+            print(f"{component.name:<28} {component.load_seconds:7.2f}s (erro)")
+        else:
+            total += component.load_seconds
+            print(f"{component.name:<28} {component.load_seconds:7.2f}s")
+    print("-" * 40)
+    print(f"{'Soma dos tempos':<28} {total:7.2f}s")
@@ -5,19 +5,81 @@ from langchain_community.llms import CTransformers
 from langchain.prompts import PromptTemplate
 from langchain_core.runnables import RunnableSequence
 from pathlib import Path
+from typing import Iterator, Optional
+import logging
 import os
+import time
+
+from conversation import ConversationSession, generated_tokens
+from generation_controller import GenerationController
+from llm_profiles import backend_config, get_profile, load_profiles
+from model_registry import get_model_entry, model_path as registry_model_path
+from response_cache import ResponseCache
+from tracing import trace_stream, tracer
+
+logger = logging.getLogger(__name__)
+
+# Instruções do assistente, enviadas no início de todo prompt
+SYSTEM_PROMPT = """Você é um assistente de voz útil e amigável. Responda de forma clara, concisa e prestativa.
+        
+        Instruções:
+        - Seja sempre educado e prestativo
+        - Mantenha as respostas relativamente curtas (máximo 2-3 frases)
+        - Se não souber algo, admita que não sabe
+        - Responda sempre em português brasileiro
+        
+        """
+
+# Resposta devolvida quando a geração falha
+ERROR_RESPONSE = "Desculpe, ocorreu um erro ao processar sua pergunta."
+
+# Template de cada pergunta; a resposta do modelo vem logo em seguida
+QUESTION_TEMPLATE = """Pergunta do usuário: {question}
+        
+        Resposta:"""
 
 class LLMManager:
     """Classe para gerenciar a Large Language Model"""
     
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, use_response_cache: bool = True,
+                 response_cache: Optional[ResponseCache] = None, profile: Optional[str] = None,
+                 profiles_path: Optional[str] = None, max_sentences: Optional[int] = 3,
+                 max_characters: Optional[int] = 600, model_name: Optional[str] = None, llm=None,
+                 semantic_threshold: Optional[float] = None):
         """
         Inicializa o gerenciador da LLM
         
         Args:
             model_path (str): Caminho para o arquivo do modelo
+            model_name (str): Nome do modelo em models_registry.json (alternativa a model_path)
+            profile (str): Perfil de execução de llm_profiles.json (None usa o padrão)
+            profiles_path (str): Arquivo de perfis alternativo
+            use_response_cache (bool): Se True, perguntas repetidas são respondidas
+                a partir do cache de respostas
+            response_cache (ResponseCache): Cache a ser usado (padrão: cache em disco do usuário,
+                separado por modelo e perfil)
+            semantic_threshold (float): Similaridade mínima do nível semântico do
+                cache padrão (ex: 0.9); None usa só o nível exato
+            max_sentences (int): Frases faladas por resposta; a geração para ao
+                completá-las (None: sem limite)
+            max_characters (int): Caracteres por resposta (None: sem limite)
+            llm: Modelo já carregado, com a interface do ctransformers (ex: modelo
+                determinístico dos benchmarks); dispensa model_path
         """
-        if model_path is None:
+        model_type = None
+        if model_path is None and model_name is not None:
+            # Modelo escolhido pelo nome no manifesto
+            entry = get_model_entry(model_name)
+            model_path = str(registry_model_path(model_name))
+            model_type = entry.get("model_type")
+            if not Path(model_path).exists():
+                raise FileNotFoundError(
+                    f"Modelo '{model_name}' não encontrado em {model_path}. "
+                    f"Execute: python download_model.py {model_name}"
+                )
+            logger.info("Modelo selecionado: %s (%s)", model_name, entry['quantizacao'])
+        
+        if model_path is None and llm is None:
             # Procura pelo modelo na pasta models
             models_dir = Path("models")
             model_files = list(models_dir.glob("*.gguf"))
@@ -29,11 +91,24 @@ class LLMManager:
                 )
             
             model_path = str(model_files[0])
-            print(f"Modelo encontrado: {model_path}")
+            logger.info("Modelo encontrado: %s", model_path)
         
         self.model_path = model_path
-        self.llm = None
+        self.profile_name = profile or load_profiles(profiles_path)["perfil_padrao"]
+        self.profile = get_profile(self.profile_name, profiles_path)
+        self.model_type = model_type or self.profile["model_type"]
+        self.llm = llm
+        self.config = None
+        self.prompt = None
         self.chain = None
+        self.max_sentences = max_sentences
+        self.max_characters = max_characters
+        self.response_cache = None
+        if use_response_cache:
+            # Respostas de outro modelo ou perfil não são reaproveitadas
+            model = str(Path(model_path).resolve()) if model_path else type(llm).__name__
+            self.response_cache = response_cache or ResponseCache(
+                similarity_threshold=semantic_threshold, namespace=f"{model}:{self.profile_name}")
         
         # Carrega o modelo e configura a cadeia
         self._load_model()
@@ -41,23 +116,21 @@ class LLMManager:
     
     def _load_model(self):
         """Carrega o modelo LLM usando ctransformers"""
-        print("Carregando modelo LLM...")
+        # Configurações do modelo vindas do perfil de execução
+        self.config = backend_config(self.profile)
+        if self.llm is not None:
+            logger.info("Usando o modelo fornecido (%s)", type(self.llm).__name__)
+            return
         
-        # Configurações do modelo
-        config = {
-            'max_new_tokens': 512,
-            'temperature': 0.7,
-            'context_length': 2048,
-            'repetition_penalty': 1.1,
-        }
+        logger.info("Carregando modelo LLM (%s)...", self.profile.get('descricao') or 'perfil padrão')
         
         try:
             self.llm = CTransformers(
                 model=self.model_path,
-                model_type="llama",
-                config=config
+                model_type=self.model_type,
+                config=self.config
             )
-            print("Modelo LLM carregado com sucesso!")
+            logger.info("Modelo LLM carregado com sucesso!")
             
         except Exception as e:
             raise RuntimeError(f"Erro ao carregar o modelo: {e}")
@@ -66,59 +139,209 @@ class LLMManager:
         """Configura a cadeia do LangChain com prompt personalizado"""
         
         # Template do prompt para o assistente
-        prompt_template = """Você é um assistente de voz útil e amigável. Responda de forma clara, concisa e prestativa.
-        
-        Instruções:
-        - Seja sempre educado e prestativo
-        - Mantenha as respostas relativamente curtas (máximo 2-3 frases)
-        - Se não souber algo, admita que não sabe
-        - Responda sempre em português brasileiro
-        
-        Pergunta do usuário: {question}
-        
-        Resposta:"""
+        prompt_template = SYSTEM_PROMPT + QUESTION_TEMPLATE
         
         # Cria o template de prompt
-        prompt = PromptTemplate(
+        self.prompt = PromptTemplate(
             input_variables=["question"],
             template=prompt_template
         )
         
         # Cria a cadeia LangChain usando a nova sintaxe recomendada
-        self.chain = prompt | self.llm
+        self.chain = self.prompt | self.llm
         
-        print("Cadeia LangChain configurada!")
+        logger.info("Cadeia LangChain configurada!")
     
-    def generate_response(self, question: str) -> str:
+    def start_session(self) -> ConversationSession:
+        """
+        Inicia uma conversa com memória dos turnos anteriores
+        
+        As instruções e o histórico são reaproveitados do estado do modelo
+        entre os turnos; quando o contexto enche, os turnos mais antigos
+        são descartados.
+        
+        Returns:
+            ConversationSession: Sessão a ser passada para generate_response
+        """
+        return ConversationSession(
+            self.llm.client,
+            SYSTEM_PROMPT,
+            QUESTION_TEMPLATE,
+            context_length=self.config['context_length'],
+            max_new_tokens=self.config['max_new_tokens'],
+            temperature=self.config['temperature'],
+            repetition_penalty=self.config['repetition_penalty'],
+        )
+    
+    def generate_response(self, question: str, session: Optional[ConversationSession] = None) -> str:
         """
         Gera uma resposta para a pergunta do usuário
         
         Args:
             question (str): Pergunta do usuário
+            session (ConversationSession): Conversa em andamento (opcional);
+                sem ela, cada pergunta é respondida isoladamente
             
         Returns:
             str: Resposta gerada pela LLM
         """
         try:
-            print(f"Processando pergunta: {question}")
+            logger.info("Processando pergunta: %s", question)
             
-            # Gera a resposta usando a nova sintaxe RunnableSequence
-            response = self.chain.invoke({"question": question})
+            with tracer.span("llm", conversa=session is not None) as span:
+                # Respostas em conversa dependem do histórico e não passam pelo cache
+                cached = self._cached_response(question) if session is None else None
+                span.set(cache=cached is not None)
+                if cached is not None:
+                    return cached
+                
+                controller = self.create_controller()
+                if session is not None or controller is not None:
+                    # Geração token a token, para poder parar ao atingir o limite
+                    response = "".join(self._generate_stream(question, session, controller))
+                else:
+                    # Gera a resposta usando a nova sintaxe RunnableSequence
+                    response = self.chain.invoke({"question": question})
             
             # Limpa a resposta removendo espaços extras
             response = response.strip()
             
-            print(f"Resposta gerada: {response}")
+            logger.info("Resposta gerada: %s", response)
+            if session is None and self.response_cache is not None:
+                self.response_cache.put(question, response)
             return response
             
         except Exception as e:
-            error_msg = f"Erro ao gerar resposta: {e}"
-            print(error_msg)
-            return "Desculpe, ocorreu um erro ao processar sua pergunta."
+            logger.error("Erro ao gerar resposta: %s", e)
+            return ERROR_RESPONSE
+    
+    def generate_response_stream(self, question: str,
+                                 session: Optional[ConversationSession] = None) -> Iterator[str]:
+        """
+        Gera uma resposta emitindo os tokens à medida que são produzidos
+        
+        O wrapper CTransformers do LangChain só entrega a resposta completa,
+        então os tokens são lidos diretamente do modelo ctransformers.
+        
+        Args:
+            question (str): Pergunta do usuário
+            session (ConversationSession): Conversa em andamento (opcional)
+            
+        Yields:
+            str: Pedaços de texto da resposta, na ordem em que são gerados
+        """
+        logger.info("Processando pergunta (streaming): %s", question)
+        
+        if session is not None:
+            yield from self._generate_stream(question, session, self.create_controller())
+            return
+        
+        cached = self._cached_response(question)
+        if cached is not None:
+            yield cached
+            return
+        
+        response = ""
+        for chunk in self._generate_stream(question, None, self.create_controller()):
+            response += chunk
+            yield chunk
+        
+        if self.response_cache is not None:
+            self.response_cache.put(question, response.strip())
+    
+    def create_controller(self) -> Optional[GenerationController]:
+        """
+        Cria o controle de tamanho de uma resposta
+        
+        Returns:
+            GenerationController: Controlador com os limites do gerenciador, ou
+                None se não houver limite de frases nem de caracteres
+        """
+        if self.max_sentences is None and self.max_characters is None:
+            return None
+        return GenerationController(max_sentences=self.max_sentences, max_characters=self.max_characters)
+    
+    def _generate_stream(self, question: str, session: Optional[ConversationSession],
+                         controller: Optional[GenerationController]) -> Iterator[str]:
+        """Gera a resposta token a token, parando quando o controlador atinge o limite"""
+        if session is not None:
+            yield from session.ask_stream(question, controller)
+        elif controller is None:
+            yield from self._token_stream(question)
+            return
+        else:
+            stream = self._token_stream(question)
+            for token in stream:
+                released = controller.feed(token)
+                if released:
+                    yield released
+                if controller.stopped:
+                    # Interrompe a geração no modelo
+                    stream.close()
+                    break
+            released = controller.flush()
+            if released:
+                yield released
+        
+        if controller is not None and controller.stopped:
+            report = controller.report(self.config['max_new_tokens'])
+            logger.info("✂️ Resposta encerrada por %s: %d tokens gerados, até %d evitados",
+                        report['motivo'], report['tokens_gerados'], report['tokens_evitados'])
+    
+    def _token_stream(self, question: str) -> Iterator[str]:
+        """Tokens do modelo para uma pergunta, medindo o prompt e a geração"""
+        tokens = self.llm.client(self.prompt.format(question=question), stream=True)
+        return trace_stream(tokens, "llm.prompt", "llm.geracao", generated_tokens)
+    
+    def create_inference_server(self, slots: int = 2, max_queue: int = 32):
+        """
+        Cria um servidor de inferência para atender várias sessões ao mesmo tempo
+        
+        Cada slot carrega sua própria instância do modelo. Com threads=-1 no
+        perfil (automático), as threads da CPU são divididas entre os slots;
+        um valor fixo do perfil (ex: do autoajuste) é usado em cada slot.
+        
+        Args:
+            slots (int): Gerações simultâneas
+            max_queue (int): Máximo de requisições aguardando
+            
+        Returns:
+            InferenceServer: Servidor pronto para receber prompts
+        """
+        from ctransformers import AutoModelForCausalLM
+        from inference_server import InferenceServer
+        
+        config = dict(self.config)
+        if config.get('threads', -1) == -1:
+            config['threads'] = max(1, (os.cpu_count() or 1) // slots)
+        
+        def create_model():
+            return AutoModelForCausalLM.from_pretrained(
+                self.model_path, model_type=self.model_type, **config
+            )
+        
+        return InferenceServer(create_model, slots=slots, max_queue=max_queue)
+    
+    def format_prompt(self, question: str) -> str:
+        """Monta o prompt completo do assistente para uma pergunta"""
+        return self.prompt.format(question=question)
+    
+    def _cached_response(self, question: str) -> Optional[str]:
+        """Busca a resposta no cache de respostas, se habilitado"""
+        if self.response_cache is None:
+            return None
+        
+        start = time.perf_counter()
+        response = self.response_cache.get(question)
+        if response is not None:
+            stats = self.response_cache.stats()
+            logger.info("⚡ Resposta do cache em %.1fms (taxa de acerto: %.0f%%)",
+                        (time.perf_counter() - start) * 1000, stats['taxa_acerto'] * 100)
+        return response
     
     def test_model(self):
         """Testa o modelo com uma pergunta simples"""
         test_question = "Olá, como você está?"
-        print("Testando o modelo...")
+        logger.info("Testando o modelo...")
         response = self.generate_response(test_question)
         return response
@@ -0,0 +1,243 @@
+"""
+Módulo com os perfis de execução da LLM
+
+Os perfis ficam em llm_profiles.json e reúnem todos os parâmetros do
+ctransformers: geração (max_new_tokens, temperature, stop, ...), avaliação
+do prompt (threads, batch_size) e carregamento (context_length, mmap,
+mlock). O comando de autoajuste mede combinações de threads e batch_size
+nesta máquina e grava a mais rápida como um novo perfil.
+
+Uso:
+    python llm_profiles.py listar
+    python llm_profiles.py autoajuste --base baixa-latencia --threads 2 4 8 --lotes 8 32 128
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Optional
+
+# Adiciona o diretório atual ao path para importações
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Arquivo padrão dos perfis
+DEFAULT_PROFILES_PATH = Path(__file__).with_name("llm_profiles.json")
+
+# Parâmetros aceitos pelo ctransformers (além de model_type)
+BACKEND_KEYS = {
+    "max_new_tokens", "temperature", "top_k", "top_p", "repetition_penalty", "last_n_tokens",
+    "seed", "context_length", "threads", "batch_size", "mmap", "mlock", "gpu_layers", "stop",
+}
+
+# Prompt usado para medir a velocidade no autoajuste
+AUTOTUNE_PROMPT = (
+    "Você é um assistente de voz útil e amigável. Responda de forma clara e concisa.\n\n"
+    "Pergunta do usuário: Explique em poucas frases como funciona a fotossíntese.\n\nResposta:"
+)
+
+
+def load_profiles(path: Optional[str] = None) -> dict:
+    """
+    Lê o arquivo de perfis
+
+    Args:
+        path (str): Arquivo JSON dos perfis (None usa o padrão)
+
+    Returns:
+        dict: Conteúdo do arquivo ('perfil_padrao' e 'perfis')
+    """
+    with open(path or DEFAULT_PROFILES_PATH, "r", encoding="utf-8") as profiles_file:
+        return json.load(profiles_file)
+
+
+def get_profile(name: Optional[str] = None, path: Optional[str] = None) -> dict:
+    """
+    Retorna as configurações de um perfil
+
+    Args:
+        name (str): Nome do perfil (None usa o perfil padrão do arquivo)
+        path (str): Arquivo JSON dos perfis
+
+    Returns:
+        dict: Configurações do perfil (model_type e parâmetros do ctransformers)
+    """
+    data = load_profiles(path)
+    name = name or data["perfil_padrao"]
+    try:
+        profile = dict(data["perfis"][name])
+    except KeyError:
+        raise ValueError(f"Perfil de LLM desconhecido: {name} (disponíveis: {', '.join(data['perfis'])})")
+
+    unknown = set(profile) - BACKEND_KEYS - {"model_type", "descricao"}
+    if unknown:
+        raise ValueError(f"Parâmetros desconhecidos no perfil '{name}': {', '.join(sorted(unknown))}")
+    return profile
+
+
+def backend_config(profile: dict) -> dict:
+    """
+    Extrai do perfil os parâmetros repassados ao ctransformers
+
+    Args:
+        profile (dict): Configurações do perfil
+
+    Returns:
+        dict: Parâmetros do ctransformers (sem model_type e descrição)
+    """
+    return {key: value for key, value in profile.items() if key in BACKEND_KEYS}
+
+
+def save_profile(name: str, profile: dict, path: Optional[str] = None, make_default: bool = False):
+    """
+    Grava (ou substitui) um perfil no arquivo de forma atômica
+
+    Args:
+        name (str): Nome do perfil
+        profile (dict): Configurações do perfil
+        path (str): Arquivo JSON dos perfis
+        make_default (bool): Se True, o perfil passa a ser o padrão
+    """
+    path = Path(path or DEFAULT_PROFILES_PATH)
+    data = load_profiles(path)
+    data["perfis"][name] = profile
+    if make_default:
+        data["perfil_padrao"] = name
+
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+            json.dump(data, temp_file, ensure_ascii=False, indent=2)
+            temp_file.write("\n")
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def _measure(llm, tokens: list, threads: int, batch_size: int, new_tokens: int) -> dict:
+    """Mede a avaliação do prompt e a geração com uma combinação de threads e lote"""
+    # Descarta o contexto anterior para que o prompt seja avaliado do zero
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        llm.reset()
+
+    start = time.perf_counter()
+    first_token_at = None
+    generated = 0
+    for _ in llm.generate(tokens, threads=threads, batch_size=batch_size, seed=42):
+        generated += 1
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        if generated >= new_tokens:
+            break
+    end = time.perf_counter()
+    first_token_at = first_token_at or end
+
+    return {
+        "avaliacao_prompt_s": first_token_at - start,
+        "tokens_por_segundo": (generated - 1) / (end - first_token_at) if generated > 1 else 0.0,
+        "total_s": end - start,
+    }
+
+
+def autotune(model_path: str, base: Optional[str] = None, threads_options: Optional[list] = None,
+             batch_options: Optional[list] = None, new_tokens: int = 32, path: Optional[str] = None) -> dict:
+    """
+    Mede combinações de threads e batch_size e retorna o perfil mais rápido
+
+    Args:
+        model_path (str): Arquivo do modelo GGUF
+        base (str): Perfil usado como base (None usa o padrão)
+        threads_options (list): Quantidades de threads avaliadas
+        batch_options (list): Tamanhos de lote da avaliação do prompt avaliados
+        new_tokens (int): Tokens gerados em cada medição
+        path (str): Arquivo JSON dos perfis
+
+    Returns:
+        dict: Perfil base com os melhores threads e batch_size
+    """
+    from ctransformers import AutoModelForCausalLM
+
+    profile = get_profile(base, path)
+    cpus = os.cpu_count() or 1
+    threads_options = threads_options or sorted({1, max(1, cpus // 4), max(1, cpus // 2), cpus})
+    batch_options = batch_options or [8, 32, 128]
+
+    print(f"Carregando modelo para autoajuste: {model_path}")
+    llm = AutoModelForCausalLM.from_pretrained(model_path, model_type=profile["model_type"],
+                                               **backend_config(profile))
+    tokens = llm.tokenize(AUTOTUNE_PROMPT)
+
+    # Aquecimento (carrega as páginas do modelo na memória)
+    _measure(llm, tokens, threads_options[-1], batch_options[0], 2)
+
+    print(f"\n⏱️ Autoajuste ({len(tokens)} tokens de prompt, {new_tokens} tokens gerados)")
+    best = None
+    for threads in threads_options:
+        for batch_size in batch_options:
+            result = _measure(llm, tokens, threads, batch_size, new_tokens)
+            print(f"threads {threads:>3} | lote {batch_size:>4} | "
+                  f"prompt {result['avaliacao_prompt_s'] * 1000:8.1f} ms | "
+                  f"{result['tokens_por_segundo']:6.2f} tokens/s | total {result['total_s']:6.2f} s")
+            if best is None or result["total_s"] < best[2]["total_s"]:
+                best = (threads, batch_size, result)
+
+    threads, batch_size, result = best
+    print(f"\n🏆 Mais rápido: threads={threads}, batch_size={batch_size} ({result['total_s']:.2f} s)")
+
+    tuned = dict(profile)
+    tuned["threads"] = threads
+    tuned["batch_size"] = batch_size
+    tuned["descricao"] = f"{profile.get('descricao', '')} (autoajustado: {threads} threads, lote {batch_size})".strip()
+    return tuned
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Perfis de execução da LLM")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    listing = subparsers.add_parser("listar", help="Lista os perfis disponíveis")
+
+    tune = subparsers.add_parser("autoajuste", help="Mede threads e lotes e grava o perfil mais rápido")
+    tune.add_argument("--modelo", default=None, help="Arquivo do modelo (padrão: primeiro .gguf em models/)")
+    tune.add_argument("--base", default=None, help="Perfil base (padrão: perfil padrão)")
+    tune.add_argument("--threads", type=int, nargs="+", default=None, help="Quantidades de threads")
+    tune.add_argument("--lotes", type=int, nargs="+", default=None, help="Tamanhos de lote")
+    tune.add_argument("--tokens", type=int, default=32, help="Tokens gerados em cada medição")
+    tune.add_argument("--nome", default="autoajustado", help="Nome do perfil gravado")
+    tune.add_argument("--definir-padrao", action="store_true", help="Torna o perfil gravado o padrão")
+
+    for subparser in (listing, tune):
+        subparser.add_argument("--arquivo", default=None, help="Arquivo de perfis")
+    args = parser.parse_args()
+
+    if args.command == "listar":
+        data = load_profiles(args.arquivo)
+        for name, profile in data["perfis"].items():
+            marker = "*" if name == data["perfil_padrao"] else " "
+            print(f"{marker} {name:<16} ctx {profile['context_length']:>5} | "
+                  f"máx. {profile['max_new_tokens']:>4} tokens | threads {profile['threads']:>3} | "
+                  f"lote {profile['batch_size']:>4} | {profile.get('descricao', '')}")
+        return
+
+    model_path = args.modelo
+    if model_path is None:
+        model_files = sorted(Path("models").glob("*.gguf"))
+        if not model_files:
+            print("❌ Modelo LLM não encontrado! Execute primeiro: python download_model.py")
+            return
+        model_path = str(model_files[0])
+
+    tuned = autotune(model_path, base=args.base, threads_options=args.threads, batch_options=args.lotes,
+                     new_tokens=args.tokens, path=args.arquivo)
+    save_profile(args.nome, tuned, path=args.arquivo, make_default=args.definir_padrao)
+    print(f"💾 Perfil '{args.nome}' gravado" + (" como padrão" if args.definir_padrao else ""))
+
+
+if __name__ == "__main__":
+    main()
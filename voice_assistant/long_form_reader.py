@@ -0,0 +1,186 @@
+"""
+Módulo para leitura em voz alta de textos longos
+
+O texto é dividido em trechos (frases agrupadas até um tamanho máximo, sem
+atravessar parágrafos) que são sintetizados em paralelo por um pool de
+threads limitado. Cada trecho entra na fila de reprodução assim que fica
+pronto, sempre na ordem do texto, de modo que o primeiro áudio começa após
+a síntese de um único trecho, e não do texto inteiro. A antecipação
+(look-ahead) limita quantos trechos ficam sintetizados à frente da
+reprodução, mantendo a memória constante em textos de qualquer tamanho.
+"""
+import logging
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from playback_queue import PlaybackTicket
+from text_segmenter import split_sentences
+
+# Tamanho máximo de um trecho sintetizado de uma vez (caracteres)
+DEFAULT_MAX_CHUNK_CHARS = 300
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReadingReport:
+    """Resumo de uma leitura em voz alta"""
+    chunks: int = 0
+    failed: int = 0
+    characters: int = 0
+    time_to_first_audio: Optional[float] = None
+    total_seconds: float = 0.0
+    interrupted: bool = False
+
+
+def split_chunks(text: str, max_chars: int = DEFAULT_MAX_CHUNK_CHARS) -> Iterator[str]:
+    """
+    Divide um texto em trechos para síntese
+
+    Frases consecutivas do mesmo parágrafo são agrupadas até `max_chars`;
+    uma frase maior que o limite forma um trecho sozinha.
+
+    Args:
+        text (str): Texto completo
+        max_chars (int): Tamanho máximo de um trecho (caracteres)
+
+    Yields:
+        str: Trechos na ordem do texto
+    """
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+
+        chunk = ""
+        for sentence in split_sentences(paragraph):
+            if chunk and len(chunk) + 1 + len(sentence) > max_chars:
+                yield chunk
+                chunk = ""
+            chunk = f"{chunk} {sentence}" if chunk else sentence
+        if chunk:
+            yield chunk
+
+
+class LongFormReader:
+    """Lê textos longos sintetizando trechos em paralelo e tocando-os em ordem"""
+
+    def __init__(self, synthesizer, workers: int = 3, look_ahead: int = 4):
+        """
+        Inicializa o leitor
+
+        Args:
+            synthesizer (VoiceSynthesizer): Sintetizador usado na síntese e na reprodução
+            workers (int): Sínteses simultâneas
+            look_ahead (int): Máximo de trechos sintetizados (ou em síntese) à frente
+                do trecho que está tocando
+        """
+        self.synthesizer = synthesizer
+        self.workers = max(1, workers)
+        self.look_ahead = max(1, look_ahead)
+
+    @staticmethod
+    def _text(chunk) -> str:
+        """Texto de um trecho (texto puro ou objeto com atributo `text`, ex: frase de documento)"""
+        return chunk if isinstance(chunk, str) else chunk.text
+
+    def _prepare(self, chunk):
+        """Sintetiza e decodifica um trecho (executado no pool)"""
+        return self.synthesizer.player.decode(self.synthesizer.synthesize(self._text(chunk)))
+
+    def read(self, chunks: Iterable, on_chunk=None, on_played=None) -> ReadingReport:
+        """
+        Lê os trechos em voz alta e aguarda o fim da reprodução
+
+        Os trechos são consumidos do iterável sob demanda, então ele pode ser
+        um gerador preguiçoso (ex: frases lidas de um arquivo grande).
+
+        Args:
+            chunks: Trechos na ordem de leitura (textos ou objetos com atributo `text`)
+            on_chunk: Função chamada com (índice, trecho) quando um trecho é
+                enfileirado para reprodução
+            on_played: Função chamada com (índice, trecho) quando um trecho termina
+                de tocar (ex: atualizar um marcador de leitura)
+
+        Returns:
+            ReadingReport: Tempo até o primeiro áudio, tempo total e contagem de trechos
+        """
+        report = ReadingReport()
+        start = time.perf_counter()
+        chunk_iterator = iter(chunks)
+        pending = deque()  # (trecho, future) em síntese, na ordem do texto
+        queued = deque()   # (índice, trecho, ticket) na fila de reprodução ainda não concluídos
+        epoch = self.synthesizer.playback.epoch
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="leitura")
+
+        def fill():
+            """Mantém a janela de antecipação cheia"""
+            while len(pending) + len(queued) < self.look_ahead:
+                chunk = next(chunk_iterator, None)
+                if chunk is None:
+                    return
+                pending.append((chunk, executor.submit(self._prepare, chunk)))
+
+        def release_played(wait_all: bool) -> bool:
+            """
+            Remove os tickets já tocados, aguardando enquanto a janela estiver cheia
+            (ou até o fim, com wait_all); retorna False se a leitura foi interrompida
+            """
+            while queued:
+                window_full = len(pending) + len(queued) >= self.look_ahead
+                if not queued[0][2].done and not (wait_all or window_full):
+                    break
+                index, chunk, ticket = queued.popleft()
+                ticket.wait()
+                if report.time_to_first_audio is None and ticket.started_at is not None:
+                    report.time_to_first_audio = ticket.started_at - start
+                if ticket.cancelled:
+                    return False
+                if on_played and ticket.completed:
+                    on_played(index, chunk)
+            return True
+
+        try:
+            fill()
+            index = 0
+            while pending:
+                chunk, future = pending.popleft()
+                try:
+                    sound = future.result()
+                except Exception as e:
+                    logger.warning("⚠️ Trecho %d não sintetizado, pulando: %s", index + 1, e)
+                    report.failed += 1
+                else:
+                    if on_chunk:
+                        on_chunk(index, chunk)
+                    ticket = PlaybackTicket(self._text(chunk))
+                    queued.append((index, chunk, self.synthesizer.playback.enqueue(sound, ticket=ticket,
+                                                                                   epoch=epoch)))
+                    report.chunks += 1
+                    report.characters += len(self._text(chunk))
+                index += 1
+
+                if not release_played(wait_all=False):
+                    report.interrupted = True
+                    break
+                fill()
+
+            if not report.interrupted and not release_played(wait_all=True):
+                report.interrupted = True
+
+        except KeyboardInterrupt:
+            report.interrupted = True
+            self.synthesizer.stop_speaking()
+            raise
+
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+            report.total_seconds = time.perf_counter() - start
+
+        return report
@@ -2,188 +2,336 @@
 Assistente de Voz Principal
 Integra reconhecimento de voz, LLM e síntese de voz usando LangChain
 """
+import argparse
+import asyncio
+import logging
 import os
 import sys
+import time
 from pathlib import Path
 
 # Adiciona o diretório atual ao path para importações
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from voice_recognizer import VoiceRecognizer
-from llm_manager import LLMManager
-from voice_synthesizer import VoiceSynthesizer
+from lazy_components import LazyComponent, print_startup_report, warm_up_all
+from resilience import Deadline
+from text_segmenter import SentenceSegmenter
+from tracing import DEFAULT_TRACE_PATH, configure_logging, configure_tracing, tracer
+
+# Tempo máximo para sintetizar a resposta de uma interação (segundos)
+SPEECH_DEADLINE_SECONDS = 10.0
+
+logger = logging.getLogger(__name__)
+
+
+def _create_voice_recognizer(model_name: str = "base", quantize: bool = False, decoding: str = None):
+    """Cria o reconhecedor de voz (importa Whisper apenas quando necessário)"""
+    from voice_recognizer import VoiceRecognizer
+    return VoiceRecognizer(model_name=model_name, calibrate_on_init=False, quantize=quantize,
+                           decoding=decoding)
+
+
+def _create_llm_manager(profile: str = None, model_name: str = None, semantic_threshold: float = None):
+    """Cria o gerenciador da LLM (importa LangChain apenas quando necessário)"""
+    from llm_manager import LLMManager
+    return LLMManager(profile=profile, model_name=model_name, semantic_threshold=semantic_threshold)
+
+
+def _create_voice_synthesizer(backend: str = "gtts"):
+    """Cria o sintetizador de voz (importa gTTS e pygame apenas quando necessário)"""
+    from voice_synthesizer import VoiceSynthesizer
+    fallback_backends = [name for name in ("gtts", "espeak") if name != backend]
+    return VoiceSynthesizer(language='pt-br', backend=backend, fallback_backends=fallback_backends)
+
 
 class VoiceAssistant:
     """Classe principal do assistente de voz"""
     
-    def __init__(self):
-        """Inicializa o assistente de voz"""
+    def __init__(self, streaming_input: bool = False, lazy: bool = True, parallel_warmup: bool = False,
+                 streaming_responses: bool = False, tts_backend: str = "gtts",
+                 async_playback: bool = False, conversation_memory: bool = False,
+                 llm_profile: str = None, llm_model: str = None, whisper_model: str = "base",
+                 whisper_int8: bool = False, whisper_decoding: str = None,
+                 speech_deadline: float = SPEECH_DEADLINE_SECONDS, cache_similarity: float = None):
+        """
+        Inicializa o assistente de voz
+        
+        Args:
+            streaming_input (bool): Se True, o modo interativo usa reconhecimento
+                em streaming, exibindo transcrições parciais enquanto o usuário fala
+            streaming_responses (bool): Se True, cada frase da resposta da LLM é
+                falada assim que fica completa, enquanto a geração continua
+            lazy (bool): Se True, cada componente só é carregado no primeiro uso
+            parallel_warmup (bool): Se True, carrega todos os componentes em
+                threads de segundo plano logo após a inicialização
+            conversation_memory (bool): Se True, a LLM lembra dos turnos anteriores
+                da conversa, reaproveitando o prompt já avaliado
+            llm_profile (str): Perfil de execução da LLM (llm_profiles.json)
+            llm_model (str): Modelo da LLM pelo nome em models_registry.json
+                (padrão: primeiro .gguf da pasta models)
+            whisper_model (str): Modelo Whisper (tiny, base, small...) ou "auto"
+                para escolher pela latência medida nesta máquina
+            whisper_int8 (bool): Se True, quantiza o modelo Whisper para int8 (CPU)
+            whisper_decoding (str): Preset de decodificação do Whisper (decoding_presets.py)
+            speech_deadline (float): Prazo da síntese da resposta de cada interação;
+                esgotado, só o cache e o motor local são usados
+            cache_similarity (float): Similaridade mínima para reaproveitar a resposta
+                de uma pergunta parecida (cache semântico); None usa só o cache exato
+        """
         print("=" * 50)
         print("INICIALIZANDO ASSISTENTE DE VOZ")
         print("=" * 50)
         
+        self.streaming_input = streaming_input
+        self.streaming_responses = streaming_responses
+        self.tts_backend = tts_backend
+        self.llm_profile = llm_profile
+        self.llm_model = llm_model
+        self.cache_similarity = cache_similarity
+        self.whisper_model = whisper_model
+        self.whisper_int8 = whisper_int8
+        self.whisper_decoding = whisper_decoding
+        self.speech_deadline = speech_deadline
+        self.async_playback = async_playback
+        self.conversation_memory = conversation_memory
+        self.conversation = None
+        
         # Inicializa os componentes
         self.voice_recognizer = None
         self.llm_manager = None
         self.voice_synthesizer = None
         
         # Configura os componentes
-        self._setup_components()
+        self._setup_components(lazy=lazy, parallel_warmup=parallel_warmup)
         
         print("=" * 50)
         print("ASSISTENTE DE VOZ PRONTO!")
         print("=" * 50)
     
-    def _setup_components(self):
-        """Configura todos os componentes do assistente"""
+    def _setup_components(self, lazy: bool = True, parallel_warmup: bool = False):
+        """
+        Configura todos os componentes do assistente
+        
+        Args:
+            lazy (bool): Se True, adia o carregamento de cada componente para o primeiro uso
+            parallel_warmup (bool): Se True, carrega os componentes em paralelo em segundo plano
+        """
         
         try:
-            # 1. Inicializa o reconhecedor de voz
-            print("\\n1. Configurando reconhecimento de voz...")
-            self.voice_recognizer = VoiceRecognizer(model_name="base")
+            # 1. Reconhecedor de voz (a calibração do microfone fica para a primeira escuta)
+            self.voice_recognizer = LazyComponent(
+                "Reconhecimento de voz", lambda: _create_voice_recognizer(self.whisper_model, self.whisper_int8,
+                                                                          self.whisper_decoding)
+            )
             
-            # 2. Inicializa o gerenciador da LLM
-            print("\\n2. Configurando Large Language Model...")
-            self.llm_manager = LLMManager()
+            # 2. Gerenciador da LLM
+            self.llm_manager = LazyComponent(
+                "Large Language Model", lambda: _create_llm_manager(self.llm_profile, self.llm_model,
+                                                                     self.cache_similarity)
+            )
             
-            # 3. Inicializa o sintetizador de voz
-            print("\\n3. Configurando síntese de voz...")
-            self.voice_synthesizer = VoiceSynthesizer(language='pt-br')
+            # 3. Sintetizador de voz
+            self.voice_synthesizer = LazyComponent(
+                "Síntese de voz", lambda: _create_voice_synthesizer(self.tts_backend)
+            )
             
-            print("\\n✅ Todos os componentes configurados com sucesso!")
+            if parallel_warmup:
+                logger.info("🔥 Carregando componentes em segundo plano...")
+                warm_up_all(self.components)
+            elif not lazy:
+                for component in self.components:
+                    component.get()
+                logger.info("✅ Todos os componentes configurados com sucesso!")
             
         except Exception as e:
-            print(f"\\n❌ Erro ao configurar componentes: {e}")
+            logger.error("❌ Erro ao configurar componentes: %s", e)
             raise
     
+    @property
+    def components(self) -> list:
+        """Componentes do assistente na ordem de configuração"""
+        return [self.voice_recognizer, self.llm_manager, self.voice_synthesizer]
+    
+    def print_startup_report(self):
+        """Exibe o tempo de carregamento de cada componente"""
+        print_startup_report(self.components)
+    
+    def _conversation_session(self):
+        """Retorna a conversa em andamento (criada no primeiro uso) ou None sem memória"""
+        if self.conversation_memory and self.conversation is None:
+            self.conversation = self.llm_manager.start_session()
+        return self.conversation
+    
     def process_voice_input(self, text: str):
         """
         Processa a entrada de voz do usuário
         
+        Com streaming_responses, a resposta é falada frase a frase
+        (process_voice_input_streaming).
+        
         Args:
             text (str): Texto reconhecido da fala do usuário
         """
         print(f"\\n🎙️ Usuário disse: {text}")
         
-        try:
-            # Gera resposta usando a LLM
-            print("🧠 Processando com IA...")
-            response = self.llm_manager.generate_response(text)
-            
-            if response and response.strip():
-                # Mostra a resposta no console
-                print(f"🤖 Assistente responde: {response}")
-                
-                # GARANTE que a resposta seja convertida em áudio
-                print("🔊 Iniciando conversão para áudio...")
-                
-                # Tenta múltiplas estratégias para garantir o áudio
-                audio_success = False
-                
-                # Estratégia 1: Método padrão
-                audio_success = self.convert_text_to_speech(response)
+        if self.streaming_responses:
+            self.process_voice_input_streaming(text)
+            return
+        
+        with tracer.interaction():
+            try:
+                # Gera resposta usando a LLM
+                logger.info("🧠 Processando com IA...")
+                response = self.llm_manager.generate_response(text, session=self._conversation_session())
                 
-                # Estratégia 2: Se falhou, tenta quebrar em frases menores
-                if not audio_success:
-                    print("🔄 Tentando quebrar texto em frases menores...")
-                    sentences = self._split_into_sentences(response)
+                if response and response.strip():
+                    # Mostra a resposta no console
+                    print(f"🤖 Assistente responde: {response}")
                     
-                    for i, sentence in enumerate(sentences):
-                        if sentence.strip():
-                            print(f"📢 Lendo frase {i+1}/{len(sentences)}: {sentence[:50]}...")
-                            sentence_success = self.convert_text_to_speech(sentence.strip())
-                            if sentence_success:
-                                audio_success = True
-                            # Pequena pausa entre frases
-                            import time
-                            time.sleep(0.5)
-                
-                # Estratégia 3: Se ainda falhou, tenta uma mensagem simplificada
-                if not audio_success:
-                    simple_msg = "Resposta processada. Verifique o texto no console."
-                    print("🔄 Tentando mensagem simplificada...")
-                    audio_success = self.convert_text_to_speech(simple_msg)
-                
-                # Confirma se o áudio foi reproduzido
-                if audio_success:
-                    print("✅ Resposta reproduzida em áudio com sucesso!")
+                    # Modo assíncrono: enfileira a fala e retorna imediatamente
+                    if self.async_playback:
+                        self.voice_synthesizer.speak_async(response)
+                        logger.info("🔊 Resposta enfileirada para reprodução")
+                        return
+                    
+                    # Um único prazo para toda a interação: novas tentativas e
+                    # motores alternativos ficam a cargo do sintetizador
+                    logger.info("🔊 Iniciando conversão para áudio...")
+                    deadline = Deadline(self.speech_deadline)
+                    audio_success = self.convert_text_to_speech(response, deadline)
+                    
+                    # Se falhou, avisa com uma frase fixa (normalmente já em cache)
+                    if not audio_success:
+                        logger.info("🔄 Tentando mensagem simplificada...")
+                        audio_success = self.convert_text_to_speech(
+                            "Resposta processada. Verifique o texto no console.", deadline)
+                    
+                    # Confirma se o áudio foi reproduzido
+                    if audio_success:
+                        logger.info("✅ Resposta reproduzida em áudio com sucesso!")
+                    else:
+                        logger.error("❌ Não foi possível reproduzir áudio. Resposta disponível apenas em texto.")
+                        
                 else:
-                    print("❌ Não foi possível reproduzir áudio. Resposta disponível apenas em texto.")
+                    error_msg = "Desculpe, não consegui gerar uma resposta adequada."
+                    logger.warning("⚠️ %s", error_msg)
+                    self.convert_text_to_speech(error_msg)
                     
-            else:
-                error_msg = "Desculpe, não consegui gerar uma resposta adequada."
-                print(f"⚠️ {error_msg}")
-                self.convert_text_to_speech(error_msg)
-                
-        except Exception as e:
-            error_msg = f"Ocorreu um erro ao processar sua pergunta."
-            print(f"❌ Erro: {str(e)}")
-            self.convert_text_to_speech("Desculpe, ocorreu um erro interno.")
+            except Exception as e:
+                logger.error("❌ Erro: %s", e)
+                self.convert_text_to_speech("Desculpe, ocorreu um erro interno.")
     
-    def _split_into_sentences(self, text: str) -> list:
+    def process_voice_input_streaming(self, text: str) -> dict:
         """
-        Divide o texto em frases menores para facilitar a síntese
+        Processa a entrada do usuário falando a resposta frase a frase
+        
+        Os tokens da LLM passam por um segmentador de frases; cada frase
+        completa é enfileirada no sintetizador, que a sintetiza e toca
+        enquanto a geração continua.
         
         Args:
-            text (str): Texto a ser dividido
+            text (str): Texto reconhecido da fala do usuário
             
         Returns:
-            list: Lista de frases
+            dict: Métricas da interação (tempo até o primeiro áudio, geração e total)
+        """
+        with tracer.interaction():
+            start = time.perf_counter()
+            metrics = {"tempo_primeiro_audio": None, "tempo_geracao": None, "tempo_total": None}
+            tickets = []
+            
+            def speak(sentence: str):
+                logger.info("📢 Frase pronta: %s", sentence)
+                tickets.append(self.voice_synthesizer.speak_async(sentence))
+            
+            segmenter = SentenceSegmenter(min_length=4)
+            response = ""
+            
+            try:
+                logger.info("🧠 Processando com IA (streaming)...")
+                session = self._conversation_session()
+                for token in self.llm_manager.generate_response_stream(text, session=session):
+                    response += token
+                    for sentence in segmenter.feed(token):
+                        speak(sentence)
+                
+                remainder = segmenter.flush()
+                if remainder:
+                    speak(remainder)
+                metrics["tempo_geracao"] = time.perf_counter() - start
+                
+                if response.strip():
+                    print(f"🤖 Assistente responde: {response.strip()}")
+                else:
+                    speak("Desculpe, não consegui gerar uma resposta adequada.")
+                    
+            except Exception as e:
+                logger.error("❌ Erro: %s", e)
+                speak("Desculpe, ocorreu um erro interno.")
+            
+            # No modo assíncrono a reprodução continua em segundo plano
+            if self.async_playback:
+                return metrics
+            
+            self.voice_synthesizer.wait_until_done()
+            metrics["tempo_total"] = time.perf_counter() - start
+            
+            started = [ticket.started_at for ticket in tickets if ticket.started_at is not None]
+            if started:
+                metrics["tempo_primeiro_audio"] = min(started) - start
+                logger.info("⏱️ Tempo até o primeiro áudio: %.2fs (geração: %.2fs, total: %.2fs)",
+                            metrics['tempo_primeiro_audio'], metrics['tempo_geracao'] or 0, metrics['tempo_total'])
+            return metrics
+    
+    def _on_user_speech_start(self):
+        """Interrompe a fala do assistente quando o usuário começa a falar (barge-in)"""
+        if self.voice_synthesizer.is_loaded:
+            self.voice_synthesizer.stop_speaking()
+    
+    def process_partial_input(self, hypothesis):
         """
-        import re
-        # Divide por pontos, exclamações e interrogações
-        sentences = re.split(r'[.!?]+', text)
-        # Remove frases vazias e muito curtas
-        return [s.strip() for s in sentences if s.strip() and len(s.strip()) > 3]
+        Recebe uma transcrição parcial enquanto o usuário ainda fala
+        
+        Args:
+            hypothesis (TranscriptionHypothesis): Hipótese parcial do reconhecedor
+        """
+        print(f"🎙️ ... {hypothesis.text} ({hypothesis.audio_seconds:.1f}s de áudio)")
     
-    def convert_text_to_speech(self, text: str) -> bool:
+    def convert_text_to_speech(self, text: str, deadline: Deadline = None) -> bool:
         """
         Converte qualquer texto em fala com tratamento de erro
         
         Args:
             text (str): Texto a ser convertido em fala
+            deadline (Deadline): Prazo da interação (padrão: speech_deadline a partir de agora)
             
         Returns:
             bool: True se bem-sucedido, False caso contrário
         """
+        logger.info("🔊 Convertendo em áudio: %s%s", text[:100], '...' if len(text) > 100 else '')
+        if deadline is None:
+            deadline = Deadline(self.speech_deadline)
+        
         try:
-            print(f"🔊 Convertendo em áudio: {text[:100]}{'...' if len(text) > 100 else ''}")
-            
-            # Primeira tentativa com método padrão
-            success = self.voice_synthesizer.text_to_speech(text)
-            
-            if success:
-                print("✅ Áudio reproduzido com sucesso!")
+            if self.voice_synthesizer.text_to_speech(text, deadline=deadline):
+                logger.info("✅ Áudio reproduzido com sucesso!")
                 return True
-            else:
-                print("⚠️ Falha na primeira tentativa, tentando método alternativo...")
-                # Segunda tentativa com método stream
-                success = self.voice_synthesizer.text_to_speech_stream(text)
-                
-                if success:
-                    print("✅ Áudio reproduzido com método alternativo!")
-                    return True
-                else:
-                    print("❌ Falha em ambos os métodos de síntese de voz")
-                    # Terceira tentativa com configurações diferentes
-                    print("⚠️ Tentando com configurações alternativas...")
-                    success = self.voice_synthesizer.speak_with_options(text, slow=True, volume=0.9)
-                    
-                    if success:
-                        print("✅ Áudio reproduzido com configurações alternativas!")
-                        return True
-                    else:
-                        print("❌ Todas as tentativas de síntese falharam")
-                        return False
-                    
         except Exception as e:
-            print(f"❌ Erro na conversão texto-fala: {e}")
-            # Última tentativa com método mais simples
-            try:
-                print("🔄 Tentativa final com método básico...")
-                return self.voice_synthesizer.text_to_speech(text)
-            except:
-                return False
+            logger.error("❌ Erro na conversão texto-fala: %s", e)
+            return False
+
+        logger.error("❌ Todas as tentativas de síntese falharam")
+        return False
+    
+    def print_resilience_report(self):
+        """Exibe o estado dos disjuntores dos motores de síntese remotos"""
+        stats = self.voice_synthesizer.resilience_stats()
+        if not stats:
+            print("Nenhum motor de síntese remoto em uso.")
+        for breaker in stats:
+            print(f"⚡ {breaker['servico']}: {breaker['estado']} "
+                  f"({breaker['chamadas']} chamadas, {breaker['falhas']} falhas, "
+                  f"{breaker['rejeitadas']} rejeitadas, {breaker['aberturas']} aberturas)")
     
     def read_text_aloud(self, text: str):
         """
@@ -206,14 +354,17 @@ class VoiceAssistant:
             # Escuta contínua
             self.voice_recognizer.continuous_listen(
                 callback_function=self.process_voice_input,
-                stop_phrases=["parar", "sair", "tchau", "encerrar"]
+                stop_phrases=["parar", "sair", "tchau", "encerrar"],
+                streaming=self.streaming_input,
+                partial_callback=self.process_partial_input,
+                on_speech_start=self._on_user_speech_start
             )
             
         except KeyboardInterrupt:
             print("\\n⚠️ Interrompido pelo usuário (Ctrl+C)")
         
         except Exception as e:
-            print(f"\\n❌ Erro durante execução: {e}")
+            logger.error("❌ Erro durante execução: %s", e)
         
         finally:
             # Mensagem de despedida
@@ -221,6 +372,37 @@ class VoiceAssistant:
             self.voice_synthesizer.say_goodbye()
             self.cleanup()
     
+    def run_pipeline_mode(self):
+        """Executa o assistente no pipeline assíncrono (captura, STT, LLM e TTS concorrentes)"""
+        from pipeline import VoicePipeline
+
+        print("\\n⚡ Iniciando modo pipeline...")
+        
+        # Mensagem de boas-vindas
+        self.voice_synthesizer.say_welcome()
+        
+        pipeline = VoicePipeline(
+            self.voice_recognizer,
+            self.llm_manager,
+            self.voice_synthesizer,
+            stop_phrases=["parar", "sair", "tchau", "encerrar"]
+        )
+        
+        try:
+            asyncio.run(pipeline.run())
+            
+        except KeyboardInterrupt:
+            print("\\n⚠️ Interrompido pelo usuário (Ctrl+C)")
+        
+        except Exception as e:
+            logger.error("❌ Erro durante execução: %s", e)
+        
+        finally:
+            pipeline.print_metrics()
+            print("\\n👋 Encerrando assistente...")
+            self.voice_synthesizer.say_goodbye()
+            self.cleanup()
+    
     def run_single_interaction(self):
         """Executa uma única interação com o usuário"""
         print("\\n🎤 Modo de interação única...")
@@ -229,17 +411,18 @@ class VoiceAssistant:
         self.voice_synthesizer.say_welcome()
         
         try:
-            # Escuta uma única entrada
-            text = self.voice_recognizer.listen_for_speech(timeout=10, phrase_time_limit=15)
-            
-            if text:
-                self.process_voice_input(text)
-            else:
-                print("\\n⚠️ Nenhuma fala detectada.")
-                self.voice_synthesizer.say_error()
+            with tracer.interaction():
+                # Escuta uma única entrada
+                text = self.voice_recognizer.listen_for_speech(timeout=10, phrase_time_limit=15)
+                
+                if text:
+                    self.process_voice_input(text)
+                else:
+                    print("\\n⚠️ Nenhuma fala detectada.")
+                    self.voice_synthesizer.say_error()
                 
         except Exception as e:
-            print(f"\\n❌ Erro durante interação: {e}")
+            logger.error("❌ Erro durante interação: %s", e)
         
         finally:
             self.cleanup()
@@ -253,6 +436,7 @@ class VoiceAssistant:
             # Teste da síntese de voz
             print("\\n1. Testando síntese de voz...")
             self.voice_synthesizer.text_to_speech("Teste de síntese de voz funcionando!")
+            self.print_resilience_report()
             
             # Teste da LLM
             print("\\n2. Testando Large Language Model...")
@@ -276,6 +460,66 @@ class VoiceAssistant:
         finally:
             self.cleanup()
     
+    def read_document(self, file_path: str):
+        """
+        Lê um arquivo de texto em voz alta, frase a frase, com marcador de leitura
+        
+        O arquivo não é carregado inteiro na memória. Ctrl+C pausa a leitura e
+        permite avançar ou voltar frases; a posição é salva ao sair, e a
+        próxima leitura do mesmo arquivo pode continuar de onde parou.
+        
+        Args:
+            file_path (str): Caminho do arquivo de texto
+        """
+        from document_reader import DocumentReader
+        from long_form_reader import LongFormReader
+        
+        with DocumentReader(file_path) as document:
+            if not document.size:
+                print("⚠️ Arquivo vazio.")
+                return
+            
+            print(f"\n📄 Lendo arquivo: {document.path}")
+            print(f"Tamanho: {document.size / 1024:.1f} KB")
+            if document.resumed:
+                answer = input(f"Continuar de onde parou ({document.progress:.0%} lido)? (s/n): ")
+                if answer.strip().lower() not in ['', 's', 'sim', 'y', 'yes']:
+                    document.restart()
+            
+            reader = LongFormReader(self.voice_synthesizer, workers=3, look_ahead=4)
+            print("Pressione Ctrl+C para pausar (avançar, voltar ou sair).")
+            
+            try:
+                while not document.finished:
+                    try:
+                        reader.read(
+                            document.sentences(),
+                            on_chunk=lambda index, sentence: print(f"📖 {sentence.text}"),
+                            on_played=lambda index, sentence: document.mark_read(sentence)
+                        )
+                        if not document.finished:
+                            # Leitura interrompida por um stop_speaking externo
+                            break
+                    except KeyboardInterrupt:
+                        print(f"\n⏸️ Leitura pausada ({document.progress:.0%} lido)")
+                        command = input("[Enter] continuar | a N: avançar N frases | "
+                                        "v N: voltar N frases | s: sair: ").strip().lower().split()
+                        action = command[0] if command else ""
+                        count = int(command[1]) if len(command) > 1 and command[1].isdigit() else 1
+                        if action == "s":
+                            break
+                        if action == "a":
+                            print(f"⏩ {document.skip_forward(count)} frase(s) avançada(s)")
+                        elif action == "v":
+                            print(f"⏪ {document.skip_back(count)} frase(s) voltada(s)")
+                
+                if document.finished:
+                    print("✅ Fim do documento.")
+            finally:
+                document.save_bookmark()
+                if not document.finished:
+                    print(f"🔖 Posição salva ({document.progress:.0%} lido)")
+    
     def read_custom_text(self):
         """Permite ao usuário digitar texto para ser convertido em fala"""
         print("\\n📝 LEITURA DE TEXTO PERSONALIZADO")
@@ -305,23 +549,7 @@ class VoiceAssistant:
                     file_path = input("\\nDigite o caminho do arquivo de texto: ").strip()
                     
                     try:
-                        with open(file_path, 'r', encoding='utf-8') as file:
-                            content = file.read()
-                            
-                        if content.strip():
-                            print(f"\\n📄 Lendo arquivo: {file_path}")
-                            print(f"Tamanho: {len(content)} caracteres")
-                            
-                            # Para textos muito longos, pergunta se quer continuar
-                            if len(content) > 1000:
-                                confirm = input(f"\\nO texto é longo ({len(content)} caracteres). Continuar? (s/n): ")
-                                if confirm.lower() not in ['s', 'sim', 'y', 'yes']:
-                                    continue
-                            
-                            self.convert_text_to_speech(content)
-                        else:
-                            print("⚠️ Arquivo vazio.")
-                            
+                        self.read_document(file_path)
                     except FileNotFoundError:
                         print(f"❌ Arquivo não encontrado: {file_path}")
                     except Exception as e:
@@ -340,12 +568,59 @@ class VoiceAssistant:
     
     def cleanup(self):
         """Limpa recursos utilizados"""
-        if self.voice_synthesizer:
+        if self.voice_recognizer and self.voice_recognizer.is_loaded:
+            self.voice_recognizer.close()
+        if self.voice_synthesizer and self.voice_synthesizer.is_loaded:
             self.voice_synthesizer.cleanup()
         print("\\n🧹 Recursos liberados.")
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Assistente de voz com IA")
+    parser.add_argument("--aquecer", action="store_true",
+                        help="Carrega todos os componentes em paralelo ao iniciar")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Exibe transcrições parciais enquanto o usuário fala")
+    parser.add_argument("--resposta-streaming", action="store_true",
+                        help="Fala cada frase da resposta assim que ela é gerada")
+    parser.add_argument("--tts", choices=["gtts", "espeak"], default="gtts",
+                        help="Motor de síntese principal (o outro é usado se ele falhar)")
+    parser.add_argument("--fala-assincrona", action="store_true",
+                        help="Volta a escutar enquanto a resposta é falada (use com --streaming "
+                             "para interromper o assistente falando por cima)")
+    parser.add_argument("--perfil-llm", default=None,
+                        help="Perfil de execução da LLM (ver: python llm_profiles.py listar)")
+    parser.add_argument("--modelo", default=None,
+                        help="Modelo da LLM pelo nome (ver: python download_model.py --listar)")
+    parser.add_argument("--cache-semantico", type=float, default=None, metavar="LIMIAR",
+                        help="Reaproveita respostas de perguntas parecidas (similaridade mínima, ex: 0.9)")
+    parser.add_argument("--whisper", default="base",
+                        help="Modelo Whisper (tiny, base, small...) ou 'auto' para escolher pela latência")
+    parser.add_argument("--whisper-int8", action="store_true",
+                        help="Quantiza o modelo Whisper para int8 (CPU)")
+    parser.add_argument("--decodificacao", choices=["rapido", "equilibrado", "preciso", "whisper-padrao"],
+                        default=None, help="Preset de decodificação do Whisper (padrão: rapido)")
+    parser.add_argument("--prazo-fala", type=float, default=SPEECH_DEADLINE_SECONDS,
+                        help="Prazo em segundos para sintetizar cada resposta (padrão: %(default)s)")
+    parser.add_argument("--memoria", action="store_true",
+                        help="Mantém o histórico da conversa entre as perguntas")
+    parser.add_argument("--log-nivel", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="Nível mínimo das mensagens de diagnóstico")
+    parser.add_argument("--log-json", action="store_true",
+                        help="Mensagens de diagnóstico em JSON (uma por linha, com a interação)")
+    parser.add_argument("--rastros", default=str(DEFAULT_TRACE_PATH),
+                        help="Arquivo JSONL com os spans de cada etapa (padrão: %(default)s)")
+    parser.add_argument("--sem-rastros", action="store_true", help="Não grava os spans em arquivo")
+    parser.add_argument("--metricas-porta", type=int, default=None,
+                        help="Expõe as métricas Prometheus em http://127.0.0.1:PORTA/metrics")
+    parser.add_argument("--metricas-arquivo", default=None,
+                        help="Grava as métricas Prometheus neste arquivo a cada interação")
+    args = parser.parse_args()
+    
+    configure_logging(args.log_nivel, json_format=args.log_json)
+    configure_tracing(trace_path=None if args.sem_rastros else args.rastros,
+                      metrics_path=args.metricas_arquivo, metrics_port=args.metricas_porta)
+    
     print("🤖 ASSISTENTE DE VOZ COM IA")
     print("Powered by LangChain + Whisper + Llama + gTTS\\n")
     
@@ -358,7 +633,21 @@ def main():
             return
         
         # Cria o assistente
-        assistant = VoiceAssistant()
+        assistant = VoiceAssistant(
+            streaming_input=args.streaming,
+            parallel_warmup=args.aquecer,
+            streaming_responses=args.resposta_streaming,
+            tts_backend=args.tts,
+            async_playback=args.fala_assincrona,
+            conversation_memory=args.memoria,
+            llm_profile=args.perfil_llm,
+            llm_model=args.modelo,
+            whisper_model=args.whisper,
+            whisper_int8=args.whisper_int8,
+            whisper_decoding=args.decodificacao,
+            speech_deadline=args.prazo_fala,
+            cache_similarity=args.cache_semantico
+        )
         
         # Menu de opções
         while True:
@@ -368,10 +657,11 @@ def main():
             print("2. Interação Única")
             print("3. Testar Componentes")
             print("4. Ler Texto Personalizado")
-            print("5. Sair")
+            print("5. Modo Pipeline (assíncrono)")
+            print("6. Sair")
             print("=" * 40)
             
-            choice = input("\\nDigite sua escolha (1-5): ").strip()
+            choice = input("\\nDigite sua escolha (1-6): ").strip()
             
             if choice == "1":
                 assistant.run_interactive_mode()
@@ -382,18 +672,24 @@ def main():
             elif choice == "4":
                 assistant.read_custom_text()
             elif choice == "5":
+                assistant.run_pipeline_mode()
+            elif choice == "6":
                 print("\\n👋 Saindo...")
                 break
             else:
                 print("\\n⚠️ Opção inválida. Tente novamente.")
         
         # Limpeza final
+        assistant.print_startup_report()
         assistant.cleanup()
         
     except Exception as e:
         print(f"\\n❌ Erro fatal: {e}")
         print("\\nVerifique se todas as dependências estão instaladas:")
         print("pip install -r requirements.txt")
+    
+    finally:
+        tracer.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,67 @@
+"""
+Módulo com o registro de modelos LLM disponíveis para download
+
+O manifesto models_registry.json lista, para cada modelo, o arquivo, a URL,
+a quantização e, quando conhecidos, o tamanho e o SHA-256 esperados.
+"""
+import json
+from pathlib import Path
+from typing import Optional
+
+# Manifesto padrão dos modelos
+DEFAULT_REGISTRY_PATH = Path(__file__).with_name("models_registry.json")
+
+# Pasta padrão dos modelos baixados
+DEFAULT_MODELS_DIR = Path("models")
+
+
+def load_registry(path: Optional[str] = None) -> dict:
+    """
+    Lê o manifesto de modelos
+
+    Args:
+        path (str): Arquivo JSON do manifesto (None usa o padrão)
+
+    Returns:
+        dict: Conteúdo do manifesto ('modelo_padrao' e 'modelos')
+    """
+    with open(path or DEFAULT_REGISTRY_PATH, "r", encoding="utf-8") as registry_file:
+        return json.load(registry_file)
+
+
+def get_model_entry(name: Optional[str] = None, path: Optional[str] = None) -> dict:
+    """
+    Retorna a entrada de um modelo do manifesto
+
+    Args:
+        name (str): Nome do modelo (None usa o modelo padrão)
+        path (str): Arquivo JSON do manifesto
+
+    Returns:
+        dict: Entrada do modelo, com o nome incluído em 'nome'
+    """
+    registry = load_registry(path)
+    name = name or registry["modelo_padrao"]
+    try:
+        entry = dict(registry["modelos"][name])
+    except KeyError:
+        raise ValueError(f"Modelo desconhecido: {name} (disponíveis: {', '.join(registry['modelos'])})")
+    entry["nome"] = name
+    return entry
+
+
+def model_path(name: Optional[str] = None, models_dir: Optional[str] = None,
+               registry_path: Optional[str] = None) -> Path:
+    """
+    Caminho local de um modelo do manifesto
+
+    Args:
+        name (str): Nome do modelo (None usa o modelo padrão)
+        models_dir (str): Pasta dos modelos
+        registry_path (str): Arquivo JSON do manifesto
+
+    Returns:
+        Path: Caminho do arquivo do modelo (pode ainda não existir)
+    """
+    entry = get_model_entry(name, registry_path)
+    return Path(models_dir or DEFAULT_MODELS_DIR) / entry["arquivo"]
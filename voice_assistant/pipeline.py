@@ -0,0 +1,282 @@
+"""
+Módulo com o pipeline assíncrono do assistente de voz
+
+Captura, transcrição (STT), geração de resposta (LLM) e síntese (TTS)
+rodam como estágios independentes ligados por filas limitadas. As chamadas
+bloqueantes de cada estágio vão para um executor próprio, de modo que a
+próxima frase pode ser capturada e transcrita enquanto a anterior ainda
+está sendo respondida.
+"""
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import speech_recognition as sr
+
+from tracing import INTERACTION_SPAN, Span, new_interaction_id, tracer
+
+logger = logging.getLogger(__name__)
+
+
+class StageMetrics:
+    """Métricas de latência e profundidade de fila de um estágio"""
+
+    def __init__(self, name: str, window: int = 256):
+        """
+        Inicializa as métricas
+
+        Args:
+            name (str): Nome do estágio
+            window (int): Quantidade de latências mantidas para os percentis
+        """
+        self.name = name
+        self.processed = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def record(self, seconds: float):
+        """Registra a latência de um item processado"""
+        self.processed += 1
+        self.latencies.append(seconds)
+
+    def observe_queue(self, depth: int):
+        """Registra a profundidade atual da fila de entrada do estágio"""
+        self.queue_depth = depth
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def summary(self) -> dict:
+        """
+        Resume as métricas do estágio
+
+        Returns:
+            dict: Itens processados, erros, latências e profundidade da fila
+        """
+        latencies = sorted(self.latencies)
+        return {
+            "processados": self.processed,
+            "erros": self.errors,
+            "latencia_media_ms": statistics.mean(latencies) * 1000 if latencies else 0.0,
+            "latencia_p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000 if latencies else 0.0,
+            "fila_atual": self.queue_depth,
+            "fila_maxima": self.max_queue_depth,
+        }
+
+
+class VoicePipeline:
+    """Pipeline asyncio com estágios de captura, STT, LLM e TTS"""
+
+    STAGES = ("captura", "stt", "llm", "tts")
+
+    def __init__(self, voice_recognizer, llm_manager=None, voice_synthesizer=None,
+                 callback_function: Optional[Callable[[str], None]] = None,
+                 stop_phrases: Optional[List[str]] = None, queue_size: int = 2,
+                 listen_while_speaking: bool = False):
+        """
+        Inicializa o pipeline
+
+        Args:
+            voice_recognizer: Reconhecedor de voz (VoiceRecognizer)
+            llm_manager: Gerenciador da LLM (estágio LLM)
+            voice_synthesizer: Sintetizador de voz (estágio TTS)
+            callback_function: Se informado, substitui os estágios LLM e TTS e é
+                chamado com cada texto reconhecido, como em continuous_listen
+            stop_phrases: Frases que encerram o pipeline
+            queue_size (int): Capacidade de cada fila entre estágios
+            listen_while_speaking (bool): Se False, a captura aguarda o fim da fala
+                do assistente para não transcrever a própria resposta
+        """
+        self.voice_recognizer = voice_recognizer
+        self.llm_manager = llm_manager
+        self.voice_synthesizer = voice_synthesizer
+        self.callback_function = callback_function
+        self.stop_phrases = stop_phrases or ["parar", "sair", "tchau"]
+        self.queue_size = queue_size
+        self.listen_while_speaking = listen_while_speaking
+
+        if callback_function is None and (llm_manager is None or voice_synthesizer is None):
+            raise ValueError("Informe callback_function ou llm_manager e voice_synthesizer")
+
+        self.metrics = {name: StageMetrics(name) for name in self.STAGES}
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"pipeline-{name}")
+            for name in self.STAGES
+        }
+        self._stop: Optional[asyncio.Event] = None
+
+    async def _call(self, stage: str, function, *args, root: Optional[Span] = None):
+        """
+        Executa uma função bloqueante no executor do estágio e mede a latência
+
+        O span raiz da interação é repassado à thread do executor, para que os
+        spans das etapas fiquem associados a ela e tenham a raiz como pai.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._executors[stage], tracer.run_in, root, function, *args)
+        except Exception:
+            self.metrics[stage].errors += 1
+            raise
+        finally:
+            self.metrics[stage].record(time.perf_counter() - start)
+
+    async def _put(self, stage: str, target: asyncio.Queue, item):
+        """Coloca um item na fila do estágio seguinte, aguardando se estiver cheia"""
+        await target.put(item)
+        self.metrics[stage].observe_queue(target.qsize())
+
+    def _is_speaking(self) -> bool:
+        """Indica se o assistente está falando ou tem falas pendentes"""
+        synthesizer = self.voice_synthesizer
+        if synthesizer is None or not getattr(synthesizer, "is_loaded", True):
+            return False
+        return synthesizer.playback.is_busy
+
+    def _capture(self):
+        """Captura uma frase, retornando None se ninguém falar dentro do tempo limite"""
+        try:
+            return self.voice_recognizer.capture_audio()
+        except sr.WaitTimeoutError:
+            return None
+
+    async def _capture_stage(self, output: asyncio.Queue):
+        """Captura frases do microfone enquanto o pipeline estiver ativo"""
+        while not self._stop.is_set():
+            if not self.listen_while_speaking and self._is_speaking():
+                await asyncio.sleep(0.05)
+                continue
+            # Cada frase é uma interação; o span raiz segue com ela pelas filas
+            root = tracer.start_span(INTERACTION_SPAN, interaction=new_interaction_id())
+            try:
+                audio = await self._call("captura", self._capture, root=root)
+            except Exception as e:
+                root.finish("erro")
+                logger.error("❌ Erro na captura: %s", e)
+                await asyncio.sleep(0.5)
+                continue
+            if audio is None:
+                root.finish("sem_fala")
+                continue
+            await self._put("stt", output, (root, audio))
+        await output.put(None)
+
+    async def _stt_stage(self, source: asyncio.Queue, output: asyncio.Queue):
+        """Transcreve os áudios capturados e detecta as frases de parada"""
+        while True:
+            item = await source.get()
+            self.metrics["stt"].observe_queue(source.qsize())
+            if item is None:
+                break
+            root, audio = item
+            if self._stop.is_set():
+                # Descarta o que ainda foi capturado após a frase de parada
+                root.finish("descartada")
+                continue
+            try:
+                text = await self._call("stt", self.voice_recognizer.transcribe_audio, audio, root=root)
+            except Exception as e:
+                root.finish("erro")
+                logger.error("❌ Erro na transcrição: %s", e)
+                continue
+            if not text:
+                root.finish("sem_fala")
+                continue
+
+            print(f"Texto reconhecido: {text}")
+            if any(phrase.lower() in text.lower() for phrase in self.stop_phrases):
+                root.finish()
+                print("Encerrando pipeline...")
+                self._stop.set()
+                continue
+            await self._put("llm", output, (root, text))
+        await output.put(None)
+
+    async def _llm_stage(self, source: asyncio.Queue, output: asyncio.Queue):
+        """Gera as respostas (ou chama o callback) para cada texto reconhecido"""
+        while True:
+            item = await source.get()
+            self.metrics["llm"].observe_queue(source.qsize())
+            if item is None:
+                break
+            root, text = item
+            try:
+                if self.callback_function is not None:
+                    await self._call("llm", self.callback_function, text, root=root)
+                    root.finish()
+                    continue
+                response = await self._call("llm", self.llm_manager.generate_response, text, root=root)
+            except Exception as e:
+                root.finish("erro")
+                logger.error("❌ Erro ao gerar resposta: %s", e)
+                continue
+            print(f"🤖 Assistente responde: {response}")
+            await self._put("tts", output, (root, response))
+        await output.put(None)
+
+    async def _tts_stage(self, source: asyncio.Queue):
+        """Sintetiza as respostas e as enfileira para reprodução"""
+        while True:
+            item = await source.get()
+            self.metrics["tts"].observe_queue(source.qsize())
+            if item is None:
+                break
+            root, response = item
+            try:
+                sound = await self._call("tts", self._synthesize_sound, response, root=root)
+            except Exception as e:
+                root.finish("erro")
+                logger.error("❌ Erro na síntese de voz: %s", e)
+                continue
+            self.voice_synthesizer.playback.enqueue(sound)
+            # A interação termina quando a resposta entra na fila de reprodução
+            root.finish()
+
+    def _synthesize_sound(self, text: str):
+        """Sintetiza e decodifica um texto para reprodução"""
+        synthesizer = self.voice_synthesizer
+        return synthesizer.player.decode(synthesizer.synthesize(text))
+
+    async def run(self):
+        """Executa o pipeline até uma frase de parada ser reconhecida"""
+        to_stt = asyncio.Queue(maxsize=self.queue_size)
+        to_llm = asyncio.Queue(maxsize=self.queue_size)
+        to_tts = asyncio.Queue(maxsize=self.queue_size)
+        self._stop = asyncio.Event()
+
+        print("Iniciando pipeline assíncrono... Diga 'parar', 'sair' ou 'tchau' para encerrar.")
+        stages = [
+            self._capture_stage(to_stt),
+            self._stt_stage(to_stt, to_llm),
+            self._llm_stage(to_llm, to_tts),
+        ]
+        if self.callback_function is None:
+            stages.append(self._tts_stage(to_tts))
+
+        try:
+            await asyncio.gather(*stages)
+        finally:
+            self._stop.set()
+            for executor in self._executors.values():
+                executor.shutdown(wait=False)
+
+        if self.voice_synthesizer is not None and self.callback_function is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.voice_synthesizer.wait_until_done)
+
+    def print_metrics(self):
+        """Exibe as métricas de cada estágio"""
+        print("\n📊 MÉTRICAS DO PIPELINE")
+        print("-" * 72)
+        print(f"{'Estágio':<10}{'Itens':>7}{'Erros':>7}{'Média (ms)':>13}{'p95 (ms)':>11}{'Fila máx.':>11}")
+        for name, metrics in self.metrics.items():
+            summary = metrics.summary()
+            print(
+                f"{name:<10}{summary['processados']:>7}{summary['erros']:>7}"
+                f"{summary['latencia_media_ms']:>13.1f}{summary['latencia_p95_ms']:>11.1f}"
+                f"{summary['fila_maxima']:>11}"
+            )
@@ -0,0 +1,188 @@
+"""
+Módulo com a fila de reprodução assíncrona do assistente
+
+Uma thread dedicada toca os sons da fila um após o outro, sem bloquear
+quem os enfileira: enquanto um som toca, o próximo já vai para a fila do
+canal do mixer, que o emenda sem intervalo. A operação stop() esvazia a fila e interrompe o som
+atual imediatamente (barge-in), por exemplo quando o usuário volta a falar.
+"""
+import logging
+import queue
+import threading
+from typing import Optional
+
+from audio_player import AudioPlayer
+
+logger = logging.getLogger(__name__)
+
+# Item que só acorda a thread de reprodução (após um stop)
+_WAKE = object()
+
+
+class PlaybackTicket:
+    """Acompanha um áudio desde o enfileiramento até o fim da reprodução"""
+
+    def __init__(self, label: str = ""):
+        """
+        Inicializa o ticket
+
+        Args:
+            label (str): Descrição do áudio (ex: texto falado)
+        """
+        self.label = label
+        self.started_at: Optional[float] = None
+        self.completed = False
+        self.cancelled = False
+        self.error: Optional[Exception] = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        """Indica se o áudio já foi tocado, cancelado ou falhou"""
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda o fim do áudio
+
+        Args:
+            timeout (float): Tempo máximo de espera (segundos)
+
+        Returns:
+            bool: True se o áudio foi tocado até o fim
+        """
+        self._done.wait(timeout)
+        return self.completed
+
+    def finish(self, completed: bool = False, cancelled: bool = False, error: Optional[Exception] = None):
+        """Marca o ticket como encerrado"""
+        self.completed = completed
+        self.cancelled = cancelled
+        self.error = error
+        self._done.set()
+
+
+class PlaybackQueue:
+    """Fila de reprodução tocada por uma thread dedicada"""
+
+    def __init__(self, player: AudioPlayer):
+        """
+        Inicializa a fila e inicia a thread de reprodução
+
+        Args:
+            player (AudioPlayer): Player usado para tocar os sons
+        """
+        self.player = player
+        self.epoch = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        # Sons tocando ou já na fila do canal do mixer
+        self._playing = []
+        self._thread = threading.Thread(target=self._run, name="playback", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, sound, ticket: Optional[PlaybackTicket] = None,
+                epoch: Optional[int] = None) -> PlaybackTicket:
+        """
+        Enfileira um som já decodificado e retorna imediatamente
+
+        Args:
+            sound (pygame.mixer.Sound): Som a ser tocado
+            ticket (PlaybackTicket): Ticket a ser usado (opcional)
+            epoch (int): Época em que o som foi pedido; sons de épocas
+                anteriores a um stop() são descartados
+
+        Returns:
+            PlaybackTicket: Ticket para acompanhar a reprodução
+        """
+        ticket = ticket or PlaybackTicket()
+        self._queue.put((sound, ticket, self.epoch if epoch is None else epoch))
+        return ticket
+
+    def stop(self):
+        """Esvazia a fila e interrompe o som atual (barge-in)"""
+        with self._lock:
+            self.epoch += 1
+            playing = list(self._playing)
+
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _WAKE:
+                continue
+            if item is not None:
+                item[1].finish(cancelled=True)
+            else:
+                # Preserva o pedido de encerramento da thread
+                self._queue.put(None)
+                break
+
+        for handle in playing:
+            handle.stop()
+        # A thread pode estar esperando o fim previsto do som interrompido
+        self._queue.put(_WAKE)
+
+    @property
+    def is_busy(self) -> bool:
+        """Indica se há som tocando ou aguardando na fila"""
+        return bool(self._playing) or not self._queue.empty()
+
+    def _run(self):
+        """Laço da thread de reprodução"""
+        current = None  # (handle, ticket) do som tocando
+        while True:
+            try:
+                # Com um som tocando, espera o próximo só até o fim dele
+                item = self._queue.get(timeout=current[0].remaining if current else None)
+            except queue.Empty:
+                self._finish(*current)
+                current = None
+                continue
+            if item is None:
+                if current is not None:
+                    self._finish(*current)
+                break
+            if item is _WAKE:
+                if current is not None and current[0].done:
+                    self._finish(*current)
+                    current = None
+                continue
+
+            sound, ticket, epoch = item
+            if epoch != self.epoch:
+                ticket.finish(cancelled=True)
+                continue
+            try:
+                # Emenda no som atual pela fila do canal (sem intervalo); fora da
+                # trava, porque sem fila no canal o player espera o som atual
+                handle = self.player.play(sound, after=current[0] if current else None)
+            except Exception as e:
+                logger.error("Erro ao reproduzir áudio: %s", e)
+                ticket.finish(error=e)
+                continue
+            with self._lock:
+                if epoch != self.epoch:
+                    # stop() chegou enquanto o som era iniciado
+                    handle.stop()
+                self._playing.append(handle)
+                ticket.started_at = handle.started_at
+
+            if current is not None:
+                self._finish(*current)
+            current = (handle, ticket)
+
+    def _finish(self, handle, ticket: PlaybackTicket):
+        """Aguarda o fim de um som e encerra o ticket dele"""
+        handle.wait()
+        with self._lock:
+            if handle in self._playing:
+                self._playing.remove(handle)
+        ticket.finish(completed=not handle.interrupted, cancelled=handle.interrupted)
+
+    def close(self):
+        """Interrompe a reprodução e encerra a thread"""
+        self.stop()
+        self._queue.put(None)
+        self._thread.join(timeout=2)
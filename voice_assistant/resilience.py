@@ -0,0 +1,341 @@
+"""
+Módulo com as políticas de resiliência das chamadas a serviços externos
+
+- classify_error separa erros transitórios (rede, timeout, HTTP 5xx/429),
+  que valem uma nova tentativa, de erros permanentes (texto inválido,
+  programa ausente, HTTP 4xx), que não mudam ao repetir;
+- Deadline limita o tempo total de uma interação, somando todas as
+  tentativas e todos os motores;
+- RetryPolicy repete apenas erros transitórios, com espera exponencial,
+  sem ultrapassar o prazo;
+- CircuitBreaker suspende um serviço após falhas seguidas, para que as
+  próximas chamadas usem direto a alternativa local (ou o cache) em vez de
+  esperar por falhas certas; depois de um tempo, uma chamada de teste
+  verifica se o serviço voltou.
+"""
+import logging
+import random
+import socket
+import subprocess
+import threading
+import time
+from typing import Callable, Optional
+
+# Classificações de erro
+TRANSIENT = "transitorio"
+PERMANENT = "permanente"
+
+# Estados do disjuntor
+CLOSED = "fechado"
+OPEN = "aberto"
+HALF_OPEN = "meio-aberto"
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceededError(TimeoutError):
+    """O prazo da interação acabou antes de a operação terminar"""
+
+
+class CircuitOpenError(RuntimeError):
+    """O disjuntor do serviço está aberto e a chamada nem foi tentada"""
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classifica um erro como transitório ou permanente
+
+    Args:
+        error: Exceção recebida
+
+    Returns:
+        str: TRANSIENT ou PERMANENT
+    """
+    if isinstance(error, (CircuitOpenError, DeadlineExceededError)):
+        return PERMANENT
+
+    # Respostas HTTP (gTTSError guarda a resposta em `rsp`, requests em `response`)
+    response = getattr(error, "rsp", None) or getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is not None:
+        return TRANSIENT if status >= 500 or status == 429 else PERMANENT
+
+    if isinstance(error, (TimeoutError, socket.timeout, ConnectionError)):
+        return TRANSIENT
+    if isinstance(error, (FileNotFoundError, PermissionError, subprocess.CalledProcessError,
+                          ValueError, TypeError, LookupError)):
+        return PERMANENT
+    if isinstance(error, OSError):
+        # Inclui as falhas de conexão do requests
+        return TRANSIENT
+    if type(error).__name__ == "gTTSError":
+        # Sem resposta HTTP: a requisição nem chegou ao servidor
+        return TRANSIENT
+    return PERMANENT
+
+
+class Deadline:
+    """Prazo absoluto de uma interação"""
+
+    def __init__(self, seconds: Optional[float]):
+        """
+        Args:
+            seconds (float): Tempo disponível a partir de agora (None: sem prazo)
+        """
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """Segundos restantes (None se não há prazo)"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Indica se o prazo acabou"""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+def run_with_timeout(func: Callable, timeout: Optional[float]):
+    """
+    Executa uma função bloqueante, desistindo de esperar após `timeout`
+
+    A função roda em uma thread daemon; se o tempo acabar, ela é abandonada
+    (continua em segundo plano até terminar), mas quem chamou é liberado.
+
+    Args:
+        func: Função sem argumentos
+        timeout (float): Tempo máximo de espera (None: sem limite)
+
+    Returns:
+        Resultado da função
+
+    Raises:
+        TimeoutError: Se o tempo acabar
+    """
+    if timeout is None:
+        return func()
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, name="chamada-com-prazo", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"sem resposta em {timeout:.1f} s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+class CircuitBreaker:
+    """Disjuntor de um serviço externo"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, recovery_timeout: float = 30.0):
+        """
+        Args:
+            name (str): Nome do serviço (usado nas mensagens e métricas)
+            failure_threshold (int): Falhas transitórias seguidas que abrem o disjuntor
+            recovery_timeout (float): Tempo aberto antes de permitir uma chamada de teste
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.openings = 0
+
+    @property
+    def state(self) -> str:
+        """Estado atual (fechado, aberto ou meio-aberto)"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        """Estado considerando o fim do tempo de recuperação (chamar com a trava)"""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Indica se uma chamada pode ser feita agora
+
+        No estado meio-aberto, só uma chamada de teste é liberada por vez.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        """Registra uma chamada bem-sucedida (fecha o disjuntor)"""
+        with self._lock:
+            self.calls += 1
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            if self._state != CLOSED:
+                logger.info("🔌 Serviço '%s' restabelecido", self.name)
+            self._state = CLOSED
+
+    def record_failure(self):
+        """Registra uma falha transitória (pode abrir o disjuntor)"""
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.openings += 1
+                    logger.warning("⚡ Serviço '%s' suspenso por %.0f s após %d falha(s)",
+                                   self.name, self.recovery_timeout, self._consecutive_failures)
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """Registra uma chamada encerrada por erro permanente (não conta como falha)"""
+        with self._lock:
+            self.calls += 1
+            self._probe_in_flight = False
+
+    def call(self, func: Callable, classify: Callable[[BaseException], str] = classify_error):
+        """
+        Executa uma chamada protegida pelo disjuntor
+
+        Só erros transitórios contam como falha do serviço; um erro permanente
+        (ex: texto inválido) não diz nada sobre a disponibilidade dele.
+
+        Raises:
+            CircuitOpenError: Se o disjuntor estiver aberto
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"serviço '{self.name}' suspenso (disjuntor aberto)")
+        try:
+            result = func()
+        except Exception as e:
+            if classify(e) == TRANSIENT:
+                self.record_failure()
+            else:
+                self.release()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> dict:
+        """Métricas do disjuntor"""
+        with self._lock:
+            return {
+                "servico": self.name,
+                "estado": self._current_state(),
+                "falhas_seguidas": self._consecutive_failures,
+                "chamadas": self.calls,
+                "falhas": self.failures,
+                "rejeitadas": self.rejected,
+                "aberturas": self.openings,
+            }
+
+
+class RetryPolicy:
+    """Novas tentativas com espera exponencial, apenas para erros transitórios"""
+
+    def __init__(self, max_attempts: int = 2, base_delay: float = 0.25, max_delay: float = 2.0,
+                 jitter: float = 0.1, attempt_timeout: Optional[float] = None,
+                 classify: Callable[[BaseException], str] = classify_error):
+        """
+        Args:
+            max_attempts (int): Máximo de tentativas (incluindo a primeira)
+            base_delay (float): Espera antes da segunda tentativa (segundos); dobra a cada falha
+            max_delay (float): Espera máxima entre tentativas (segundos)
+            jitter (float): Variação aleatória da espera (fração)
+            attempt_timeout (float): Tempo máximo de cada tentativa (None: só o prazo total)
+            classify: Função que classifica os erros
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.attempt_timeout = attempt_timeout
+        self.classify = classify
+
+    def _delay(self, attempt: int) -> float:
+        """Espera antes da tentativa seguinte à `attempt`"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def call(self, func: Callable, deadline: Optional[Deadline] = None,
+             breaker: Optional[CircuitBreaker] = None):
+        """
+        Executa `func` com novas tentativas dentro do prazo
+
+        Cada tentativa tem no máximo `attempt_timeout` e nunca passa do prazo
+        restante. Com um disjuntor, cada tentativa é registrada nele (inclusive
+        as que estouram o tempo) e as novas tentativas param se ele abrir.
+
+        Args:
+            func: Função sem argumentos
+            deadline (Deadline): Prazo total (None: sem prazo)
+            breaker (CircuitBreaker): Disjuntor do serviço chamado
+
+        Returns:
+            Resultado da função
+
+        Raises:
+            CircuitOpenError: Se o disjuntor estiver aberto
+            DeadlineExceededError: Se o prazo acabar
+            A última exceção recebida, nos demais casos
+        """
+        deadline = deadline or Deadline(None)
+        for attempt in range(1, self.max_attempts + 1):
+            if deadline.expired:
+                raise DeadlineExceededError("prazo da interação esgotado")
+            if breaker is not None and not breaker.allow():
+                raise CircuitOpenError(f"serviço '{breaker.name}' suspenso (disjuntor aberto)")
+
+            timeouts = [t for t in (self.attempt_timeout, deadline.remaining) if t is not None]
+            try:
+                result = run_with_timeout(func, min(timeouts) if timeouts else None)
+            except Exception as e:
+                transient = self.classify(e) == TRANSIENT
+                if breaker is not None and transient:
+                    breaker.record_failure()
+                elif breaker is not None:
+                    breaker.release()
+                if isinstance(e, TimeoutError) and deadline.expired:
+                    raise DeadlineExceededError("prazo da interação esgotado") from e
+                if not transient or attempt == self.max_attempts:
+                    raise
+                if breaker is not None and breaker.state == OPEN:
+                    raise
+                delay = self._delay(attempt)
+                remaining = deadline.remaining
+                if remaining is not None and delay >= remaining:
+                    raise
+                logger.info("🔁 Falha transitória (%s); nova tentativa em %.2f s", e, delay)
+                time.sleep(delay)
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return result
@@ -0,0 +1,413 @@
+"""
+Módulo de cache de respostas da LLM
+
+Perguntas repetidas (saudações, pedidos de ajuda, ...) são respondidas a
+partir do cache em vez de passar por uma nova geração. Há dois níveis:
+
+- exato: a pergunta normalizada (minúsculas, sem acentos nem pontuação)
+  é a chave do cache;
+- semântico (opcional): a pergunta é comparada por similaridade de
+  cosseno com as perguntas em cache usando um modelo de embeddings local
+  (sentence-transformers), aceitando a resposta acima de um limiar.
+
+As respostas ficam associadas ao modelo e ao perfil que as geraram
+(namespace): trocar de modelo não reaproveita respostas do anterior.
+As entradas expiram por tempo (TTL), as menos usadas são removidas quando
+o limite é atingido e o cache é salvo em disco, junto com as contagens
+de acertos e faltas de todas as execuções (também exportadas no contador
+Prometheus voice_assistant_response_cache_total).
+
+Uso:
+    python response_cache.py estatisticas
+    python response_cache.py limpar
+"""
+import argparse
+import atexit
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# Adiciona o diretório atual ao path para importações
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from tracing import configure_logging, metrics
+
+# Arquivo padrão do cache em disco
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "voice_assistant" / "respostas.json"
+
+# Modelo de embeddings multilíngue pequeno usado no nível semântico
+DEFAULT_EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+
+# Palavras que indicam perguntas cuja resposta muda com o tempo
+VOLATILE_WORDS = {"hora", "horas", "hoje", "agora", "data", "dia", "ontem", "amanha"}
+
+# Intervalo mínimo entre gravações do cache causadas só por acertos (segundos)
+SAVE_INTERVAL_SECONDS = 30.0
+
+# Resultados de uma consulta, como registrados nas contagens e no contador
+LOOKUP_RESULTS = ("exato", "semantico", "falta")
+
+logger = logging.getLogger(__name__)
+
+_lookups = metrics.counter("voice_assistant_response_cache_total", "Consultas ao cache de respostas",
+                           ("resultado",))
+
+
+def normalize_question(text: str) -> str:
+    """
+    Normaliza uma pergunta para uso como chave do cache
+
+    Args:
+        text (str): Pergunta original
+
+    Returns:
+        str: Pergunta em minúsculas, sem acentos, pontuação ou espaços extras
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """Cache de respostas com nível exato e nível semântico opcional"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 256,
+                 ttl_seconds: float = 7 * 24 * 3600, similarity_threshold: Optional[float] = None,
+                 embedding_model: str = DEFAULT_EMBEDDING_MODEL, namespace: str = ""):
+        """
+        Inicializa o cache
+
+        Args:
+            path (str): Arquivo JSON do cache em disco (None usa o padrão)
+            max_entries (int): Quantidade máxima de respostas armazenadas
+            ttl_seconds (float): Tempo de validade de cada resposta (segundos)
+            similarity_threshold (float): Similaridade de cosseno mínima para o
+                nível semântico (ex: 0.9); None desativa o nível semântico
+            embedding_model (str): Modelo sentence-transformers do nível semântico
+            namespace (str): Modelo/perfil que gera as respostas; só as respostas
+                do mesmo namespace são devolvidas
+        """
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model = embedding_model
+        self.namespace = namespace
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        # Contagens acumuladas de todas as execuções (gravadas com o cache)
+        self._totals = dict.fromkeys(LOOKUP_RESULTS, 0)
+        self._saved_at = time.monotonic()
+        self._dirty = False
+
+        self._lock = threading.Lock()
+        self._embedder_lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._embedder = None
+        self._vectors = {}
+        self._load()
+        # Acertos ainda não gravados são salvos ao encerrar o processo
+        atexit.register(self.flush)
+
+    def _load(self):
+        """Carrega as entradas salvas em disco, descartando as expiradas"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ Cache de respostas ignorado (%s): %s", self.path, e)
+            return
+
+        # Formato antigo: apenas a lista de entradas, sem contagens
+        entries = data if isinstance(data, list) else data.get("entradas", [])
+        if isinstance(data, dict):
+            for result in LOOKUP_RESULTS:
+                self._totals[result] = int(data.get("consultas", {}).get(result, 0))
+
+        now = time.time()
+        for entry in sorted(entries, key=lambda item: item["ultimo_uso"]):
+            if now - entry["criado_em"] <= self.ttl_seconds:
+                self._entries[self._key(entry["pergunta"], entry.get("modelo", ""))] = entry
+
+    def _save(self):
+        """Grava o cache em disco de forma atômica"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+                json.dump({"consultas": self._totals, "entradas": list(self._entries.values())},
+                          temp_file, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.path)
+            self._saved_at = time.monotonic()
+            self._dirty = False
+        except OSError as e:
+            logger.warning("⚠️ Não foi possível salvar o cache de respostas: %s", e)
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def _key(self, question: str, namespace: Optional[str] = None) -> str:
+        """Chave de uma pergunta: namespace e pergunta normalizada"""
+        namespace = self.namespace if namespace is None else namespace
+        return f"{namespace}\n{normalize_question(question)}"
+
+    @staticmethod
+    def is_cacheable(question: str) -> bool:
+        """
+        Indica se a resposta a uma pergunta pode ser reaproveitada
+
+        Args:
+            question (str): Pergunta do usuário
+
+        Returns:
+            bool: False para perguntas cuja resposta depende do momento (hora, data...)
+        """
+        words = set(normalize_question(question).split())
+        return bool(words) and not words & VOLATILE_WORDS
+
+    def _get_embedder(self):
+        """Carrega o modelo de embeddings no primeiro uso (desativa o nível se indisponível)"""
+        with self._embedder_lock:
+            if self._embedder is not None:
+                return self._embedder
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                logger.warning("⚠️ sentence-transformers não instalado; cache semântico desativado. "
+                               "Instale com: pip install sentence-transformers")
+                self.similarity_threshold = None
+                return None
+            logger.info("Carregando modelo de embeddings (%s)...", self.embedding_model)
+            self._embedder = SentenceTransformer(self.embedding_model)
+            return self._embedder
+
+    def _embed(self, texts: list) -> np.ndarray:
+        """Calcula embeddings normalizados (norma 1) para os textos"""
+        return np.asarray(
+            self._embedder.encode(texts, normalize_embeddings=True, show_progress_bar=False),
+            dtype=np.float32,
+        )
+
+    def _semantic_lookup(self, question: str) -> Optional[str]:
+        """
+        Procura a entrada do mesmo namespace mais parecida com a pergunta no índice vetorial
+
+        O modelo de embeddings é carregado e executado fora da trava do cache,
+        que só protege a leitura e a atualização do índice.
+        """
+        with self._lock:
+            keys = [k for k, entry in self._entries.items() if entry.get("modelo", "") == self.namespace]
+            missing = [(k, normalize_question(self._entries[k]["pergunta"]))
+                       for k in keys if k not in self._vectors]
+        if not keys or self._get_embedder() is None:
+            return None
+
+        vectors = self._embed([text for _, text in missing] + [normalize_question(question)])
+        query = vectors[-1]
+
+        with self._lock:
+            for (k, _), vector in zip(missing, vectors[:-1]):
+                if k in self._entries:
+                    self._vectors[k] = vector
+            # Entradas removidas enquanto os embeddings eram calculados ficam de fora
+            keys = [k for k in keys if k in self._entries and k in self._vectors]
+            if not keys:
+                return None
+            scores = np.stack([self._vectors[k] for k in keys]) @ query
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity_threshold:
+            return keys[best]
+        return None
+
+    def _record(self, result: str):
+        """
+        Conta o resultado de uma consulta (com a trava adquirida)
+
+        Faltas costumam ser seguidas de um put, que grava o cache; acertos
+        gravam as contagens no máximo a cada SAVE_INTERVAL_SECONDS.
+        """
+        if result == "exato":
+            self.exact_hits += 1
+        elif result == "semantico":
+            self.semantic_hits += 1
+        else:
+            self.misses += 1
+        self._totals[result] += 1
+        self._dirty = True
+        _lookups.inc(resultado=result)
+        if result != "falta" and time.monotonic() - self._saved_at >= SAVE_INTERVAL_SECONDS:
+            self._save()
+
+    def flush(self):
+        """Grava no disco as contagens e os usos ainda não salvos"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _use(self, key: str) -> str:
+        """Marca o uso de uma entrada e retorna a resposta (com a trava adquirida)"""
+        entry = self._entries[key]
+        entry["ultimo_uso"] = time.time()
+        entry["acertos"] += 1
+        self._entries.move_to_end(key)
+        return entry["resposta"]
+
+    def get(self, question: str) -> Optional[str]:
+        """
+        Busca a resposta de uma pergunta no cache
+
+        Args:
+            question (str): Pergunta do usuário
+
+        Returns:
+            str: Resposta armazenada ou None se não houver
+        """
+        if not self.is_cacheable(question):
+            return None
+
+        key = self._key(question)
+        with self._lock:
+            self._expire()
+            if key in self._entries:
+                response = self._use(key)
+                self._record("exato")
+                return response
+            if self.similarity_threshold is None:
+                self._record("falta")
+                return None
+
+        match = self._semantic_lookup(question)
+        with self._lock:
+            if match is None or match not in self._entries:
+                self._record("falta")
+                return None
+            response = self._use(match)
+            self._record("semantico")
+            return response
+
+    def put(self, question: str, response: str):
+        """
+        Armazena a resposta de uma pergunta
+
+        Args:
+            question (str): Pergunta do usuário
+            response (str): Resposta gerada pela LLM
+        """
+        if not response or not self.is_cacheable(question):
+            return
+
+        key = self._key(question)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {
+                "pergunta": question,
+                "resposta": response,
+                "modelo": self.namespace,
+                "criado_em": now,
+                "ultimo_uso": now,
+                "acertos": 0,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._vectors.pop(old_key, None)
+            self._save()
+
+    def _expire(self):
+        """Remove as entradas com validade vencida"""
+        now = time.time()
+        expired = [k for k, entry in self._entries.items() if now - entry["criado_em"] > self.ttl_seconds]
+        for k in expired:
+            del self._entries[k]
+            self._vectors.pop(k, None)
+
+    def stats(self) -> dict:
+        """
+        Retorna as estatísticas de uso do cache
+
+        Returns:
+            dict: Acertos por nível, faltas e taxa de acerto desta execução, as
+                mesmas contagens acumuladas de todas as execuções ("acumulado")
+                e a quantidade de entradas
+        """
+        def summary(exact: int, semantic: int, misses: int) -> dict:
+            total = exact + semantic + misses
+            return {
+                "acertos_exatos": exact,
+                "acertos_semanticos": semantic,
+                "faltas": misses,
+                "taxa_acerto": (exact + semantic) / total if total else 0.0,
+            }
+
+        with self._lock:
+            return {
+                **summary(self.exact_hits, self.semantic_hits, self.misses),
+                "acumulado": summary(*(self._totals[result] for result in LOOKUP_RESULTS)),
+                "entradas": len(self._entries),
+            }
+
+    def most_used(self, limit: int = 10) -> list:
+        """
+        Lista as perguntas mais respondidas pelo cache
+
+        Args:
+            limit (int): Quantidade máxima de entradas
+
+        Returns:
+            list: Entradas (pergunta, resposta, acertos...) em ordem decrescente de acertos
+        """
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry["acertos"], reverse=True)
+            return [dict(entry) for entry in entries[:limit]]
+
+    def clear(self):
+        """Remove todas as respostas do cache"""
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+            self._totals = dict.fromkeys(LOOKUP_RESULTS, 0)
+            self._save()
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Cache de respostas da LLM")
+    parser.add_argument("comando", choices=["estatisticas", "limpar"])
+    parser.add_argument("--arquivo", default=None, help="Arquivo do cache")
+    args = parser.parse_args()
+    configure_logging()
+
+    cache = ResponseCache(path=args.arquivo)
+
+    if args.comando == "limpar":
+        cache.clear()
+        print(f"🧹 Cache limpo: {cache.path}")
+    else:
+        for entry in cache.most_used():
+            print(f"{entry['acertos']:>4}x  {entry['pergunta']}")
+
+    stats = cache.stats()
+    totals = stats["acumulado"]
+    print(f"\n📦 Cache em {cache.path}: {stats['entradas']} resposta(s)")
+    if args.comando == "estatisticas":
+        print(f"🎯 Taxa de acerto: {totals['taxa_acerto']:.0%} ({totals['acertos_exatos']} exato(s), "
+              f"{totals['acertos_semanticos']} semântico(s), {totals['faltas']} falta(s))")
+
+
+if __name__ == "__main__":
+    main()
@@ -70,11 +70,37 @@ def test_full_voice_assistant():
         traceback.print_exc()
         return False
 
+def test_streaming_responses_flag():
+    """Testa se --resposta-streaming desvia a entrada para a fala frase a frase"""
+    print("\\n🔀 TESTE DA RESPOSTA EM STREAMING")
+    print("=" * 50)
+    
+    from main import VoiceAssistant
+    
+    calls = []
+    for streaming in (True, False):
+        # Sem carregar modelos: só os atributos usados no desvio
+        assistant = VoiceAssistant.__new__(VoiceAssistant)
+        assistant.streaming_responses = streaming
+        assistant.process_voice_input_streaming = lambda text: calls.append(("streaming", text))
+        assistant.llm_manager = None  # O caminho completo falha aqui e fala a mensagem de erro
+        assistant.convert_text_to_speech = lambda text, deadline=None: calls.append(("completa", text))
+        assistant._conversation_session = lambda: None
+        assistant.process_voice_input("Olá")
+    
+    if calls[0] == ("streaming", "Olá") and calls[1][0] == "completa":
+        print("✅ A flag troca o caminho da resposta")
+        return True
+    print(f"❌ Caminhos inesperados: {calls}")
+    return False
+
 def main():
     """Função principal de teste"""
     print("🧪 TESTE DE CORREÇÕES - ASSISTENTE DE VOZ")
     print("=" * 60)
     
+    test_streaming_responses_flag()
+    
     # Teste 1: Correção da depreciação
     success1, response = test_llm_deprecation_fix()
     
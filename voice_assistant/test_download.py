@@ -0,0 +1,184 @@
+"""
+Testes do download de modelos usando um servidor HTTP local no lugar do Hugging Face
+"""
+import hashlib
+import http.server
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Adiciona o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import download_model
+from download_model import ChecksumError, DownloadError, download_file
+
+# Conteúdo servido: alguns intervalos de 8 MB para exercitar as conexões paralelas
+PAYLOAD = os.urandom(3 * download_model.MIN_SEGMENT_SIZE + 12345)
+PAYLOAD_SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Servidor de um único arquivo com suporte a HEAD, Range e falhas simuladas"""
+
+    accept_ranges = True
+    linked_etag = None
+    fail_after_bytes = None
+    served_bytes = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_headers(self, status: int, start: int, end: int):
+        self.send_response(status)
+        self.send_header("Content-Length", str(end - start + 1))
+        if self.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        if self.linked_etag:
+            self.send_header("X-Linked-Etag", f'"{self.linked_etag}"')
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._send_headers(200, 0, len(PAYLOAD) - 1)
+
+    def do_GET(self):
+        start, end, status = 0, len(PAYLOAD) - 1, 200
+        range_header = self.headers.get("Range")
+        if range_header and self.accept_ranges:
+            first, last = range_header.replace("bytes=", "").split("-")
+            start, end, status = int(first), int(last or end), 206
+
+        self._send_headers(status, start, end)
+        handler = type(self)
+        position = start
+        while position <= end:
+            with handler.lock:
+                if handler.fail_after_bytes is not None and handler.served_bytes >= handler.fail_after_bytes:
+                    return  # Simula a queda da conexão
+                block = PAYLOAD[position:min(position + 65536, end + 1)]
+                handler.served_bytes += len(block)
+            try:
+                self.wfile.write(block)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            position += len(block)
+
+
+class LocalServer:
+    """Servidor HTTP local em uma thread"""
+
+    def __init__(self, port: int = 0, **options):
+        self.handler = type("Handler", (_Handler,), dict(options))
+        self.handler.served_bytes = 0
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", port), self.handler)
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/modelo.gguf"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_parallel_download():
+    """Download paralelo com SHA-256 do manifesto"""
+    print("🧪 Download paralelo com verificação de SHA-256...")
+    with tempfile.TemporaryDirectory() as directory, LocalServer() as server:
+        destination = Path(directory) / "modelo.gguf"
+        download_file(server.url, destination, connections=4, expected_sha256=PAYLOAD_SHA256)
+        assert destination.read_bytes() == PAYLOAD
+        assert not Path(str(destination) + ".part").exists()
+        assert not Path(str(destination) + ".part.json").exists()
+    print("✅ Download paralelo OK")
+    return True
+
+
+def test_resume_download():
+    """Download interrompido continua de onde parou"""
+    print("🧪 Retomada de download interrompido...")
+    original_retries = download_model.SEGMENT_RETRIES
+    download_model.SEGMENT_RETRIES = 1
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            destination = Path(directory) / "modelo.gguf"
+
+            with LocalServer(fail_after_bytes=len(PAYLOAD) // 2) as server:
+                port = server.port
+                try:
+                    download_file(server.url, destination, connections=4)
+                    raise AssertionError("O download deveria ter falhado")
+                except DownloadError:
+                    pass
+            assert not destination.exists()
+            assert Path(str(destination) + ".part.json").exists()
+
+            # Mesma URL (mesma porta), como no servidor real
+            with LocalServer(port=port) as server:
+                download_file(server.url, destination, connections=4, expected_sha256=PAYLOAD_SHA256)
+                resumed_bytes = server.handler.served_bytes
+
+            assert destination.read_bytes() == PAYLOAD
+            assert resumed_bytes < len(PAYLOAD), "A retomada baixou o arquivo inteiro de novo"
+    finally:
+        download_model.SEGMENT_RETRIES = original_retries
+    print(f"✅ Retomada OK ({resumed_bytes} de {len(PAYLOAD)} bytes baixados na segunda vez)")
+    return True
+
+
+def test_checksum_mismatch():
+    """Arquivo com SHA-256 diferente é descartado e não substitui o destino"""
+    print("🧪 SHA-256 incorreto (via X-Linked-Etag)...")
+    with tempfile.TemporaryDirectory() as directory, LocalServer(linked_etag="0" * 64) as server:
+        destination = Path(directory) / "modelo.gguf"
+        try:
+            download_file(server.url, destination, connections=2)
+            raise AssertionError("O SHA-256 incorreto deveria ter sido detectado")
+        except ChecksumError:
+            pass
+        assert not destination.exists()
+        assert not Path(str(destination) + ".part").exists()
+    print("✅ Verificação de SHA-256 OK")
+    return True
+
+
+def test_server_without_ranges():
+    """Servidor sem suporte a Range usa uma única conexão"""
+    print("🧪 Servidor sem suporte a intervalos...")
+    with tempfile.TemporaryDirectory() as directory, LocalServer(accept_ranges=False) as server:
+        destination = Path(directory) / "modelo.gguf"
+        download_file(server.url, destination, connections=4, expected_sha256=PAYLOAD_SHA256)
+        assert destination.read_bytes() == PAYLOAD
+    print("✅ Download em uma conexão OK")
+    return True
+
+
+def main():
+    """Executa todos os testes"""
+    print("🔧 TESTE DO DOWNLOAD DE MODELOS")
+    print("=" * 40)
+
+    tests = [test_parallel_download, test_resume_download, test_checksum_mismatch, test_server_without_ranges]
+    passed = 0
+    for test in tests:
+        try:
+            passed += bool(test())
+        except Exception as e:
+            print(f"❌ {test.__doc__}: {e}")
+        print()
+
+    print("=" * 40)
+    print(f"📊 {passed}/{len(tests)} testes passaram")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,110 @@
+"""
+Módulo para segmentação de texto em frases, inclusive de forma incremental
+"""
+import re
+from typing import List, Optional
+
+# Abreviações comuns em português que não encerram frases
+ABBREVIATIONS = {
+    "sr", "sra", "srta", "dr", "dra", "prof", "profa", "etc", "ex", "obs",
+    "pág", "p", "av", "n", "nº", "tel", "vol", "cap", "art", "aprox",
+}
+
+# Pontuação final seguida de aspas/parênteses opcionais e de espaço
+_SENTENCE_END = re.compile(r'[.!?…]+["\'”’)\]]*(?=\s)')
+
+
+# Maior abreviação conhecida: limita o trecho examinado antes de cada ponto
+_ABBREVIATION_WINDOW = max(len(abbreviation) for abbreviation in ABBREVIATIONS) + 1
+
+
+def _is_abbreviation(text: str, end: int) -> bool:
+    """Verifica se o ponto na posição `end` pertence a uma abreviação"""
+    # Examina só o final do texto (o buffer pode ser grande ao ler documentos)
+    window_start = max(0, end - _ABBREVIATION_WINDOW)
+    match = re.search(r'(\w+)\.$', text[window_start:end + 1])
+    if not match or (match.start() == 0 and window_start > 0 and re.match(r'\w', text[window_start - 1])):
+        return False
+    return match.group(1).lower() in ABBREVIATIONS
+
+
+def split_sentences(text: str, min_length: int = 1) -> List[str]:
+    """
+    Divide um texto completo em frases
+
+    Args:
+        text (str): Texto a ser dividido
+        min_length (int): Tamanho mínimo de uma frase; frases menores são
+            unidas à seguinte
+
+    Returns:
+        list: Frases encontradas
+    """
+    segmenter = SentenceSegmenter(min_length=min_length)
+    sentences = segmenter.feed(text)
+    remainder = segmenter.flush()
+    if remainder:
+        sentences.append(remainder)
+    return sentences
+
+
+class SentenceSegmenter:
+    """Segmentador incremental que recebe texto em pedaços (ex: tokens da LLM)"""
+
+    def __init__(self, min_length: int = 1):
+        """
+        Inicializa o segmentador
+
+        Args:
+            min_length (int): Tamanho mínimo de uma frase emitida
+        """
+        self.min_length = min_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Acrescenta texto e retorna as frases que ficaram completas
+
+        Uma frase só é considerada completa quando a pontuação final é
+        seguida de espaço, para não cortar números como "3.5".
+
+        Args:
+            text (str): Novo pedaço de texto
+
+        Returns:
+            list: Frases completas (pode ser vazia)
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+
+        for match in _SENTENCE_END.finditer(self._buffer):
+            end = match.end()
+            if self._buffer[match.start()] == "." and _is_abbreviation(self._buffer, match.start()):
+                continue
+
+            sentence = self._buffer[start:end].strip()
+            if len(sentence) < self.min_length:
+                continue
+
+            sentences.append(sentence)
+            start = end
+
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    @property
+    def pending(self) -> str:
+        """Texto recebido que ainda não formou uma frase completa"""
+        return self._buffer
+
+    def flush(self) -> Optional[str]:
+        """
+        Retorna o texto restante como última frase
+
+        Returns:
+            str: Texto pendente ou None se não houver
+        """
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return remainder or None
@@ -0,0 +1,601 @@
+"""
+Módulo de rastreamento de latência por etapa e exportação de métricas
+
+Cada etapa de uma interação (captura, transcrição, prompt e geração da LLM,
+síntese, reprodução) é registrada como um span com instantes monotônicos e
+o identificador da interação. Os spans vão para um arquivo JSONL (um por
+linha) e alimentam histogramas e contadores no formato de texto do
+Prometheus, expostos em um endpoint HTTP local ou em um arquivo para o
+coletor textfile do node_exporter.
+
+O custo por span é de alguns microssegundos (um objeto, uma trava e uma
+linha de JSON), baixo o bastante para ficar ligado o tempo todo.
+
+O identificador da interação fica em uma ContextVar: vale para a thread (ou
+tarefa asyncio) que abriu a interação; para outras threads, use
+`contextvars.copy_context().run` ou `tracer.run_in`.
+
+Uso:
+    with tracer.interaction():
+        with tracer.span("transcricao", modelo="base"):
+            ...
+"""
+import contextvars
+import itertools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# Arquivo padrão dos spans
+DEFAULT_TRACE_PATH = Path.home() / ".cache" / "voice_assistant" / "traces.jsonl"
+
+# Tamanho a partir do qual o arquivo de spans é rotacionado (um arquivo .1 é mantido)
+MAX_TRACE_BYTES = 10 * 1024 * 1024
+
+# Limites dos buckets do histograma de latência (segundos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Nome do span raiz de cada interação
+INTERACTION_SPAN = "interacao"
+
+_interaction = contextvars.ContextVar("interacao", default=None)
+_current_span = contextvars.ContextVar("span", default=None)
+_span_ids = itertools.count(1)
+
+
+def current_interaction() -> Optional[str]:
+    """Identificador da interação ativa neste contexto (None fora de uma interação)"""
+    return _interaction.get()
+
+
+def new_interaction_id() -> str:
+    """Gera um identificador de interação"""
+    return uuid.uuid4().hex[:12]
+
+
+def _escape(value) -> str:
+    """Escapa o valor de um rótulo no formato de texto do Prometheus"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    """Monta o trecho {rotulo="valor",...} de uma amostra"""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    """Formata um número no formato de texto do Prometheus"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Contador monotônico com rótulos"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        """Soma `amount` à série dos rótulos informados"""
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        """Valor atual da série dos rótulos informados"""
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_labels(self.label_names, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Histograma cumulativo com buckets fixos e rótulos"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, list] = {}  # rótulos -> [contagens por bucket..., soma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        """Registra uma observação"""
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _labels(self.label_names, key, 'le="%s"' % _format_value(bound))
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            bucket_labels = _labels(self.label_names, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{bucket_labels} {series[-1]}"
+            yield f"{self.name}_sum{_labels(self.label_names, key)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_labels(self.label_names, key)} {series[-1]}"
+
+
+class CallbackMetric:
+    """Métrica lida de uma função no momento da exportação (ex: estado de um disjuntor)"""
+
+    def __init__(self, name: str, help_text: str, callback: Callable[[], Iterable[Tuple[dict, float]]],
+                 kind: str = "gauge"):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self) -> Iterable[str]:
+        try:
+            values = list(self.callback())
+        except Exception as e:
+            logging.getLogger(__name__).warning("Falha ao ler a métrica %s: %s", self.name, e)
+            return
+        for labels, value in values:
+            names = tuple(labels)
+            yield f"{self.name}{_labels(names, tuple(labels[n] for n in names))} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """Conjunto de métricas exportadas no formato de texto do Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and not isinstance(metric, CallbackMetric):
+                return existing
+            # Métricas por callback são substituídas (ex: um novo sintetizador)
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        """Cria (ou recupera) um contador"""
+        return self._register(Counter(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        """Cria (ou recupera) um histograma"""
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def callback(self, name: str, help_text: str, callback: Callable[[], Iterable[Tuple[dict, float]]],
+                 kind: str = "gauge") -> CallbackMetric:
+        """
+        Registra uma métrica lida de uma função a cada exportação
+
+        Args:
+            name (str): Nome da métrica
+            help_text (str): Descrição
+            callback: Função que retorna pares (rótulos, valor)
+            kind (str): Tipo Prometheus ("gauge" ou "counter")
+        """
+        return self._register(CallbackMetric(name, help_text, callback, kind))
+
+    def render(self) -> str:
+        """Exporta todas as métricas no formato de texto do Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Grava as métricas em um arquivo de forma atômica (coletor textfile do node_exporter)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+                temp_file.write(self.render())
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Expõe as métricas em http://host:porta/metrics em uma thread de fundo
+
+        Args:
+            port (int): Porta (0 escolhe uma livre)
+            host (str): Endereço (padrão: apenas local)
+
+        Returns:
+            ThreadingHTTPServer: Servidor em execução (server_address tem a porta usada)
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metricas-http", daemon=True).start()
+        return self._server
+
+    def stop_server(self):
+        """Encerra o endpoint HTTP, se ativo"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class Span:
+    """Trecho cronometrado de uma etapa"""
+
+    __slots__ = ("tracer", "name", "interaction", "span_id", "parent_id", "start", "end",
+                 "wall_time", "status", "attributes")
+
+    def __init__(self, tracer: "Tracer", name: str, interaction: Optional[str],
+                 parent_id: Optional[int], attributes: dict):
+        self.tracer = tracer
+        self.name = name
+        self.interaction = interaction
+        self.span_id = next(_span_ids)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.wall_time = time.time()
+        self.start = time.monotonic()
+        self.end: Optional[float] = None
+        self.status = "ok"
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Duração em segundos (None enquanto aberto)"""
+        return None if self.end is None else self.end - self.start
+
+    def set(self, **attributes):
+        """Acrescenta atributos ao span"""
+        self.attributes.update(attributes)
+
+    def finish(self, status: Optional[str] = None, **attributes):
+        """Encerra o span e o registra (chamadas repetidas são ignoradas)"""
+        if self.end is not None:
+            return
+        self.end = time.monotonic()
+        if status is not None:
+            self.status = status
+        self.attributes.update(attributes)
+        self.tracer._record(self)
+
+    def to_dict(self) -> dict:
+        """Registro JSON do span"""
+        return {
+            "interacao": self.interaction,
+            "span": self.span_id,
+            "pai": self.parent_id,
+            "etapa": self.name,
+            "inicio": round(self.start, 6),
+            "fim": round(self.end, 6) if self.end is not None else None,
+            "duracao_ms": round(self.duration * 1000, 3) if self.end is not None else None,
+            "horario": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.wall_time)),
+            "status": self.status,
+            "atributos": self.attributes,
+        }
+
+
+class Tracer:
+    """Registra spans por interação em JSONL e em métricas Prometheus"""
+
+    def __init__(self, metrics: Optional[MetricsRegistry] = None, trace_path=None,
+                 metrics_path=None, max_trace_bytes: int = MAX_TRACE_BYTES):
+        """
+        Args:
+            metrics (MetricsRegistry): Registro das métricas (padrão: um novo)
+            trace_path: Arquivo JSONL dos spans (None: não grava spans)
+            metrics_path: Arquivo de métricas atualizado ao fim de cada interação (None: não grava)
+            max_trace_bytes (int): Tamanho que dispara a rotação do arquivo de spans
+        """
+        self.metrics = metrics or MetricsRegistry()
+        self.max_trace_bytes = max_trace_bytes
+        self.metrics_path = Path(metrics_path) if metrics_path else None
+        self._stage_seconds = self.metrics.histogram(
+            "voice_assistant_etapa_segundos", "Duração de cada etapa de uma interação", ("etapa",))
+        self._stage_total = self.metrics.counter(
+            "voice_assistant_etapas_total", "Etapas concluídas por resultado", ("etapa", "status"))
+        self._file = None
+        self.trace_path = None
+        self._file_lock = threading.Lock()
+        self._listeners: Tuple[Callable[[Span], None], ...] = ()
+        self.set_trace_path(trace_path)
+
+    def set_trace_path(self, trace_path):
+        """Passa a gravar os spans em outro arquivo (None desativa)"""
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.trace_path = Path(trace_path) if trace_path else None
+            if self.trace_path is not None:
+                self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.trace_path, "a", encoding="utf-8", buffering=1)
+
+    def add_listener(self, listener: Callable[[Span], None]):
+        """Chama `listener(span)` a cada span encerrado (ex: coleta dos benchmarks)"""
+        self._listeners = (*self._listeners, listener)
+
+    def remove_listener(self, listener: Callable[[Span], None]):
+        """Deixa de chamar um listener registrado por add_listener"""
+        self._listeners = tuple(l for l in self._listeners if l is not listener)
+
+    def start_span(self, name: str, interaction: Optional[str] = None, **attributes) -> Span:
+        """
+        Abre um span que deve ser encerrado com span.finish()
+
+        Útil quando o início e o fim estão em pontos diferentes do código (ex:
+        primeiro token de um gerador). O span não vira o pai dos seguintes.
+
+        Args:
+            name (str): Etapa
+            interaction (str): Interação (None usa a do contexto)
+            **attributes: Atributos do span
+        """
+        parent = _current_span.get()
+        return Span(self, name, interaction or _interaction.get(),
+                    parent.span_id if parent is not None else None, attributes)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Cronometra um bloco como um span (filho do span atual)
+
+        Uma exceção marca o span com status "erro" e é propagada.
+        """
+        span = self.start_span(name, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish("erro", erro=type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+
+    @contextmanager
+    def interaction(self, interaction_id: Optional[str] = None, **attributes):
+        """
+        Abre uma interação (span raiz) ou participa da que já está ativa
+
+        Args:
+            interaction_id (str): Identificador (None gera um novo)
+            **attributes: Atributos do span raiz
+
+        Yields:
+            str: Identificador da interação
+        """
+        active = _interaction.get()
+        if active is not None and interaction_id in (None, active):
+            yield active
+            return
+
+        interaction_id = interaction_id or new_interaction_id()
+        token = _interaction.set(interaction_id)
+        try:
+            with self.span(INTERACTION_SPAN, **attributes):
+                yield interaction_id
+        finally:
+            _interaction.reset(token)
+
+    def run_in(self, parent: Optional[Span], func: Callable, *args):
+        """
+        Executa uma função sob um span (para chamadas em outras threads)
+
+        A interação e o span pai passam a ser os de `parent`, de modo que os
+        spans abertos pela função ficam ligados a ele, como na thread de origem.
+
+        Args:
+            parent (Span): Span pai (ex: raiz da interação); None executa fora de interação
+            func: Função executada
+            *args: Argumentos da função
+        """
+        interaction_token = _interaction.set(parent.interaction if parent is not None else None)
+        span_token = _current_span.set(parent)
+        try:
+            return func(*args)
+        finally:
+            _current_span.reset(span_token)
+            _interaction.reset(interaction_token)
+
+    def _record(self, span: Span):
+        """Exporta um span encerrado para as métricas e o JSONL"""
+        self._stage_seconds.observe(span.duration, etapa=span.name)
+        self._stage_total.inc(etapa=span.name, status=span.status)
+        for listener in self._listeners:
+            listener(span)
+        if self._file is not None:
+            line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+            with self._file_lock:
+                if self._file is not None:
+                    self._file.write(line + "\n")
+                    if self._file.tell() > self.max_trace_bytes:
+                        self._rotate()
+
+        # O arquivo de métricas é atualizado ao fim de cada interação
+        if span.name == INTERACTION_SPAN and self.metrics_path is not None:
+            try:
+                self.metrics.write_textfile(self.metrics_path)
+            except OSError as e:
+                logging.getLogger(__name__).warning("Falha ao gravar as métricas: %s", e)
+
+    def _rotate(self):
+        """Rotaciona o arquivo de spans (chamar com a trava do arquivo)"""
+        self._file.close()
+        os.replace(self.trace_path, self.trace_path.with_suffix(self.trace_path.suffix + ".1"))
+        self._file = open(self.trace_path, "a", encoding="utf-8", buffering=1)
+
+    def close(self):
+        """Fecha o arquivo de spans e grava as métricas uma última vez"""
+        self.set_trace_path(None)
+        if self.metrics_path is not None:
+            self.metrics.write_textfile(self.metrics_path)
+
+
+class _InteractionFilter(logging.Filter):
+    """Acrescenta o identificador da interação aos registros de log"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.interacao = _interaction.get() or "-"
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Formata registros de log como uma linha JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "horario": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "nivel": record.levelname,
+            "modulo": record.name,
+            "interacao": getattr(record, "interacao", None),
+            "mensagem": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["excecao"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(level: str = "INFO", json_format: bool = False):
+    """
+    Configura o log dos módulos do assistente
+
+    No formato texto só a mensagem é exibida (como os antigos prints); no
+    formato JSON cada linha traz horário, nível, módulo e interação.
+
+    Args:
+        level (str): Nível mínimo (DEBUG, INFO, WARNING...)
+        json_format (bool): Se True, uma linha JSON por registro
+    """
+    handler = logging.StreamHandler()
+    handler.addFilter(_InteractionFilter())
+    handler.setFormatter(JSONFormatter() if json_format else logging.Formatter("%(message)s"))
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+
+# Registro de métricas e rastreador do processo
+metrics = MetricsRegistry()
+tracer = Tracer(metrics)
+
+
+def configure_tracing(trace_path=DEFAULT_TRACE_PATH, metrics_path=None,
+                      metrics_port: Optional[int] = None) -> Tracer:
+    """
+    Configura as saídas do rastreador do processo
+
+    Args:
+        trace_path: Arquivo JSONL dos spans (None: não grava spans)
+        metrics_path: Arquivo de métricas Prometheus, atualizado a cada interação
+        metrics_port (int): Porta do endpoint HTTP local /metrics (None: desativado)
+
+    Returns:
+        Tracer: O rastreador do processo
+    """
+    tracer.set_trace_path(trace_path)
+    tracer.metrics_path = Path(metrics_path) if metrics_path else None
+    if metrics_port is not None:
+        server = metrics.serve(metrics_port)
+        logging.getLogger(__name__).info("📈 Métricas em http://%s:%d/metrics", *server.server_address[:2])
+    return tracer
+
+
+def trace_stream(items: Iterable, first_stage: str, rest_stage: str,
+                 counter: Optional[Counter] = None) -> Iterator:
+    """
+    Repassa os itens de um gerador medindo a espera pelo primeiro e o restante
+
+    Para a LLM, o primeiro span é a avaliação do prompt (até o primeiro token)
+    e o segundo, a geração dos demais tokens.
+
+    Args:
+        items: Gerador (ex: tokens do modelo); é fechado ao final
+        first_stage (str): Etapa até o primeiro item
+        rest_stage (str): Etapa do primeiro item até o fim (atributo "itens")
+        counter (Counter): Contador incrementado com o número de itens
+    """
+    span = tracer.start_span(first_stage)
+    count = 0
+    try:
+        for item in items:
+            if count == 0:
+                span.finish()
+                span = tracer.start_span(rest_stage)
+            count += 1
+            yield item
+    except GeneratorExit:
+        raise
+    except BaseException as e:
+        span.finish("erro", erro=type(e).__name__)
+        raise
+    finally:
+        if count:
+            span.set(itens=count)
+        span.finish()
+        if counter is not None:
+            counter.inc(count)
+        close = getattr(items, "close", None)
+        if close is not None:
+            close()
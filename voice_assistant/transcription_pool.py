@@ -0,0 +1,246 @@
+"""
+Módulo com um pool de processos para transcrição paralela usando Whisper
+
+Cada processo mantém seu próprio modelo Whisper carregado. O áudio é
+entregue aos processos por memória compartilhada, e apenas o nome do
+bloco e o número de amostras trafegam pela fila.
+"""
+import itertools
+import logging
+import multiprocessing as mp
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TranscriptionResult:
+    """Resultado de uma requisição de transcrição do pool"""
+    request_id: int
+    text: str
+    error: Optional[str]
+    worker_seconds: float
+    total_seconds: float
+
+
+def _worker_main(model_name: str, threads: int, language: Optional[str], quantize: bool, tasks, results):
+    """
+    Laço principal de um processo de transcrição
+
+    Args:
+        model_name (str): Modelo Whisper a carregar
+        threads (int): Número de threads do torch neste processo
+        language (str): Idioma fixo ou None para detecção automática
+        quantize (bool): Se True, quantiza o modelo para int8
+        tasks: Fila de tarefas (request_id, nome do bloco, número de amostras)
+        results: Fila de resultados (request_id, texto, erro, segundos)
+    """
+    import torch
+    from whisper_models import load_whisper_model
+
+    try:
+        torch.set_num_threads(threads)
+        model = load_whisper_model(model_name, device="cpu", quantize=quantize)
+    except Exception as e:
+        results.put(("ready", None, str(e), 0.0))
+        return
+    results.put(("ready", None, None, 0.0))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        request_id, shm_name, n_samples = task
+        start = time.perf_counter()
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            audio = np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf)
+            result = model.transcribe(audio, language=language, fp16=False)
+            del audio
+            results.put((request_id, result["text"].strip(), None, time.perf_counter() - start))
+        except Exception as e:
+            results.put((request_id, "", str(e), time.perf_counter() - start))
+        finally:
+            shm.close()
+
+
+class TranscriptionPool:
+    """Classe para transcrição paralela em vários processos"""
+
+    def __init__(self, model_name: str = "base", workers: int = 2, threads_per_worker: int = 1,
+                 max_pending: Optional[int] = None, language: Optional[str] = None, quantize: bool = False):
+        """
+        Inicializa o pool e aguarda todos os processos carregarem o modelo
+
+        Args:
+            model_name (str): Modelo Whisper usado por cada processo
+            workers (int): Número de processos
+            threads_per_worker (int): Threads do torch por processo
+            max_pending (int): Máximo de requisições em andamento antes de bloquear
+                novos envios (padrão: 2 por processo)
+            language (str): Idioma fixo ou None para detecção automática
+            quantize (bool): Se True, cada processo usa o modelo quantizado para int8
+        """
+        self.workers = workers
+        self.max_pending = max_pending or workers * 2
+
+        context = mp.get_context("spawn")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._ids = itertools.count()
+        self._pending = {}
+        self._finished = {}
+        self._condition = threading.Condition()
+
+        logger.info("Iniciando %d processo(s) de transcrição (modelo '%s')...", workers, model_name)
+        self._processes = [
+            context.Process(
+                target=_worker_main,
+                args=(model_name, threads_per_worker, language, quantize, self._tasks, self._results),
+                daemon=True,
+            )
+            for _ in range(workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+        # Aguarda todos os modelos serem carregados
+        errors = [self._results.get()[2] for _ in range(workers)]
+        errors = [error for error in errors if error]
+        if errors:
+            for process in self._processes:
+                process.terminate()
+            raise RuntimeError(f"Erro ao carregar o modelo nos processos: {errors[0]}")
+
+        self._collector = threading.Thread(target=self._collect_results, daemon=True)
+        self._collector.start()
+        logger.info("Pool de transcrição pronto!")
+
+    def _collect_results(self):
+        """Recebe resultados dos processos e libera a memória compartilhada"""
+        while True:
+            message = self._results.get()
+            if message is None:
+                break
+
+            request_id, text, error, worker_seconds = message
+            with self._condition:
+                shm, submitted_at = self._pending.pop(request_id)
+                self._finished[request_id] = TranscriptionResult(
+                    request_id=request_id,
+                    text=text,
+                    error=error,
+                    worker_seconds=worker_seconds,
+                    total_seconds=time.perf_counter() - submitted_at,
+                )
+                self._condition.notify_all()
+
+            shm.close()
+            shm.unlink()
+            self._slots.release()
+
+    def submit(self, audio: np.ndarray, timeout: Optional[float] = None) -> int:
+        """
+        Envia um áudio para transcrição
+
+        Bloqueia enquanto houver `max_pending` requisições em andamento.
+
+        Args:
+            audio (np.ndarray): Áudio mono float32 a 16 kHz
+            timeout (float): Tempo máximo de espera por uma vaga (segundos)
+
+        Returns:
+            int: Identificador da requisição
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Pool de transcrição ocupado")
+
+        try:
+            audio = np.ascontiguousarray(audio, dtype=np.float32)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, audio.nbytes))
+            np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+        except Exception:
+            self._slots.release()
+            raise
+
+        request_id = next(self._ids)
+        with self._condition:
+            self._pending[request_id] = (shm, time.perf_counter())
+        self._tasks.put((request_id, shm.name, audio.shape[0]))
+        return request_id
+
+    def result(self, request_id: int, timeout: Optional[float] = None) -> TranscriptionResult:
+        """
+        Aguarda o resultado de uma requisição
+
+        Args:
+            request_id (int): Identificador retornado por submit
+            timeout (float): Tempo máximo de espera (segundos)
+
+        Returns:
+            TranscriptionResult: Resultado da transcrição
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: request_id in self._finished, timeout=timeout):
+                raise TimeoutError(f"Requisição {request_id} não concluída")
+            return self._finished.pop(request_id)
+
+    def transcribe_many(self, audios: Iterable[np.ndarray]) -> Iterator[TranscriptionResult]:
+        """
+        Transcreve vários áudios em paralelo, emitindo os resultados na ordem de envio
+
+        Args:
+            audios: Áudios mono float32 a 16 kHz
+
+        Yields:
+            TranscriptionResult: Resultados na mesma ordem dos áudios
+        """
+        submitted: List[int] = []
+        for audio in audios:
+            # Entrega os resultados já prontos antes de bloquear em um novo envio
+            while submitted and self._is_finished(submitted[0]):
+                yield self.result(submitted.pop(0))
+            submitted.append(self.submit(audio))
+
+        for request_id in submitted:
+            yield self.result(request_id)
+
+    def _is_finished(self, request_id: int) -> bool:
+        """Indica se a requisição já tem resultado disponível"""
+        with self._condition:
+            return request_id in self._finished
+
+    def close(self):
+        """Encerra os processos e libera os recursos do pool"""
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+        self._results.put(None)
+        self._collector.join(timeout=5)
+
+        # Libera blocos de requisições que não chegaram a ser concluídas
+        with self._condition:
+            for shm, _ in self._pending.values():
+                shm.close()
+                shm.unlink()
+            self._pending.clear()
+
+        logger.info("Pool de transcrição encerrado.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,146 @@
+"""
+Módulo com os motores de síntese de voz disponíveis para o VoiceSynthesizer
+"""
+import io
+import shutil
+import subprocess
+import wave
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+
+@dataclass
+class SynthesizedAudio:
+    """Áudio produzido por um motor de síntese"""
+    data: bytes
+    audio_format: str
+    engine: str
+
+
+@dataclass
+class PCMAudio:
+    """Amostras PCM de 16 bits extraídas de um áudio WAV"""
+    samples: bytes
+    sample_rate: int
+    channels: int
+    sample_width: int
+
+
+def wav_to_pcm(data: bytes) -> PCMAudio:
+    """
+    Extrai as amostras PCM de um áudio WAV em memória
+
+    Args:
+        data (bytes): Conteúdo do arquivo WAV
+
+    Returns:
+        PCMAudio: Amostras e formato do áudio
+    """
+    with wave.open(io.BytesIO(data), "rb") as wav_file:
+        return PCMAudio(
+            samples=wav_file.readframes(wav_file.getnframes()),
+            sample_rate=wav_file.getframerate(),
+            channels=wav_file.getnchannels(),
+            sample_width=wav_file.getsampwidth(),
+        )
+
+
+class TTSBackend(ABC):
+    """Interface dos motores de síntese de voz"""
+
+    name = ""
+    audio_format = ""
+    # Motores remotos dependem da rede: passam pelo disjuntor e pelas novas tentativas
+    remote = False
+
+    def is_available(self) -> bool:
+        """Indica se o motor pode ser usado nesta máquina"""
+        return True
+
+    @abstractmethod
+    def synthesize(self, text: str, language: str, slow: bool = False) -> bytes:
+        """
+        Sintetiza um texto
+
+        Args:
+            text (str): Texto a ser sintetizado
+            language (str): Código do idioma (ex: 'pt-br')
+            slow (bool): Se True, fala mais devagar
+
+        Returns:
+            bytes: Áudio no formato `audio_format` do motor
+        """
+
+
+class GTTSBackend(TTSBackend):
+    """Motor Google Text-to-Speech (requer internet)"""
+
+    name = "gtts"
+    audio_format = "mp3"
+    remote = True
+
+    def synthesize(self, text: str, language: str, slow: bool = False) -> bytes:
+        from gtts import gTTS
+
+        audio_buffer = io.BytesIO()
+        gTTS(text=text, lang=language, slow=slow).write_to_fp(audio_buffer)
+        return audio_buffer.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """Motor local espeak-ng, sem acesso à rede, que gera WAV PCM diretamente"""
+
+    name = "espeak"
+    audio_format = "wav"
+
+    def __init__(self, words_per_minute: int = 170, slow_words_per_minute: int = 120):
+        """
+        Inicializa o motor espeak-ng
+
+        Args:
+            words_per_minute (int): Velocidade normal da fala
+            slow_words_per_minute (int): Velocidade da fala lenta
+        """
+        self.words_per_minute = words_per_minute
+        self.slow_words_per_minute = slow_words_per_minute
+        self.executable = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def is_available(self) -> bool:
+        return self.executable is not None
+
+    def synthesize(self, text: str, language: str, slow: bool = False) -> bytes:
+        if not self.is_available():
+            raise RuntimeError("espeak-ng não encontrado. Instale com: sudo apt install espeak-ng")
+
+        speed = self.slow_words_per_minute if slow else self.words_per_minute
+        # O texto vai pela entrada padrão: um texto começando com "-" viraria uma opção
+        result = subprocess.run(
+            [self.executable, "-v", language.lower(), "-s", str(speed), "--stdout", "--stdin"],
+            input=text.encode("utf-8"),
+            capture_output=True,
+            check=True,
+        )
+        return result.stdout
+
+
+# Motores registrados por nome
+BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+}
+
+
+def create_backend(name: str) -> TTSBackend:
+    """
+    Cria um motor de síntese pelo nome
+
+    Args:
+        name (str): Nome do motor ('gtts' ou 'espeak')
+
+    Returns:
+        TTSBackend: Instância do motor
+    """
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Motor de síntese desconhecido: {name} (disponíveis: {', '.join(BACKENDS)})")
@@ -0,0 +1,254 @@
+"""
+Módulo de cache persistente para áudios sintetizados
+
+Os áudios são indexados pelo hash de (texto, idioma, velocidade, motor) e
+mantidos em memória e em disco, com remoção dos menos usados quando o
+limite de tamanho é atingido.
+
+Uso:
+    python tts_cache.py aquecer      # sintetiza as frases fixas do assistente
+    python tts_cache.py estatisticas
+    python tts_cache.py limpar
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# Adiciona o diretório atual ao path para importações
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Diretório padrão do cache em disco
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "voice_assistant" / "tts"
+
+# Extensão dos arquivos de áudio armazenados
+CACHE_SUFFIX = ".audio"
+
+logger = logging.getLogger(__name__)
+
+
+class TTSCache:
+    """Classe para cache de áudio sintetizado em memória e em disco"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_disk_bytes: int = 50 * 1024 * 1024,
+                 max_memory_items: int = 32):
+        """
+        Inicializa o cache
+
+        Args:
+            cache_dir (str): Diretório do cache em disco
+            max_disk_bytes (int): Tamanho máximo ocupado em disco
+            max_memory_items (int): Quantidade máxima de áudios mantidos em memória
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_items = max_memory_items
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._load_disk_index()
+
+    @staticmethod
+    def make_key(text: str, language: str, slow: bool, engine: str) -> str:
+        """
+        Gera a chave do cache para uma síntese
+
+        Args:
+            text (str): Texto sintetizado
+            language (str): Idioma da síntese
+            slow (bool): Se a fala é lenta
+            engine (str): Motor de síntese
+
+        Returns:
+            str: Hash SHA-256 em hexadecimal
+        """
+        payload = json.dumps([text, language, bool(slow), engine], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        """Caminho do arquivo de uma chave"""
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def _load_disk_index(self):
+        """Monta o índice LRU do disco a partir das datas de modificação"""
+        entries = []
+        for path in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Busca um áudio no cache
+
+        Args:
+            key (str): Chave gerada por make_key
+
+        Returns:
+            bytes: Áudio armazenado ou None se não estiver no cache
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            if key in self._disk:
+                path = self._path(key)
+                try:
+                    data = path.read_bytes()
+                    os.utime(path)
+                except OSError:
+                    self._forget_disk_entry(key)
+                else:
+                    self._disk.move_to_end(key)
+                    self._remember(key, data)
+                    self.hits += 1
+                    return data
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, data: bytes):
+        """
+        Armazena um áudio no cache
+
+        A escrita em disco é atômica: o arquivo é gravado com nome temporário
+        e renomeado ao final.
+
+        Args:
+            key (str): Chave gerada por make_key
+            data (bytes): Áudio sintetizado
+        """
+        with self._lock:
+            self._remember(key, data)
+
+            if len(data) > self.max_disk_bytes:
+                return
+
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as temp_file:
+                    temp_file.write(data)
+                os.replace(temp_path, self._path(key))
+            except OSError as e:
+                logger.warning("⚠️ Não foi possível gravar áudio no cache: %s", e)
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                return
+
+            if key in self._disk:
+                self._disk_bytes -= self._disk[key]
+            self._disk[key] = len(data)
+            self._disk.move_to_end(key)
+            self._disk_bytes += len(data)
+            self._evict_disk()
+
+    def _remember(self, key: str, data: bytes):
+        """Guarda o áudio em memória respeitando o limite de itens"""
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _forget_disk_entry(self, key: str):
+        """Remove uma entrada do índice de disco"""
+        self._disk_bytes -= self._disk.pop(key, 0)
+
+    def _evict_disk(self):
+        """Remove do disco os áudios menos usados até caber no limite"""
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            key, _ = next(iter(self._disk.items()))
+            self._forget_disk_entry(key)
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """
+        Retorna as estatísticas de uso do cache
+
+        Returns:
+            dict: Acertos, faltas, taxa de acerto e ocupação
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "acertos": self.hits,
+                "faltas": self.misses,
+                "taxa_acerto": self.hits / total if total else 0.0,
+                "itens_memoria": len(self._memory),
+                "itens_disco": len(self._disk),
+                "bytes_disco": self._disk_bytes,
+            }
+
+    def clear(self):
+        """Remove todos os áudios do cache"""
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk):
+                try:
+                    self._path(key).unlink()
+                except OSError:
+                    pass
+            self._disk.clear()
+            self._disk_bytes = 0
+
+
+def main():
+    """Função principal"""
+    from tracing import configure_logging
+
+    parser = argparse.ArgumentParser(description="Cache de áudio sintetizado")
+    parser.add_argument("comando", choices=["aquecer", "estatisticas", "limpar"])
+    parser.add_argument("--idioma", default="pt-br", help="Idioma das frases aquecidas")
+    parser.add_argument("--motor", default="gtts", help="Motor de síntese (gtts ou espeak)")
+    parser.add_argument("--diretorio", default=None, help="Diretório do cache")
+    args = parser.parse_args()
+    configure_logging()
+
+    cache = TTSCache(cache_dir=args.diretorio)
+
+    if args.comando == "aquecer":
+        from tts_backends import create_backend
+        from voice_synthesizer import CANNED_PHRASES
+
+        backend = create_backend(args.motor)
+        for phrase in CANNED_PHRASES:
+            key = TTSCache.make_key(phrase, args.idioma, False, backend.name)
+            if cache.get(key) is None:
+                cache.put(key, backend.synthesize(phrase, args.idioma))
+                print(f"✅ Sintetizado: {phrase}")
+            else:
+                print(f"✔️ Já em cache: {phrase}")
+
+    elif args.comando == "limpar":
+        cache.clear()
+        print(f"🧹 Cache limpo: {cache.cache_dir}")
+
+    stats = cache.stats()
+    print(f"\n📦 Cache em {cache.cache_dir}: {stats['itens_disco']} áudio(s), "
+          f"{stats['bytes_disco'] / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
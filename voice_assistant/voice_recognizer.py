@@ -2,40 +2,164 @@
 Módulo para reconhecimento de voz usando Whisper via SpeechRecognition
 """
 import speech_recognition as sr
-import whisper
+import numpy as np
+import contextvars
 import io
+import logging
 import wave
 import tempfile
 import os
-from typing import Optional
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+from audio_capture import MicrophoneCapture, frame_energy
+from decoding_presets import transcribe_options
+from tracing import tracer
+from whisper_models import load_whisper_model, select_model
+
+# Taxa de amostragem esperada pelo Whisper
+WHISPER_SAMPLE_RATE = 16000
+
+# Intervalo máximo entre duas escutas para a seguinte continuar de onde a
+# anterior parou (captura contínua), sem perder o áudio falado entre elas
+RESUME_GAP_SECONDS = 2.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TranscriptionHypothesis:
+    """Hipótese de transcrição emitida durante o reconhecimento em streaming"""
+    text: str
+    is_final: bool
+    audio_seconds: float
+    elapsed_seconds: float
+
 
 class VoiceRecognizer:
     """Classe para reconhecimento de voz usando Whisper"""
     
-    def __init__(self, model_name: str = "base"):
+    def __init__(self, model_name: str = "base", in_memory: bool = True, use_microphone: bool = True,
+                 calibrate_on_init: bool = True, quantize: bool = False, device: Optional[str] = None,
+                 target_latency: float = 1.5, decoding: Optional[str] = None,
+                 initial_prompt: Optional[str] = None, persistent_capture: bool = True,
+                 capture_buffer_seconds: float = 30.0, recalibration_interval: Optional[float] = 30.0):
         """
         Inicializa o reconhecedor de voz
         
         Args:
             model_name (str): Nome do modelo Whisper a ser usado (tiny, base, small, medium, large)
+                ou "auto" para escolher pela latência medida nesta máquina
+            in_memory (bool): Se True, envia o áudio direto da memória para o Whisper,
+                sem gravar arquivo WAV temporário
+            use_microphone (bool): Se False, não abre o microfone (útil para transcrever
+                arquivos e benchmarks sem dispositivo de áudio)
+            calibrate_on_init (bool): Se False, adia a calibração do microfone
+                para a primeira escuta
+            quantize (bool): Se True, quantiza o modelo para int8 (apenas na CPU)
+            device (str): Dispositivo do modelo (None usa CUDA quando disponível)
+            target_latency (float): Latência máxima por frase usada com model_name="auto"
+            decoding (str): Preset de decodificação (rapido, equilibrado, preciso,
+                whisper-padrao); None usa o padrão
+            initial_prompt (str): Vocabulário do domínio (substitui o do preset)
+            persistent_capture (bool): Se True, mantém o microfone aberto em uma thread
+                que grava em um buffer circular (sem reabrir o dispositivo a cada frase)
+            capture_buffer_seconds (float): Áudio mantido no buffer circular (segundos)
+            recalibration_interval (float): Intervalo entre recalibrações do limiar de
+                energia na captura contínua (None desativa)
         """
+        self.in_memory = in_memory
+        self._calibrated = False
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.microphone = sr.Microphone() if use_microphone else None
+        
+        # Captura contínua do microfone (iniciada na calibração)
+        self.capture = None
+        self._last_position = None
+        if self.microphone is not None and persistent_capture:
+            self.capture = MicrophoneCapture(self.microphone, self.recognizer,
+                                             buffer_seconds=capture_buffer_seconds,
+                                             recalibration_interval=recalibration_interval)
         
-        # Carrega o modelo Whisper
-        print(f"Carregando modelo Whisper '{model_name}'...")
-        self.whisper_model = whisper.load_model(model_name)
-        print("Modelo Whisper carregado com sucesso!")
+        # Carrega o modelo Whisper (compartilhado com outros reconhecedores do processo)
+        if model_name == "auto":
+            model_name = select_model(target_latency=target_latency, device=device, quantize=quantize,
+                                      decoding=decoding, initial_prompt=initial_prompt)
+        self.model_name = model_name
+        self.whisper_model = load_whisper_model(model_name, device=device, quantize=quantize)
+        
+        # Opções de decodificação (idioma fixo, busca, fallback de temperatura...)
+        overrides = {"initial_prompt": initial_prompt} if initial_prompt is not None else {}
+        self.transcribe_options = transcribe_options(decoding, device=self.whisper_model.device.type, **overrides)
+        logger.info("Modelo Whisper carregado com sucesso!")
         
         # Ajusta o reconhecedor para ruído ambiente
-        self._calibrate_microphone()
+        if self.microphone is not None and calibrate_on_init:
+            self._calibrate_microphone()
     
     def _calibrate_microphone(self):
         """Calibra o microfone para o ruído ambiente"""
-        print("Calibrando microfone para ruído ambiente...")
+        if self.capture is not None:
+            # A captura contínua calibra com o primeiro segundo de áudio e depois periodicamente
+            self.capture.start(wait_calibration=True)
+            self._calibrated = True
+            return
+        
+        logger.info("Calibrando microfone para ruído ambiente...")
         with self.microphone as source:
             self.recognizer.adjust_for_ambient_noise(source, duration=1)
-        print("Calibração concluída!")
+        self._calibrated = True
+        logger.info("Calibração concluída!")
+    
+    def _ensure_calibrated(self):
+        """Calibra o microfone caso a calibração tenha sido adiada"""
+        if not self._calibrated or (self.capture is not None and not self.capture.is_running):
+            self._calibrate_microphone()
+    
+    def close(self):
+        """Encerra a captura contínua do microfone, se ativa"""
+        if self.capture is not None:
+            self.capture.stop()
+            self._calibrated = False
+    
+    @contextmanager
+    def _frame_source(self, pre_roll: float = 0.3):
+        """
+        Fornece os blocos de áudio do microfone para uma escuta
+        
+        Com a captura contínua, os blocos vêm do buffer circular: a leitura
+        continua de onde a escuta anterior parou (se foi há pouco tempo) ou
+        começa `pre_roll` segundos no passado. Sem ela, o microfone é aberto
+        só durante a escuta.
+        
+        Yields:
+            tuple: (função de leitura, taxa de amostragem, bytes por amostra, segundos por bloco)
+        """
+        if self.capture is None:
+            with self.microphone as source:
+                yield (lambda: source.stream.read(source.CHUNK)), source.SAMPLE_RATE, \
+                    source.SAMPLE_WIDTH, source.CHUNK / source.SAMPLE_RATE
+            return
+        
+        capture = self.capture
+        now = capture.buffer.written
+        if self._last_position is not None and \
+                now - self._last_position <= capture.seconds_to_frames(RESUME_GAP_SECONDS):
+            start = self._last_position
+        else:
+            start = now - capture.seconds_to_frames(pre_roll)
+        
+        reader = capture.reader(start)
+        try:
+            yield reader.read, capture.sample_rate, capture.sample_width, capture.seconds_per_frame
+        finally:
+            self._last_position = reader.position
+            if reader.overruns:
+                logger.warning("⚠️ %d bloco(s) de áudio descartados (leitura atrasada)", reader.overruns)
     
     def listen_for_speech(self, timeout: int = 5, phrase_time_limit: int = 10) -> Optional[str]:
         """
@@ -49,62 +173,407 @@ class VoiceRecognizer:
             str: Texto reconhecido ou None se não conseguir reconhecer
         """
         try:
-            print("Escutando... Fale alguma coisa!")
-            
             # Escuta o áudio do microfone
-            with self.microphone as source:
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=timeout, 
-                    phrase_time_limit=phrase_time_limit
-                )
+            audio = self.capture_audio(timeout=timeout, phrase_time_limit=phrase_time_limit)
+            
+            logger.info("Processando áudio...")
             
-            print("Processando áudio...")
+            text = self.transcribe_audio(audio)
+            
+            if text:
+                logger.info("Texto reconhecido: %s", text)
+                return text
+            else:
+                logger.info("Nenhum texto foi reconhecido.")
+                return None
+                    
+        except sr.WaitTimeoutError:
+            logger.info("Tempo limite atingido. Nenhuma fala detectada.")
+            return None
+            
+        except sr.UnknownValueError:
+            logger.info("Não foi possível entender o áudio.")
+            return None
             
-            # Converte o áudio para um formato que o Whisper pode processar
-            audio_data = audio.get_wav_data()
+        except Exception as e:
+            logger.error("Erro durante o reconhecimento de voz: %s", e)
+            return None
+    
+    def capture_audio(self, timeout: int = 5, phrase_time_limit: int = 10,
+                      pre_roll: float = 0.3) -> sr.AudioData:
+        """
+        Captura uma frase do microfone sem transcrever
+        
+        Args:
+            timeout (int): Tempo limite para começar a escutar (segundos)
+            phrase_time_limit (int): Tempo limite para a frase (segundos)
+            pre_roll (float): Áudio mantido antes do início da fala (captura contínua)
             
-            # Salva temporariamente o áudio em um arquivo
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
+        Returns:
+            sr.AudioData: Áudio capturado
             
+        Raises:
+            sr.WaitTimeoutError: Se nenhuma fala começar dentro do tempo limite
+        """
+        self._ensure_calibrated()
+        print("Escutando... Fale alguma coisa!")
+        
+        with tracer.span("captura") as span:
             try:
-                # Usa o Whisper para transcrever o áudio
-                result = self.whisper_model.transcribe(temp_file_path)
-                text = result["text"].strip()
+                if self.capture is not None:
+                    audio = self._capture_phrase(timeout, phrase_time_limit, pre_roll)
+                else:
+                    with self.microphone as source:
+                        audio = self.recognizer.listen(
+                            source,
+                            timeout=timeout,
+                            phrase_time_limit=phrase_time_limit
+                        )
+            except sr.WaitTimeoutError:
+                span.finish("sem_fala")
+                raise
+            span.set(segundos_audio=round(self._audio_seconds(audio), 3))
+            return audio
+    
+    def _capture_phrase(self, timeout: int, phrase_time_limit: int, pre_roll: float) -> sr.AudioData:
+        """Detecta uma frase nos blocos do buffer circular (mesmos critérios do Recognizer.listen)"""
+        with self._frame_source(pre_roll) as (read_frame, sample_rate, sample_width, seconds_per_frame):
+            pre_roll_frames = deque(maxlen=max(1, int(pre_roll / seconds_per_frame)))
+            frames = []
+            pre_rolled = 0
+            waited_seconds = 0.0
+            voiced_seconds = 0.0
+            silence_seconds = 0.0
+            
+            while True:
+                frame = read_frame()
+                if not frame:
+                    break
+                voiced = self._frame_energy(frame) > self.recognizer.energy_threshold
                 
-                if text:
-                    print(f"Texto reconhecido: {text}")
-                    return text
+                if not frames:
+                    # Ainda aguardando o início da fala
+                    if not voiced:
+                        pre_roll_frames.append(frame)
+                        waited_seconds += seconds_per_frame
+                        if timeout and waited_seconds > timeout:
+                            raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                        continue
+                    frames.extend(pre_roll_frames)
+                    pre_rolled = len(frames)
+                
+                frames.append(frame)
+                if voiced:
+                    voiced_seconds += seconds_per_frame
+                    silence_seconds = 0.0
                 else:
-                    print("Nenhum texto foi reconhecido.")
-                    return None
+                    silence_seconds += seconds_per_frame
+                
+                if silence_seconds > self.recognizer.pause_threshold:
+                    if voiced_seconds >= self.recognizer.phrase_threshold:
+                        break
+                    # Ruído curto demais para ser fala: volta a aguardar, e o
+                    # ruído conta como espera (o pre-roll já foi contado)
+                    waited_seconds += (len(frames) - pre_rolled) * seconds_per_frame
+                    if timeout and waited_seconds > timeout:
+                        raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                    pre_roll_frames.extend(frames)
+                    frames = []
+                    voiced_seconds = silence_seconds = 0.0
+                    continue
+                if phrase_time_limit and len(frames) * seconds_per_frame > phrase_time_limit:
+                    break
+        
+        if not frames:
+            raise sr.WaitTimeoutError("microphone capture stopped")
+        return sr.AudioData(b"".join(frames), sample_rate, sample_width)
+    
+    def transcribe_audio(self, audio: sr.AudioData, in_memory: Optional[bool] = None) -> str:
+        """
+        Transcreve um trecho de áudio capturado
+        
+        Args:
+            audio (sr.AudioData): Áudio capturado pelo SpeechRecognition
+            in_memory (bool): Sobrescreve o modo configurado no construtor
+            
+        Returns:
+            str: Texto transcrito (vazio se nada foi reconhecido)
+        """
+        with tracer.span("transcricao", modelo=self.model_name,
+                         segundos_audio=round(self._audio_seconds(audio), 3)):
+            return self._transcribe(audio, in_memory)
+    
+    def _transcribe_partial(self, audio: sr.AudioData) -> str:
+        """Transcreve uma janela parcial do reconhecimento em streaming"""
+        with tracer.span("transcricao.parcial", modelo=self.model_name,
+                         segundos_audio=round(self._audio_seconds(audio), 3)):
+            return self._transcribe(audio)
+    
+    def _transcribe(self, audio: sr.AudioData, in_memory: Optional[bool] = None) -> str:
+        """Transcreve em memória ou, se falhar, por arquivo temporário"""
+        if in_memory is None:
+            in_memory = self.in_memory
+        
+        if in_memory:
+            try:
+                return self._transcribe_in_memory(audio)
+            except Exception as e:
+                logger.warning("⚠️ Falha na transcrição em memória, usando arquivo temporário: %s", e)
+        
+        return self._transcribe_file(audio)
+    
+    @staticmethod
+    def _audio_seconds(audio: sr.AudioData) -> float:
+        """Duração de um áudio capturado (segundos)"""
+        return len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+    
+    @staticmethod
+    def audio_to_array(audio: sr.AudioData) -> np.ndarray:
+        """
+        Converte o áudio capturado em um array float32 mono a 16 kHz
+        
+        A reamostragem é feita no próprio processo pelo SpeechRecognition,
+        dispensando o ffmpeg.
+        
+        Args:
+            audio (sr.AudioData): Áudio capturado pelo SpeechRecognition
+            
+        Returns:
+            np.ndarray: Amostras normalizadas entre -1.0 e 1.0
+        """
+        raw_data = audio.get_raw_data(convert_rate=WHISPER_SAMPLE_RATE, convert_width=2)
+        return np.frombuffer(raw_data, dtype=np.int16).astype(np.float32) / 32768.0
+    
+    def _transcribe_in_memory(self, audio: sr.AudioData) -> str:
+        """Transcreve o áudio passando o array de amostras direto para o Whisper"""
+        samples = self.audio_to_array(audio)
+        result = self.whisper_model.transcribe(samples, **self.transcribe_options)
+        return result["text"].strip()
+    
+    def _transcribe_file(self, audio: sr.AudioData) -> str:
+        """Transcreve o áudio gravando um WAV temporário (caminho alternativo via ffmpeg)"""
+        # Converte o áudio para um formato que o Whisper pode processar
+        audio_data = audio.get_wav_data()
+        
+        # Salva temporariamente o áudio em um arquivo
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
+            temp_file.write(audio_data)
+            temp_file_path = temp_file.name
+        
+        try:
+            # Usa o Whisper para transcrever o áudio
+            result = self.whisper_model.transcribe(temp_file_path, **self.transcribe_options)
+            return result["text"].strip()
+            
+        finally:
+            # Remove o arquivo temporário
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+    
+    def transcribe_files(self, paths, output_path: Optional[str] = None, batch_size: int = 8,
+                         language: Optional[str] = None) -> list:
+        """
+        Transcreve arquivos de áudio gravados em lotes, reutilizando o modelo carregado
+        
+        Args:
+            paths: Arquivos WAV/MP3 ou diretórios
+            output_path (str): Arquivo JSONL de saída (opcional)
+            batch_size (int): Segmentos de 30 s por passada do modelo
+            language (str): Código do idioma; None para detecção automática
+            
+        Returns:
+            list: Registros de transcrição de cada arquivo
+        """
+        from batch_transcriber import BatchTranscriber
+        
+        transcriber = BatchTranscriber(self.whisper_model, batch_size=batch_size, language=language)
+        return transcriber.transcribe_files(paths, output_path=output_path)
+    
+    @staticmethod
+    def _frame_energy(frame: bytes) -> float:
+        """Calcula a energia RMS de um bloco de amostras de 16 bits"""
+        return frame_energy(frame)
+    
+    def stream_speech(self, timeout: int = 5, phrase_time_limit: int = 10,
+                      partial_interval: float = 1.0, window_seconds: float = 10.0,
+                      pre_roll: float = 0.3,
+                      on_speech_start: Optional[Callable[[], None]] = None) -> Iterator[TranscriptionHypothesis]:
+        """
+        Escuta uma frase e emite transcrições parciais enquanto o usuário fala
+        
+        A detecção de voz é feita por energia sobre os blocos lidos do microfone.
+        A cada `partial_interval` segundos de fala, a janela mais recente do áudio
+        (até `window_seconds`) é transcrita em segundo plano, de modo que janelas
+        consecutivas se sobrepõem. Quando o silêncio ultrapassa o `pause_threshold`
+        do reconhecedor, é emitida a hipótese final.
+        
+        Args:
+            timeout (int): Tempo limite para começar a falar (segundos)
+            phrase_time_limit (int): Duração máxima da frase (segundos)
+            partial_interval (float): Intervalo entre transcrições parciais (segundos)
+            window_seconds (float): Tamanho máximo da janela das parciais (segundos)
+            pre_roll (float): Áudio mantido antes do início da fala (segundos)
+            on_speech_start: Função chamada assim que a fala é detectada
+                (ex: interromper a fala do assistente)
+            
+        Yields:
+            TranscriptionHypothesis: Hipóteses parciais e, por último, a final
+        """
+        if self.microphone is None:
+            raise RuntimeError("Reconhecedor criado sem microfone (use_microphone=False)")
+        
+        self._ensure_calibrated()
+        executor = ThreadPoolExecutor(max_workers=1)
+        start_time = time.perf_counter()
+        # Span aberto manualmente: um gerador não pode manter o contexto de um span entre yields
+        capture_span = tracer.start_span("captura", streaming=True)
+        
+        try:
+            with self._frame_source(pre_roll) as (read_frame, sample_rate, sample_width, seconds_per_frame):
+                pre_roll_frames = deque(maxlen=max(1, int(pre_roll / seconds_per_frame)))
+                frames = []
+                last_voiced_index = -1
+                silence_seconds = 0.0
+                waited_seconds = 0.0
+                pending = None
+                pending_end = 0
+                last_partial_text = ""
+                last_partial_end = 0
+                next_partial_at = partial_interval
+                
+                print("Escutando (streaming)... Fale alguma coisa!")
+                
+                while True:
+                    frame = read_frame()
+                    if not frame:
+                        break
+                    voiced = self._frame_energy(frame) > self.recognizer.energy_threshold
                     
-            finally:
-                # Remove o arquivo temporário
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
+                    if not frames:
+                        # Ainda aguardando o início da fala
+                        if not voiced:
+                            pre_roll_frames.append(frame)
+                            waited_seconds += seconds_per_frame
+                            if timeout and waited_seconds > timeout:
+                                logger.info("Tempo limite atingido. Nenhuma fala detectada.")
+                                capture_span.finish("sem_fala")
+                                return
+                            continue
+                        frames.extend(pre_roll_frames)
+                        if on_speech_start:
+                            on_speech_start()
                     
-        except sr.WaitTimeoutError:
-            print("Tempo limite atingido. Nenhuma fala detectada.")
-            return None
+                    frames.append(frame)
+                    if voiced:
+                        last_voiced_index = len(frames) - 1
+                        silence_seconds = 0.0
+                    else:
+                        silence_seconds += seconds_per_frame
+                    
+                    # Emite a parcial concluída, se houver
+                    if pending is not None and pending.done():
+                        last_partial_text = pending.result()
+                        last_partial_end = pending_end
+                        pending = None
+                        if last_partial_text:
+                            yield TranscriptionHypothesis(
+                                text=last_partial_text,
+                                is_final=False,
+                                audio_seconds=last_partial_end * seconds_per_frame,
+                                elapsed_seconds=time.perf_counter() - start_time,
+                            )
+                    
+                    speech_seconds = len(frames) * seconds_per_frame
+                    if silence_seconds > self.recognizer.pause_threshold:
+                        break
+                    if phrase_time_limit and speech_seconds > phrase_time_limit:
+                        break
+                    
+                    # Agenda uma nova parcial sobre a janela mais recente
+                    if pending is None and speech_seconds >= next_partial_at:
+                        window_frames = int(window_seconds / seconds_per_frame)
+                        window = b"".join(frames[-window_frames:])
+                        pending_end = len(frames)
+                        pending = executor.submit(
+                            contextvars.copy_context().run, self._transcribe_partial,
+                            sr.AudioData(window, sample_rate, sample_width)
+                        )
+                        next_partial_at = speech_seconds + partial_interval
             
-        except sr.UnknownValueError:
-            print("Não foi possível entender o áudio.")
+            if not frames:
+                return
+            
+            capture_span.finish(segundos_audio=round(len(frames) * seconds_per_frame, 3))
+            logger.info("Processando áudio...")
+            if pending is not None:
+                last_partial_text = pending.result()
+                last_partial_end = pending_end
+            
+            # Reaproveita a última parcial se ela já cobria toda a fala
+            # e a frase inteira coube na janela
+            covered = last_partial_end > last_voiced_index
+            fits_window = len(frames) * seconds_per_frame <= window_seconds
+            if last_partial_text and covered and fits_window:
+                text = last_partial_text
+            else:
+                text = self.transcribe_audio(sr.AudioData(b"".join(frames), sample_rate, sample_width))
+            
+            yield TranscriptionHypothesis(
+                text=text,
+                is_final=True,
+                audio_seconds=len(frames) * seconds_per_frame,
+                elapsed_seconds=time.perf_counter() - start_time,
+            )
+            
+        finally:
+            capture_span.finish()
+            executor.shutdown(wait=True)
+    
+    def listen_streaming(self, partial_callback: Optional[Callable[[TranscriptionHypothesis], None]] = None,
+                         timeout: int = 5, phrase_time_limit: int = 10,
+                         on_speech_start: Optional[Callable[[], None]] = None) -> Optional[str]:
+        """
+        Escuta uma frase em modo streaming e retorna a transcrição final
+        
+        Args:
+            partial_callback: Função chamada com cada hipótese parcial
+            on_speech_start: Função chamada assim que a fala é detectada
+            timeout (int): Tempo limite para começar a falar (segundos)
+            phrase_time_limit (int): Duração máxima da frase (segundos)
+            
+        Returns:
+            str: Texto reconhecido ou None se não conseguir reconhecer
+        """
+        try:
+            for hypothesis in self.stream_speech(timeout=timeout, phrase_time_limit=phrase_time_limit,
+                                                 on_speech_start=on_speech_start):
+                if not hypothesis.is_final:
+                    if partial_callback:
+                        partial_callback(hypothesis)
+                    continue
+                
+                if hypothesis.text:
+                    logger.info("Texto reconhecido: %s", hypothesis.text)
+                    return hypothesis.text
+                
+                logger.info("Nenhum texto foi reconhecido.")
             return None
             
         except Exception as e:
-            print(f"Erro durante o reconhecimento de voz: {e}")
+            logger.error("Erro durante o reconhecimento de voz: %s", e)
             return None
     
-    def continuous_listen(self, callback_function, stop_phrases=None):
+    def continuous_listen(self, callback_function, stop_phrases=None, streaming: bool = False,
+                          partial_callback=None, on_speech_start=None):
         """
         Escuta continuamente e chama uma função callback quando detecta fala
         
         Args:
             callback_function: Função a ser chamada com o texto reconhecido
             stop_phrases: Lista de frases que param a escuta contínua
+            streaming (bool): Se True, usa o reconhecimento em streaming com parciais
+            partial_callback: Função chamada com as hipóteses parciais (modo streaming)
+            on_speech_start: Função chamada quando o usuário começa a falar (modo streaming)
         """
         if stop_phrases is None:
             stop_phrases = ["parar", "sair", "tchau"]
@@ -112,13 +581,19 @@ class VoiceRecognizer:
         print("Iniciando escuta contínua... Diga 'parar', 'sair' ou 'tchau' para encerrar.")
         
         while True:
-            text = self.listen_for_speech()
-            
-            if text:
-                # Verifica se é uma frase de parada
-                if any(phrase.lower() in text.lower() for phrase in stop_phrases):
-                    print("Encerrando escuta contínua...")
-                    break
+            # Cada frase (captura, transcrição e resposta) é uma interação
+            with tracer.interaction():
+                if streaming:
+                    text = self.listen_streaming(partial_callback=partial_callback,
+                                                 on_speech_start=on_speech_start)
+                else:
+                    text = self.listen_for_speech()
                 
-                # Chama a função callback com o texto reconhecido
-                callback_function(text)
+                if text:
+                    # Verifica se é uma frase de parada
+                    if any(phrase.lower() in text.lower() for phrase in stop_phrases):
+                        logger.info("Encerrando escuta contínua...")
+                        break
+                    
+                    # Chama a função callback com o texto reconhecido
+                    callback_function(text)
@@ -1,144 +1,342 @@
 """
-Módulo para síntese de voz usando gTTS e reprodução com pygame
+Módulo para síntese de voz (gTTS ou motor local) e reprodução com pygame
 """
-from gtts import gTTS
-import pygame
-import tempfile
-import os
+import contextvars
+import logging
 import time
-import shutil
-from io import BytesIO
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence
+
+from audio_player import AudioPlayer
+from playback_queue import PlaybackQueue, PlaybackTicket
+from resilience import CLOSED, HALF_OPEN, CircuitBreaker, CircuitOpenError, Deadline, RetryPolicy
+from tracing import metrics, tracer
+from tts_backends import SynthesizedAudio, TTSBackend, create_backend
+from tts_cache import TTSCache
+
+# Frases fixas do assistente
+WELCOME_TEXT = "Olá! Eu sou seu assistente de voz. Como posso ajudá-lo hoje?"
+GOODBYE_TEXT = "Até logo! Foi um prazer ajudá-lo."
+ERROR_TEXT = "Desculpe, não consegui entender. Pode repetir, por favor?"
+INTERNAL_ERROR_TEXT = "Desculpe, ocorreu um erro interno."
+NO_RESPONSE_TEXT = "Desculpe, não consegui gerar uma resposta adequada."
+TEXT_ONLY_TEXT = "Resposta processada. Verifique o texto no console."
+
+logger = logging.getLogger(__name__)
+
+_cache_lookups = metrics.counter("voice_assistant_tts_cache_total", "Consultas ao cache de áudio",
+                                 ("resultado",))
+
+# Valor exportado para cada estado do disjuntor
+_BREAKER_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1}
+
+# Frases sintetizadas antecipadamente pelo aquecimento do cache
+CANNED_PHRASES = [
+    WELCOME_TEXT,
+    GOODBYE_TEXT,
+    ERROR_TEXT,
+    INTERNAL_ERROR_TEXT,
+    NO_RESPONSE_TEXT,
+    TEXT_ONLY_TEXT,
+]
+
 
 class VoiceSynthesizer:
     """Classe para síntese e reprodução de voz"""
     
-    def __init__(self, language: str = 'pt-br', volume: float = 0.8):
+    def __init__(self, language: str = 'pt-br', volume: float = 0.8, use_cache: bool = True,
+                 cache: Optional[TTSCache] = None, backend: str = "gtts",
+                 fallback_backends: Sequence[str] = ("espeak",),
+                 retry_policy: Optional[RetryPolicy] = None, failure_threshold: int = 3,
+                 recovery_timeout: float = 30.0, player: Optional[AudioPlayer] = None):
         """
         Inicializa o sintetizador de voz
         
         Args:
             language (str): Código do idioma para síntese (ex: 'pt-br', 'en')
             volume (float): Volume da reprodução (0.0 a 1.0)
+            use_cache (bool): Se True, reaproveita áudios já sintetizados
+            cache (TTSCache): Cache a ser usado (padrão: cache em ~/.cache)
+            backend (str): Motor de síntese principal ('gtts' ou 'espeak')
+            fallback_backends: Motores tentados, em ordem, quando o principal falha
+            retry_policy (RetryPolicy): Novas tentativas dos motores remotos
+                (padrão: 2 tentativas de até 5 s cada)
+            failure_threshold (int): Falhas seguidas que suspendem um motor remoto
+            recovery_timeout (float): Tempo de suspensão antes de testar o motor de novo
+            player (AudioPlayer): Saída de áudio (padrão: mixer do pygame; NullAudioPlayer
+                descarta o áudio, para benchmarks sem alto-falante)
         """
         self.language = language
         self.volume = volume
+        self.backends = self._create_backends([backend, *fallback_backends])
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=2, attempt_timeout=5.0)
+        self.breakers = {
+            b.name: CircuitBreaker(b.name, failure_threshold, recovery_timeout)
+            for b in self.backends if b.remote
+        }
+        self._register_breaker_metrics()
+        self.cache = cache if cache is not None else (TTSCache() if use_cache else None)
         
-        # Inicializa o pygame mixer para reprodução de áudio
-        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-        pygame.mixer.music.set_volume(self.volume)
+        # Instante (time.perf_counter) em que a última reprodução começou
+        self.last_playback_started_at = None
         
-        # Cria diretório temporário para arquivos de áudio
-        self.temp_dir = tempfile.mkdtemp(prefix="voice_assistant_")
+        # Inicializa o player que reproduz o áudio direto da memória
+        self.player = player or AudioPlayer(frequency=22050, channels=2, buffer=512, volume=self.volume)
         
-        print(f"Sintetizador de voz inicializado (idioma: {language}, volume: {volume})")
-    
-    def _safe_remove_file(self, file_path: str, max_attempts: int = 5):
-        """
-        Remove arquivo temporário de forma segura com múltiplas tentativas
+        # Fila de reprodução e thread de síntese para a fala assíncrona
+        self.playback = PlaybackQueue(self.player)
+        self._synthesis_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        self._last_ticket: Optional[PlaybackTicket] = None
         
-        Args:
-            file_path (str): Caminho do arquivo a ser removido
-            max_attempts (int): Número máximo de tentativas
-        """
-        for attempt in range(max_attempts):
-            try:
-                if os.path.exists(file_path):
-                    os.unlink(file_path)
-                    return True
-            except (PermissionError, OSError) as e:
-                if attempt < max_attempts - 1:
-                    # Aguarda um pouco antes da próxima tentativa
-                    time.sleep(0.1 * (attempt + 1))
-                else:
-                    print(f"⚠️ Não foi possível remover arquivo temporário após {max_attempts} tentativas: {e}")
-        return False
+        engines = " -> ".join(b.name for b in self.backends)
+        logger.info("Sintetizador de voz inicializado (idioma: %s, volume: %s, motores: %s)", language, volume, engines)
     
-    def _get_unique_temp_file(self) -> str:
+    @staticmethod
+    def _create_backends(names: Sequence[str]) -> list:
         """
-        Gera um caminho único para arquivo temporário
+        Cria a cadeia de motores de síntese, ignorando os indisponíveis
         
+        Args:
+            names: Nomes dos motores em ordem de preferência
+            
         Returns:
-            str: Caminho para arquivo temporário único
+            list: Motores disponíveis
         """
-        import uuid
-        filename = f"tts_{uuid.uuid4().hex[:8]}.mp3"
-        return os.path.join(self.temp_dir, filename)
+        backends = []
+        for name in dict.fromkeys(names):
+            backend = create_backend(name)
+            if backend.is_available():
+                backends.append(backend)
+            else:
+                logger.warning("⚠️ Motor de síntese '%s' indisponível nesta máquina", name)
+        
+        if not backends:
+            raise RuntimeError("Nenhum motor de síntese de voz disponível")
+        return backends
     
-    def text_to_speech(self, text: str, slow: bool = False) -> bool:
+    def text_to_speech(self, text: str, slow: bool = False, deadline: Optional[Deadline] = None) -> bool:
         """
         Converte texto em fala e reproduz o áudio
         
         Args:
             text (str): Texto a ser convertido em fala
             slow (bool): Se True, fala mais devagar
+            deadline (Deadline): Prazo para a síntese (ver synthesize)
             
         Returns:
             bool: True se bem-sucedido, False caso contrário
         """
         try:
-            print(f"Convertendo texto em fala: {text}")
-            
-            # Cria o objeto gTTS
-            tts = gTTS(text=text, lang=self.language, slow=slow)
-            
-            # Gera um arquivo temporário único
-            temp_file_path = self._get_unique_temp_file()
+            logger.info("Convertendo texto em fala: %s", text)
             
-            # Salva o áudio no arquivo temporário
-            tts.save(temp_file_path)
-            
-            # Reproduz o áudio
-            self._play_audio(temp_file_path)
-            
-            # Remove o arquivo temporário de forma segura
-            self._safe_remove_file(temp_file_path)
+            # Sintetiza (ou recupera do cache) o áudio e reproduz da memória
+            audio = self.synthesize(text, slow, deadline)
+            self._play_audio(audio)
             
             return True
             
         except Exception as e:
-            print(f"Erro na síntese de voz: {e}")
+            logger.error("Erro na síntese de voz: %s", e)
             return False
     
-    def _play_audio(self, audio_file_path: str):
+    def synthesize(self, text: str, slow: bool = False,
+                   deadline: Optional[Deadline] = None) -> SynthesizedAudio:
         """
-        Reproduz um arquivo de áudio usando pygame
+        Sintetiza um texto sem reproduzir, usando o cache quando disponível
+        
+        Os motores são tentados em ordem de preferência; se o principal
+        falhar (ex: sem internet), o próximo motor da cadeia é usado. Os
+        motores remotos só repetem erros transitórios, dentro do prazo, e
+        ficam suspensos (disjuntor aberto) após falhas seguidas: enquanto
+        isso, a síntese vai direto para o áudio em cache ou o motor local.
+        Motores locais são sempre tentados, mesmo com o prazo esgotado.
         
         Args:
-            audio_file_path (str): Caminho para o arquivo de áudio
-        """
-        try:
-            print("Reproduzindo áudio...")
-            
-            # Carrega e reproduz o áudio
-            pygame.mixer.music.load(audio_file_path)
-            pygame.mixer.music.play()
+            text (str): Texto a ser sintetizado
+            slow (bool): Se True, fala mais devagar
+            deadline (Deadline): Prazo para os motores remotos (None: sem prazo)
             
-            # Aguarda a reprodução terminar
-            while pygame.mixer.music.get_busy():
-                pygame.time.wait(100)
+        Returns:
+            SynthesizedAudio: Áudio sintetizado e seu formato
+        """
+        last_error = None
+        
+        with tracer.span("tts", caracteres=len(text)) as span:
+            for backend in self.backends:
+                try:
+                    audio = self._synthesize_with(backend, text, slow, deadline)
+                    span.set(motor=audio.engine)
+                    return audio
+                except CircuitOpenError as e:
+                    last_error = e
+                except Exception as e:
+                    logger.warning("⚠️ Falha no motor de síntese '%s': %s", backend.name, e)
+                    last_error = e
             
-            # Aguarda um pouco mais para garantir que o arquivo seja liberado
-            pygame.time.wait(200)
+            raise RuntimeError(f"Todos os motores de síntese falharam: {last_error}")
+    
+    def _synthesize_with(self, backend: TTSBackend, text: str, slow: bool,
+                         deadline: Optional[Deadline] = None) -> SynthesizedAudio:
+        """Sintetiza com um motor específico, consultando o cache antes"""
+        key = TTSCache.make_key(text, self.language, slow, backend.name)
+        
+        if self.cache is not None:
+            audio_data = self.cache.get(key)
+            if audio_data is not None:
+                logger.info("♻️ Áudio recuperado do cache")
+                _cache_lookups.inc(resultado="acerto")
+                return SynthesizedAudio(audio_data, backend.audio_format, backend.name)
+            _cache_lookups.inc(resultado="falta")
+        
+        # Tempo do motor (rede, no gTTS), com as novas tentativas
+        language = self.language
+        with tracer.span(f"tts.{backend.name}"):
+            if backend.remote:
+                audio_data = self.retry_policy.call(lambda: backend.synthesize(text, language, slow),
+                                                    deadline, self.breakers[backend.name])
+            else:
+                audio_data = backend.synthesize(text, language, slow)
+        if self.cache is not None:
+            self.cache.put(key, audio_data)
+        return SynthesizedAudio(audio_data, backend.audio_format, backend.name)
+    
+    def resilience_stats(self) -> list:
+        """
+        Métricas dos disjuntores dos motores remotos
+        
+        Returns:
+            list: Um dicionário por motor (estado, falhas, chamadas rejeitadas...)
+        """
+        return [breaker.stats() for breaker in self.breakers.values()]
+    
+    def _register_breaker_metrics(self):
+        """Exporta o estado dos disjuntores como métricas Prometheus"""
+        def series(field, convert=float):
+            return lambda: [({"servico": stats["servico"]}, convert(stats[field]))
+                            for stats in self.resilience_stats()]
+        
+        metrics.callback("voice_assistant_disjuntor_estado",
+                         "Estado do disjuntor (0 fechado, 1 meio-aberto, 2 aberto)",
+                         series("estado", lambda state: _BREAKER_STATE_VALUES.get(state, 2)))
+        metrics.callback("voice_assistant_disjuntor_falhas_total", "Falhas transitórias registradas",
+                         series("falhas"), kind="counter")
+        metrics.callback("voice_assistant_disjuntor_rejeitadas_total", "Chamadas evitadas com o disjuntor aberto",
+                         series("rejeitadas"), kind="counter")
+        metrics.callback("voice_assistant_disjuntor_aberturas_total", "Vezes que o disjuntor abriu",
+                         series("aberturas"), kind="counter")
+    
+    def prewarm_cache(self, phrases: Optional[list] = None) -> int:
+        """
+        Sintetiza antecipadamente frases fixas para que toquem sem latência
+        
+        Args:
+            phrases (list): Frases a sintetizar (padrão: frases fixas do assistente)
             
-            # Para e descarrega o mixer para liberar o arquivo
-            pygame.mixer.music.stop()
-            pygame.mixer.music.unload()
+        Returns:
+            int: Quantidade de frases sintetizadas com sucesso
+        """
+        count = 0
+        for phrase in phrases or CANNED_PHRASES:
+            try:
+                self.synthesize(phrase)
+                count += 1
+            except Exception as e:
+                logger.warning("⚠️ Não foi possível pré-sintetizar '%s': %s", phrase, e)
+        return count
+    
+    def _play_audio(self, audio: SynthesizedAudio):
+        """
+        Reproduz um áudio sintetizado a partir da memória e aguarda o fim
+        
+        O áudio passa pela fila de reprodução, então nunca se sobrepõe a
+        falas assíncronas já enfileiradas.
+        
+        Args:
+            audio (SynthesizedAudio): Áudio produzido por um motor de síntese
+        """
+        logger.info("Reproduzindo áudio...")
+        
+        with tracer.span("reproducao", motor=audio.engine) as span:
+            # Decodifica uma única vez para PCM e toca direto do buffer
+            queued_at = time.perf_counter()
+            ticket = self.playback.enqueue(self.player.decode(audio))
+            self._last_ticket = ticket
             
-            print("Reprodução concluída!")
+            # Aguarda o sinal de término da reprodução
+            ticket.wait()
+            self.last_playback_started_at = ticket.started_at
+            if ticket.started_at is not None:
+                span.set(espera_ms=round((ticket.started_at - queued_at) * 1000, 1))
+            span.set(interrompida=ticket.cancelled)
+        
+        if ticket.error is not None:
+            raise ticket.error
+        if ticket.cancelled:
+            logger.info("Reprodução interrompida.")
+        else:
+            logger.info("Reprodução concluída!")
+    
+    def speak_async(self, text: str, slow: bool = False) -> PlaybackTicket:
+        """
+        Sintetiza e enfileira uma fala, retornando imediatamente
+        
+        As falas são sintetizadas em ordem por uma thread dedicada e tocadas
+        uma após a outra, de modo que a síntese da próxima frase acontece
+        enquanto a anterior ainda está tocando.
+        
+        Args:
+            text (str): Texto a ser falado
+            slow (bool): Se True, fala mais devagar
             
+        Returns:
+            PlaybackTicket: Ticket para acompanhar (ou aguardar) a fala
+        """
+        ticket = PlaybackTicket(label=text)
+        epoch = self.playback.epoch
+        self._last_ticket = ticket
+        # Leva a interação atual para a thread de síntese
+        self._synthesis_executor.submit(contextvars.copy_context().run, self._synthesize_and_enqueue,
+                                        text, slow, ticket, epoch)
+        return ticket
+    
+    def _synthesize_and_enqueue(self, text: str, slow: bool, ticket: PlaybackTicket, epoch: int):
+        """Sintetiza uma fala assíncrona e a coloca na fila de reprodução"""
+        if epoch != self.playback.epoch:
+            ticket.finish(cancelled=True)
+            return
+        try:
+            sound = self.player.decode(self.synthesize(text, slow))
         except Exception as e:
-            print(f"Erro ao reproduzir áudio: {e}")
-            # Tenta parar o mixer em caso de erro
-            try:
-                pygame.mixer.music.stop()
-                pygame.mixer.music.unload()
-            except:
-                pass
+            logger.error("Erro na síntese de voz: %s", e)
+            ticket.finish(error=e)
+            return
+        self.playback.enqueue(sound, ticket=ticket, epoch=epoch)
+    
+    def stop_speaking(self):
+        """Interrompe a fala atual e descarta as falas pendentes (barge-in)"""
+        self.playback.stop()
+    
+    def wait_until_done(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda o fim de todas as falas enfileiradas
+        
+        Args:
+            timeout (float): Tempo máximo de espera (segundos)
+            
+        Returns:
+            bool: True se a última fala foi tocada até o fim
+        """
+        ticket = self._last_ticket
+        if ticket is None:
+            return True
+        return ticket.wait(timeout)
     
     def text_to_speech_stream(self, text: str, slow: bool = False) -> bool:
         """
-        Converte texto em fala usando stream em memória (mais rápido)
+        Converte texto em fala usando stream em memória
+        
+        Mantido por compatibilidade: a reprodução agora é sempre feita a
+        partir da memória, então equivale a text_to_speech.
         
         Args:
             text (str): Texto a ser convertido em fala
@@ -148,49 +346,28 @@ class VoiceSynthesizer:
             bool: True se bem-sucedido, False caso contrário
         """
         try:
-            print(f"Convertendo texto em fala (stream): {text}")
-            
-            # Cria o objeto gTTS
-            tts = gTTS(text=text, lang=self.language, slow=slow)
-            
-            # Cria um buffer em memória
-            audio_buffer = BytesIO()
-            tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)
-            
-            # Gera um arquivo temporário único
-            temp_file_path = self._get_unique_temp_file()
-            
-            # Salva o buffer no arquivo temporário
-            with open(temp_file_path, 'wb') as f:
-                f.write(audio_buffer.getvalue())
+            logger.info("Convertendo texto em fala (stream): %s", text)
             
-            # Reproduz o áudio
-            self._play_audio(temp_file_path)
-            
-            # Remove o arquivo temporário de forma segura
-            self._safe_remove_file(temp_file_path)
+            audio = self.synthesize(text, slow)
+            self._play_audio(audio)
             
             return True
             
         except Exception as e:
-            print(f"Erro na síntese de voz (stream): {e}")
+            logger.error("Erro na síntese de voz (stream): %s", e)
             return False
     
     def say_welcome(self):
         """Reproduz uma mensagem de boas-vindas"""
-        welcome_text = "Olá! Eu sou seu assistente de voz. Como posso ajudá-lo hoje?"
-        return self.text_to_speech(welcome_text)
+        return self.text_to_speech(WELCOME_TEXT)
     
     def say_goodbye(self):
         """Reproduz uma mensagem de despedida"""
-        goodbye_text = "Até logo! Foi um prazer ajudá-lo."
-        return self.text_to_speech(goodbye_text)
+        return self.text_to_speech(GOODBYE_TEXT)
     
     def say_error(self):
         """Reproduz uma mensagem de erro"""
-        error_text = "Desculpe, não consegui entender. Pode repetir, por favor?"
-        return self.text_to_speech(error_text)
+        return self.text_to_speech(ERROR_TEXT)
     
     def set_language(self, language: str):
         """
@@ -200,7 +377,7 @@ class VoiceSynthesizer:
             language (str): Novo código do idioma
         """
         self.language = language
-        print(f"Idioma alterado para: {language}")
+        logger.info("Idioma alterado para: %s", language)
     
     def set_volume(self, volume: float):
         """
@@ -210,8 +387,8 @@ class VoiceSynthesizer:
             volume (float): Volume (0.0 a 1.0)
         """
         self.volume = max(0.0, min(1.0, volume))  # Garante que está entre 0 e 1
-        pygame.mixer.music.set_volume(self.volume)
-        print(f"Volume alterado para: {self.volume}")
+        self.player.set_volume(self.volume)
+        logger.info("Volume alterado para: %s", self.volume)
     
     def speak_with_options(self, text: str, slow: bool = False, lang: str = None, volume: float = None) -> bool:
         """
@@ -249,23 +426,13 @@ class VoiceSynthesizer:
                 self.set_volume(original_volume)
     
     def cleanup(self):
-        """Limpa os recursos do pygame e arquivos temporários"""
+        """Limpa os recursos do pygame"""
         try:
-            # Para qualquer reprodução em andamento
-            pygame.mixer.music.stop()
-            pygame.mixer.music.unload()
-            pygame.mixer.quit()
-            
-            # Remove diretório temporário e seus arquivos
-            import shutil
-            if hasattr(self, 'temp_dir') and os.path.exists(self.temp_dir):
-                try:
-                    shutil.rmtree(self.temp_dir)
-                    print(f"Diretório temporário removido: {self.temp_dir}")
-                except Exception as e:
-                    print(f"⚠️ Erro ao remover diretório temporário: {e}")
-            
-            print("Recursos de áudio liberados.")
+            # Para qualquer reprodução em andamento e libera o mixer
+            self.playback.close()
+            self._synthesis_executor.shutdown(wait=False)
+            self.player.quit()
+            logger.info("Recursos de áudio liberados.")
             
         except Exception as e:
-            print(f"⚠️ Erro durante cleanup: {e}")
+            logger.warning("⚠️ Erro durante cleanup: %s", e)
@@ -0,0 +1,311 @@
+"""
+Módulo com o gerenciamento dos modelos Whisper carregados no processo
+
+Os modelos ficam em um cache único do processo: vários reconhecedores (ou
+um reconhecedor recriado) reaproveitam o mesmo modelo já carregado, em vez
+de ler os pesos do disco de novo. Na CPU, o modelo pode ser quantizado para
+int8 com a quantização dinâmica do torch (camadas lineares), o que reduz a
+memória e acelera a transcrição.
+
+A seleção automática mede o fator de tempo real (tempo de processamento /
+duração do áudio) dos modelos tiny, base e small nesta máquina e escolhe o
+maior deles que transcreve uma frase típica dentro da latência desejada.
+
+Uso:
+    python whisper_models.py medir --audio exemplo.wav --int8
+    python whisper_models.py selecionar --latencia 1.5 --int8
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Adiciona o diretório atual ao path para importações
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from decoding_presets import DEFAULT_PRESET, transcribe_options
+
+# Modelos avaliados na seleção automática, do menor para o maior
+AUTO_CANDIDATES = ("tiny", "base", "small")
+
+# Arquivo com os fatores de tempo real já medidos nesta máquina
+DEFAULT_MEASUREMENTS_PATH = Path.home() / ".cache" / "voice_assistant" / "whisper_rtf.json"
+
+# Taxa de amostragem esperada pelo Whisper
+WHISPER_SAMPLE_RATE = 16000
+
+logger = logging.getLogger(__name__)
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def _resolve_device(device: Optional[str]) -> str:
+    """Dispositivo efetivo do modelo (CUDA quando disponível, se não informado)"""
+    if device:
+        return device
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _quantize_int8(model):
+    """
+    Quantiza as camadas lineares do modelo para int8 (quantização dinâmica)
+
+    O Whisper usa uma subclasse própria de nn.Linear, que a quantização do
+    torch não reconhece; na CPU ela só converte o tipo dos pesos, então as
+    camadas são tratadas como nn.Linear comuns antes da conversão.
+    """
+    import torch
+
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_whisper_model(name: str = "base", device: Optional[str] = None, quantize: bool = False):
+    """
+    Retorna um modelo Whisper, carregando-o apenas na primeira vez no processo
+
+    Args:
+        name (str): Nome do modelo (tiny, base, small, medium, large)
+        device (str): Dispositivo (cpu, cuda); None usa CUDA quando disponível
+        quantize (bool): Se True, quantiza o modelo para int8 (apenas na CPU)
+
+    Returns:
+        whisper.Whisper: Modelo carregado (compartilhado entre os chamadores)
+    """
+    device = _resolve_device(device)
+    if quantize and device != "cpu":
+        logger.warning("⚠️ Quantização int8 disponível apenas na CPU; usando '%s' sem quantização em %s", name, device)
+        quantize = False
+
+    key = (name, device, quantize)
+    with _models_lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+
+        import whisper
+
+        label = f"'{name}'" + (" (int8)" if quantize else "")
+        logger.info("Carregando modelo Whisper %s em %s...", label, device)
+        start = time.perf_counter()
+        model = whisper.load_model(name, device=device)
+        if quantize:
+            try:
+                model = _quantize_int8(model)
+            except Exception as e:
+                # Sem suporte a quantização nesta build do torch: mantém o modelo em float32
+                logger.warning("⚠️ Falha na quantização int8, usando o modelo original: %s", e)
+                key = (name, device, False)
+        model = _models.setdefault(key, model)
+        logger.info("Modelo Whisper carregado em %.1f s", time.perf_counter() - start)
+        return model
+
+
+def unload_whisper_model(name: Optional[str] = None):
+    """
+    Remove modelos do cache do processo
+
+    Args:
+        name (str): Nome do modelo a remover (None remove todos)
+    """
+    with _models_lock:
+        for key in [key for key in _models if name is None or key[0] == name]:
+            del _models[key]
+
+
+def loaded_models() -> list:
+    """Modelos atualmente no cache, como (nome, dispositivo, quantizado)"""
+    with _models_lock:
+        return list(_models)
+
+
+def _sample_audio(seconds: float) -> np.ndarray:
+    """Áudio sintético (ruído fraco) usado quando nenhuma gravação é informada"""
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * WHISPER_SAMPLE_RATE)) * 0.01).astype(np.float32)
+
+
+def measure_rtf(model, audio: np.ndarray, repetitions: int = 2, options: Optional[dict] = None) -> float:
+    """
+    Mede o fator de tempo real de um modelo
+
+    Args:
+        model: Modelo Whisper carregado
+        audio (np.ndarray): Amostras float32 a 16 kHz
+        repetitions (int): Medições após o aquecimento (usa a menor)
+        options (dict): Argumentos de model.transcribe (None usa o preset padrão)
+
+    Returns:
+        float: Tempo de transcrição dividido pela duração do áudio
+    """
+    if options is None:
+        options = transcribe_options(device=model.device.type)
+    model.transcribe(audio, **options)  # Aquecimento
+
+    best = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        model.transcribe(audio, **options)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / (len(audio) / WHISPER_SAMPLE_RATE)
+
+
+def _measurement_key(name: str, device: str, quantize: bool, preset: str, options: dict) -> str:
+    """
+    Chave de uma medição no arquivo
+
+    Inclui o preset de decodificação e um resumo das opções de transcrição
+    (a busca em feixe e o fallback mudam a velocidade) e o número de CPUs.
+    """
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:8]
+    return f"{name}|{device}|{'int8' if quantize else 'float'}|{preset}-{digest}|{os.cpu_count()}cpu"
+
+
+def _load_measurements(path: Path) -> dict:
+    """Lê as medições gravadas (dicionário vazio se o arquivo não existir ou for inválido)"""
+    try:
+        with open(path, "r", encoding="utf-8") as measurements_file:
+            return json.load(measurements_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_measurements(path: Path, measurements: dict):
+    """Grava as medições de forma atômica"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as measurements_file:
+        json.dump(measurements, measurements_file, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def select_model(target_latency: float = 1.5, utterance_seconds: float = 5.0,
+                 candidates: Tuple[str, ...] = AUTO_CANDIDATES, device: Optional[str] = None,
+                 quantize: bool = False, audio: Optional[np.ndarray] = None,
+                 measurements_path: Optional[str] = DEFAULT_MEASUREMENTS_PATH,
+                 remeasure: bool = False, decoding: Optional[str] = None,
+                 initial_prompt: Optional[str] = None) -> str:
+    """
+    Escolhe o maior modelo que transcreve uma frase típica dentro da latência desejada
+
+    Os candidatos são medidos do menor para o maior; a medição para no
+    primeiro que estoura a latência, já que os seguintes são mais lentos.
+    As medições ficam gravadas em `measurements_path` e são reaproveitadas
+    nas próximas execuções, separadas por preset de decodificação.
+
+    Args:
+        target_latency (float): Latência máxima da transcrição de uma frase (segundos)
+        utterance_seconds (float): Duração de uma frase típica (segundos)
+        candidates: Modelos avaliados, do menor para o maior
+        device (str): Dispositivo (None usa CUDA quando disponível)
+        quantize (bool): Se True, mede os modelos quantizados para int8
+        audio (np.ndarray): Gravação usada na medição (None usa áudio sintético)
+        measurements_path (str): Arquivo das medições (None para não gravar)
+        remeasure (bool): Se True, ignora as medições gravadas
+        decoding (str): Preset de decodificação usado na transcrição (None usa o padrão)
+        initial_prompt (str): Vocabulário do domínio (substitui o do preset)
+
+    Returns:
+        str: Nome do modelo escolhido (o menor candidato se nenhum atingir a meta)
+    """
+    device = _resolve_device(device)
+    target_rtf = target_latency / utterance_seconds
+    path = Path(measurements_path) if measurements_path else None
+    measurements = _load_measurements(path) if path and not remeasure else {}
+    if audio is None:
+        audio = _sample_audio(utterance_seconds)
+    overrides = {"initial_prompt": initial_prompt} if initial_prompt is not None else {}
+    options = transcribe_options(decoding, device=device, **overrides)
+    preset = decoding or DEFAULT_PRESET
+
+    chosen = candidates[0]
+    measured_here = []
+    logger.info("🎯 Seleção do modelo Whisper: até %.2f s por frase de %.0f s (fator de tempo real ≤ %.2f, "
+                "preset '%s')", target_latency, utterance_seconds, target_rtf, preset)
+    for name in candidates:
+        key = _measurement_key(name, device, quantize, preset, options)
+        rtf = measurements.get(key)
+        if rtf is None:
+            if (name, device, quantize) not in loaded_models():
+                measured_here.append(name)
+            rtf = measure_rtf(load_whisper_model(name, device=device, quantize=quantize), audio, options=options)
+            measurements[key] = rtf
+
+        within_target = rtf <= target_rtf
+        logger.info("   %-6s fator %5.2f | %5.2f s por frase %s", name, rtf, rtf * utterance_seconds,
+                    '✅' if within_target else '❌')
+        if not within_target:
+            break
+        chosen = name
+
+    # Libera os modelos carregados só para a medição (o escolhido continua no cache)
+    for name in measured_here:
+        if name != chosen:
+            unload_whisper_model(name)
+
+    if path:
+        _save_measurements(path, {**_load_measurements(path), **measurements})
+    logger.info("🏆 Modelo Whisper escolhido: %s", chosen)
+    return chosen
+
+
+def main():
+    """Função principal"""
+    from tracing import configure_logging
+
+    parser = argparse.ArgumentParser(description="Modelos Whisper: medição e seleção automática")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    measure = subparsers.add_parser("medir", help="Mede o fator de tempo real dos modelos")
+    measure.add_argument("--modelos", nargs="+", default=list(AUTO_CANDIDATES), help="Modelos medidos")
+
+    select = subparsers.add_parser("selecionar", help="Escolhe o modelo pela latência desejada")
+    select.add_argument("--latencia", type=float, default=1.5, help="Latência máxima por frase (segundos)")
+    select.add_argument("--frase", type=float, default=5.0, help="Duração de uma frase típica (segundos)")
+    select.add_argument("--remedir", action="store_true", help="Ignora as medições gravadas")
+
+    for subparser in (measure, select):
+        subparser.add_argument("--audio", default=None, help="Gravação usada na medição (padrão: sintético)")
+        subparser.add_argument("--int8", action="store_true", help="Usa modelos quantizados (CPU)")
+        subparser.add_argument("--dispositivo", default=None, help="cpu ou cuda (padrão: automático)")
+        subparser.add_argument("--decodificacao", default=None,
+                               help=f"Preset de decodificação (padrão: {DEFAULT_PRESET})")
+    args = parser.parse_args()
+    configure_logging()
+
+    audio = None
+    if args.audio:
+        import whisper
+        audio = whisper.load_audio(args.audio)
+
+    if args.command == "medir":
+        audio = audio if audio is not None else _sample_audio(5.0)
+        print(f"\n⏱️ Fator de tempo real ({len(audio) / WHISPER_SAMPLE_RATE:.1f} s de áudio)")
+        for name in args.modelos:
+            start = time.perf_counter()
+            model = load_whisper_model(name, device=args.dispositivo, quantize=args.int8)
+            load_seconds = time.perf_counter() - start
+            options = transcribe_options(args.decodificacao, device=model.device.type)
+            rtf = measure_rtf(model, audio, options=options)
+            print(f"{name:<8} fator {rtf:5.2f} | carregamento {load_seconds:5.1f} s")
+            unload_whisper_model(name)
+    else:
+        select_model(target_latency=args.latencia, utterance_seconds=args.frase, device=args.dispositivo,
+                     quantize=args.int8, audio=audio, remeasure=args.remedir, decoding=args.decodificacao)
+
+
+if __name__ == "__main__":
+    main()